@@ -3,26 +3,222 @@ import threading
 import time
 import uuid
 from message import Message
+from logs import TRACE, get_logger
+
+logger = get_logger("agent")
+
+# Nombre de réponses au-delà duquel la boîte d'envoi d'un lot est postée sans attendre la fin du lot
+OUTBOX_SIZE = 8
+
+class NegotiationState:
+    __slots__ = ("price", "path", "round", "counterpart")
+
+    def __init__(self, price):
+        """
+        État d'une négociation du point de vue d'un agent : chaque négociation a le
+        sien, un agent peut donc en mener plusieurs à la fois sans que leurs
+        concessions se mélangent.
+
+        Args:
+            price (float): Prix de départ de l'agent dans cette négociation
+        """
+        self.price = price  # Prix courant de l'agent, base de sa prochaine concession
+        self.path = []  # Prix proposés par l'agent, dans l'ordre
+        self.round = 0  # Nombre de réponses envoyées à l'autre partie
+        self.counterpart = None  # Identifiant de l'autre partie
+
+
+class Agent:
+    # Intervalle de scrutation en secondes ; None = réveil événementiel via notify()
+    poll_interval = None
 
-class Agent(threading.Thread):
     def __init__(self, agent_id, agent_type, message_board):
         """
         Initialise un agent dans le système de négociation.
 
+        L'agent ne possède pas de thread : start(pool) le rattache à un WorkerPool
+        partagé, start() sans pool lui crée un thread dédié (mode historique).
+
         Args:
             agent_id (str): Identifiant unique de l'agent
             agent_type (str): Type de l'agent ("supplier" ou "buyer")
             message_board (SharedMessageBoard): Référence au tableau de messages partagé
         """
-        super().__init__()
         self.id = agent_id
         self.type = agent_type
         self.message_board = message_board
         self.active_negotiations = {}  # id_negotiation -> dernier numéro de message
-        self.daemon = True  # Le thread s'arrêtera quand le programme principal s'arrête
+        self.first_price = None  # Prix de départ de chaque négociation (défini par les sous-classes)
+        self.negotiation_states = {}  # id_negotiation -> NegotiationState des négociations en cours
         self.running = True
+        self.negotiations_to_process = set()  # Négociations en attente de traitement
+        self.wakeup = threading.Condition()  # Protège la file ; réveille le thread dédié quand du travail arrive
+        self.pool = None  # WorkerPool qui exécute l'agent
+        self.thread = None  # Thread dédié (start sans pool)
+        self.queued = False  # L'agent est dans la file du pool ou en cours de traitement
+        self.draining_thread = None  # Thread du pool qui traite actuellement l'agent
+        self.outbox = None  # Messages en attente d'envoi pendant le traitement d'un lot
+        self.retiring = False  # Retiré (CoalitionManager) : termine ses négociations sans en prendre de nouvelles
         self.message_board.register_observer(self)
 
+    def start(self, pool=None):
+        """
+        Démarre l'agent. Un acheteur démarré rejoint le canal des négociations
+        ouvertes du tableau.
+
+        Args:
+            pool (WorkerPool): Pool qui traitera les négociations de l'agent ; sans pool,
+                un thread démon dédié exécute run()
+        """
+        self.message_board.add_open_observer(self)
+        if pool is None:
+            self.thread = threading.Thread(target=self.run, name=self.id, daemon=True)
+            self.thread.start()
+            return
+        with self.wakeup:
+            self.pool = pool
+            pending = bool(self.negotiations_to_process) and not self.queued
+            if pending:
+                self.queued = True
+        if pending:
+            self._submit()
+
+    def run(self):
+        """Boucle du thread dédié de l'agent."""
+        while self.running:
+            self.process_negotiations(self.next_negotiations())
+
+    def process_negotiations(self, negotiations):
+        """
+        Traite un lot de négociations en attente (appelé par run, drain et par les
+        moteurs simulé et asyncio). Si le tableau a des mesures, la taille du lot et la durée
+        de chaque traitement y sont enregistrées.
+
+        Quand le lot compte plusieurs négociations, les réponses passent par une boîte
+        d'envoi postée par add_messages toutes les OUTBOX_SIZE réponses, et à la fin du
+        lot (même si un traitement lève une exception). Regrouper économise des prises
+        de verrou et des réveils, mais une réponse attend jusqu'à OUTBOX_SIZE - 1
+        traitements avant d'être visible : la taille bornée limite ce retard.
+
+        Args:
+            negotiations (iterable): Les négociations à traiter
+        """
+        batched = len(negotiations) > 1
+        if batched:
+            self.outbox = []
+        try:
+            metrics = self.message_board.metrics
+            if metrics is None:
+                for id_negotiation in negotiations:
+                    self.handle_negotiation(id_negotiation)
+                return
+            if negotiations:
+                metrics.record_queue_depth(self.id, len(negotiations))
+            for id_negotiation in negotiations:
+                start = time.perf_counter()
+                self.handle_negotiation(id_negotiation)
+                metrics.record_handle(self.id, time.perf_counter() - start)
+        finally:
+            if batched:
+                outbox, self.outbox = self.outbox, None
+                if outbox:
+                    self.send_messages(outbox)
+
+    def schedule(self, id_negotiation):
+        """
+        Ajoute une négociation à traiter et réveille l'agent (thread dédié ou pool).
+
+        Args:
+            id_negotiation (str): L'identifiant de la négociation à traiter
+        """
+        # Chemin de chaque message : pas de détour par schedule_many
+        with self.wakeup:
+            self.negotiations_to_process.add(id_negotiation)
+            if self.pool is None:
+                self.wakeup.notify()
+                return
+            if self.queued or not self.running:
+                return
+            self.queued = True
+        self._submit()
+
+    def schedule_many(self, negotiations):
+        """
+        Ajoute plusieurs négociations à traiter et réveille l'agent une seule fois.
+
+        Args:
+            negotiations (iterable): Les identifiants des négociations à traiter
+        """
+        with self.wakeup:
+            self.negotiations_to_process.update(negotiations)
+            if self.pool is None:
+                self.wakeup.notify()
+                return
+            if self.queued or not self.running:
+                return
+            self.queued = True
+        self._submit()
+
+    def _submit(self):
+        """Place l'agent dans la file du pool (l'agent est déjà marqué queued)."""
+        if not self.pool.submit(self):
+            with self.wakeup:
+                self.queued = False
+                self.wakeup.notify_all()
+
+    def drain(self):
+        """
+        Traite le lot de négociations en attente (appelé par un thread du pool).
+
+        Si d'autres négociations sont arrivées pendant le traitement, l'agent est
+        remis en fin de file plutôt que de garder le thread.
+        """
+        with self.wakeup:
+            negotiations = self.negotiations_to_process if self.running else set()
+            self.negotiations_to_process = set()
+            self.draining_thread = threading.current_thread()
+        requeue = False
+        try:
+            self.process_negotiations(negotiations)
+        finally:
+            with self.wakeup:
+                self.draining_thread = None
+                requeue = bool(self.negotiations_to_process) and self.running
+                if not requeue:
+                    self.queued = False
+                    self.wakeup.notify_all()
+        if requeue:
+            self._submit()
+
+    def next_negotiations(self):
+        """
+        Bloque jusqu'à ce que des négociations soient en attente (ou que l'agent s'arrête)
+        puis les retire de la file.
+
+        En mode scrutation (poll_interval défini), attend simplement l'intervalle
+        comme l'ancienne boucle à base de time.sleep.
+
+        Returns:
+            set: Les négociations à traiter
+        """
+        with self.wakeup:
+            if self.poll_interval is None:
+                self.wakeup.wait_for(lambda: self.negotiations_to_process or not self.running)
+            else:
+                self.wakeup.wait_for(lambda: not self.running, timeout=self.poll_interval)
+            negotiations = self.negotiations_to_process
+            self.negotiations_to_process = set()
+        return negotiations
+
+    def handle_negotiation(self, id_negotiation):
+        """
+        Gère une négociation spécifique.
+
+        Args:
+            id_negotiation (str): L'identifiant de la négociation à traiter
+        """
+        # À implémenter dans les sous-classes
+
     def notify(self, id_negotiation):
         """
         Méthode appelée quand un nouveau message est ajouté au tableau.
@@ -30,8 +226,44 @@ class Agent(threading.Thread):
         Args:
             id_negotiation (str): L'identifiant de la négociation mise à jour
         """
-        # À implémenter dans les sous-classes
-        
+        # Le tableau ne notifie que les participants (et les acheteurs pour les négociations ouvertes)
+        self.schedule(id_negotiation)
+
+    def notify_many(self, negotiations):
+        """
+        Méthode appelée quand un lot de messages touche plusieurs négociations de l'agent.
+
+        Args:
+            negotiations (list): Les identifiants des négociations mises à jour
+        """
+        self.schedule_many(negotiations)
+
+
+    def negotiation_state(self, id_negotiation):
+        """
+        Retourne l'état d'une négociation, créé au prix de départ à la première demande.
+
+        Args:
+            id_negotiation (str): L'identifiant de la négociation
+
+        Returns:
+            NegotiationState: L'état de la négociation pour cet agent
+        """
+        state = self.negotiation_states.get(id_negotiation)
+        if state is None:
+            state = self.negotiation_states[id_negotiation] = NegotiationState(self.first_price)
+        return state
+
+    def release_if_terminal(self, message):
+        """
+        Oublie l'état d'une négociation dont le dernier message est terminal, quel qu'en
+        soit l'émetteur (y compris un abandon "system" posté à l'échéance).
+
+        Args:
+            message (Message): Le dernier message de la négociation (ou None)
+        """
+        if message is not None and message.is_terminal():
+            self.negotiation_states.pop(message.id_negotiation, None)
 
     def process_message(self, message):
         """
@@ -43,32 +275,43 @@ class Agent(threading.Thread):
         Returns:
             bool: True si la négociation continue, False sinon
         """
+        if message.is_terminal():
+            self.negotiation_states.pop(message.id_negotiation, None)
+
         # Si le message est accepté, on affiche le prix accordé et on arrête
         if message.state == "accepted":
-            print(f"Agent {self.id}: We agreed on: {message.price}")
+            logger.info("Agent %s: We agreed on: %s", self.id, message.price,
+                        extra={"agent": self.id, "negotiation": message.id_negotiation, "price": message.price, "state": "accepted"})
             return False
 
         # Si le message est annulé, on affiche qu'on n'a pas trouvé d'accord et on arrête
         if message.state == "aborted":
-            print(f"Agent {self.id}: We could not find an agreement")
+            logger.info("Agent %s: We could not find an agreement", self.id,
+                        extra={"agent": self.id, "negotiation": message.id_negotiation, "state": "aborted"})
             return False
 
         # Si le nombre de messages restants est 0, on arrête
         if message.message_remaining <= 0:
-            print(f"Agent {self.id}: Negotiation timeout")
+            logger.info("Agent %s: Negotiation timeout", self.id,
+                        extra={"agent": self.id, "negotiation": message.id_negotiation, "state": "timeout"})
             return False
 
         # Sinon, on continue la négociation
         return True
 
-    def send_message(self, id_negotiation, price, state="processing"):
+    def build_message(self, id_negotiation, price, state="processing", opening=False):
         """
-        Envoie un message dans une négociation.
+        Prépare le prochain message de l'agent dans une négociation, sans l'envoyer,
+        et met à jour son numéro de message et son chemin de prix.
 
         Args:
             id_negotiation (str): L'identifiant de la négociation
             price (float): Le prix proposé
             state (str): État du message
+            opening (bool): Offre d'ouverture (la négociation n'a encore aucun message)
+
+        Returns:
+            Message: Le message à poster
         """
 
         # Récupérer le numéro du dernier message et mettre à jour
@@ -77,10 +320,9 @@ class Agent(threading.Thread):
         self.active_negotiations[id_negotiation] = new_msg_num
 
         # Récupérer le dernier message pour connaître le nombre de messages restants
-        last_message = self.message_board.get_last_message(id_negotiation)
+        last_message = None if opening else self.message_board.get_last_message(id_negotiation)
         message_remaining = last_message.message_remaining - 1 if last_message else 9
 
-        # Créer et envoyer le message
         message = Message(
             msg_type=self.type,
             sender_id=self.id,
@@ -91,9 +333,91 @@ class Agent(threading.Thread):
             message_remaining=message_remaining,
             company=self.company if self.type == "supplier" else ""
         )
+        # Chemin de prix de la négociation ; l'état est oublié quand elle se termine
+        negotiation = self.negotiation_states.get(id_negotiation)
+        if negotiation is not None:
+            if message.is_terminal():
+                del self.negotiation_states[id_negotiation]
+            else:
+                negotiation.path.append(price)
+        return message
+
+    def send_message(self, id_negotiation, price, state="processing"):
+        """
+        Envoie un message dans une négociation.
+
+        Pendant le traitement d'un lot (process_negotiations), le message est mis dans
+        la boîte d'envoi, postée (send_messages) dès qu'elle atteint OUTBOX_SIZE messages.
+
+        Args:
+            id_negotiation (str): L'identifiant de la négociation
+            price (float): Le prix proposé
+            state (str): État du message
+        """
+        message = self.build_message(id_negotiation, price, state)
+        if self.outbox is not None:
+            self.outbox.append(message)
+            if len(self.outbox) >= OUTBOX_SIZE:
+                outbox, self.outbox = self.outbox, []
+                self.send_messages(outbox)
+            return
         self.message_board.add_message(message)
-        print(f"Agent {self.id} sent: {message}")
+        self._trace_sent((message,))
+
+    def send_messages(self, messages):
+        """
+        Poste plusieurs messages en une seule transaction sur le tableau (add_messages).
+
+        Args:
+            messages (list): Les messages préparés par build_message
+        """
+        self.message_board.add_messages(messages)
+        self._trace_sent(messages)
 
-    def stop(self):
-        """Arrête le thread de l'agent."""
-        self.running = False
+    def _trace_sent(self, messages):
+        """Trace par message, désactivée par défaut (voir logs.setup_logging(trace=True))."""
+        if logger.isEnabledFor(TRACE):
+            for message in messages:
+                logger.log(TRACE, "Agent %s sent: %s", self.id, message,
+                           extra={"agent": self.id, "negotiation": message.id_negotiation,
+                                  "price": message.price, "state": message.state})
+
+    def start_negotiations(self, count):
+        """
+        Ouvre plusieurs négociations en une seule transaction sur le tableau : un bloc
+        d'IDs est réservé, puis les offres d'ouverture sont postées ensemble
+        (SharedMessageBoard.open_negotiations).
+
+        Args:
+            count (int): Nombre de négociations à ouvrir
+
+        Returns:
+            list: Les NegotiationFuture des négociations ouvertes
+        """
+        messages = []
+        for id_negotiation in self.message_board.reserve_negotiation_ids(count):
+            self.active_negotiations[id_negotiation] = -1
+            price = self.negotiation_state(id_negotiation).price
+            messages.append(self.build_message(id_negotiation, price, opening=True))
+        futures = self.message_board.open_negotiations(self.id, messages)
+        self._trace_sent(messages)
+        return futures
+
+    def stop(self, wait=True):
+        """
+        Arrête l'agent et attend la fin de son traitement en cours (thread dédié
+        rejoint, ou lot en cours dans le pool terminé).
+
+        Args:
+            wait (bool): Attendre la fin du traitement en cours ; False permet d'arrêter
+                l'agent depuis un thread du pool sans risquer de le bloquer
+        """
+        self.message_board.remove_open_observer(self)
+        current = threading.current_thread()
+        with self.wakeup:
+            self.running = False
+            self.wakeup.notify_all()
+            if wait and self.pool is not None and self.draining_thread is not current:
+                self.wakeup.wait_for(lambda: not self.queued)
+        if wait and self.thread is not None and self.thread is not current:
+            self.thread.join()
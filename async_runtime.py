@@ -0,0 +1,181 @@
+import asyncio
+
+from logs import get_logger
+from matchmaking import MatchmakingBook
+
+logger = get_logger("async")
+
+
+class AsyncMessageBoard:
+    def __init__(self, message_board):
+        """
+        Façade asyncio d'un SharedMessageBoard.
+
+        Les notifications du tableau sont redirigées (dispatcher) vers une asyncio.Queue
+        par agent abonné, et la fin des négociations peut être attendue sans bloquer la
+        boucle. Toutes les opérations doivent être appelées depuis la boucle d'événements.
+
+        Args:
+            message_board (SharedMessageBoard): Le tableau de messages sous-jacent
+        """
+        self.message_board = message_board
+        self.queues = {}  # id_agent -> asyncio.Queue des négociations à traiter
+        message_board.dispatcher = self._dispatch
+
+    def subscribe(self, agent):
+        """
+        Crée la file de notifications d'un agent.
+
+        Args:
+            agent (Agent): L'agent à abonner
+
+        Returns:
+            asyncio.Queue: La file dans laquelle arrivent les négociations à traiter
+        """
+        queue = self.queues[agent.id] = asyncio.Queue()
+        return queue
+
+    def _dispatch(self, observer, id_negotiation):
+        """
+        Remplace observer.notify : dépose la négociation dans la file de l'agent.
+
+        Args:
+            observer (Agent): L'agent à réveiller
+            id_negotiation (str): L'identifiant de la négociation mise à jour
+        """
+        queue = self.queues.get(observer.id)
+        if queue is not None:
+            queue.put_nowait(id_negotiation)
+
+    async def wait_until_finished(self, futures, timeout=None):
+        """
+        Attend la fin de négociations ouvertes par start_negotiations.
+
+        Args:
+            futures (list): Les NegotiationFuture des négociations
+            timeout (float): Durée maximale d'attente en secondes (None = sans limite)
+
+        Returns:
+            list: Les identifiants des négociations encore ouvertes à l'échéance
+        """
+        # Les futures sont résolues par le tableau, depuis la boucle (les agents y tournent)
+        waiters = {asyncio.wrap_future(future): future for future in futures}
+        if not waiters:
+            return []
+        _, pending = await asyncio.wait(waiters, timeout=timeout)
+        for waiter in pending:
+            waiter.cancel()
+        return [waiters[waiter].id_negotiation for waiter in pending]
+
+
+class AsyncAgentRuntime:
+    def __init__(self, message_board, matchmaking=True):
+        """
+        Exécute des agents comme coroutines sur une seule boucle asyncio, sans thread
+        par agent. Les agents existants (Supplier, Buyer, coalitions) sont utilisés
+        tels quels : seul leur process_negotiations est appelé.
+
+        Les agents reçoivent leurs notifications et le runtime attend la fin des
+        négociations par une façade AsyncMessageBoard. Toutes les opérations doivent être
+        appelées depuis la boucle d'événements.
+
+        Args:
+            message_board (SharedMessageBoard): Le tableau de messages partagé
+            matchmaking (bool): Attribue chaque négociation ouverte à un seul acheteur par
+                un carnet d'ordres (celui du tableau s'il en a déjà un), au lieu de réveiller
+                tous les acheteurs
+        """
+        self.message_board = message_board
+        self.board = AsyncMessageBoard(message_board)
+        if matchmaking and message_board.matchmaker is None:
+            MatchmakingBook(message_board)
+        self.agents = []
+        self.tasks = []
+
+    def add_agents(self, agents):
+        """
+        Ajoute des agents au runtime ; les acheteurs sont inscrits dans le carnet
+        d'ordres du tableau s'il en a un.
+
+        Args:
+            agents (list): Les agents à héberger
+        """
+        self.agents.extend(agents)
+        matchmaker = self.message_board.matchmaker
+        if matchmaker is not None:
+            matchmaker.add_buyers([agent for agent in agents if agent.type == "buyer"])
+
+    async def run_agent(self, agent, queue):
+        """
+        Boucle d'un agent : attend des notifications puis traite les négociations.
+
+        Args:
+            agent (Agent): L'agent à exécuter
+            queue (asyncio.Queue): Sa file de notifications
+        """
+        while agent.running:
+            negotiations = {await queue.get()}
+            while not queue.empty():
+                negotiations.add(queue.get_nowait())
+            agent.process_negotiations(negotiations)
+            await asyncio.sleep(0)  # Laisser la main aux autres agents
+
+    def start(self):
+        """Démarre une coroutine par agent (à appeler depuis la boucle d'événements)."""
+        for agent in self.agents:
+            self.message_board.add_open_observer(agent)
+            self.tasks.append(asyncio.create_task(self.run_agent(agent, self.board.subscribe(agent))))
+
+    async def stop(self):
+        """Arrête les agents et attend la fin de leurs coroutines."""
+        for agent in self.agents:
+            agent.stop()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def run_negotiations(self, suppliers, negotiations_per_supplier, timeout=10):
+        """
+        Ouvre toutes les négociations en même temps et attend qu'elles se terminent.
+
+        Args:
+            suppliers (list): Les fournisseurs qui ouvrent les négociations
+            negotiations_per_supplier (int): Nombre de négociations par fournisseur
+            timeout (float): Durée maximale d'attente en secondes
+
+        Returns:
+            list: Les identifiants des négociations ouvertes
+        """
+        futures = [future
+                   for supplier in suppliers
+                   for future in supplier.start_negotiations(negotiations_per_supplier)]
+        pending = await self.board.wait_until_finished(futures, timeout)
+        if pending:
+            logger.warning("Timeout reached, %d negotiations didn't complete", len(pending))
+        return [future.id_negotiation for future in futures]
+
+
+async def run_async_negotiations(message_board, suppliers, buyers, negotiations_per_supplier, timeout=10,
+                                 matchmaking=True):
+    """
+    Héberge les agents dans un AsyncAgentRuntime et exécute les négociations.
+
+    Args:
+        message_board (SharedMessageBoard): Le tableau de messages partagé
+        suppliers (list): Les fournisseurs qui ouvrent les négociations
+        buyers (list): Les acheteurs
+        negotiations_per_supplier (int): Nombre de négociations par fournisseur
+        timeout (float): Durée maximale d'attente en secondes
+        matchmaking (bool): Attribue les négociations aux acheteurs par carnet d'ordres
+
+    Returns:
+        list: Les identifiants des négociations ouvertes
+    """
+    runtime = AsyncAgentRuntime(message_board, matchmaking=matchmaking)
+    runtime.add_agents(suppliers + buyers)
+    runtime.start()
+    try:
+        return await runtime.run_negotiations(suppliers, negotiations_per_supplier, timeout)
+    finally:
+        await runtime.stop()
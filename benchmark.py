@@ -0,0 +1,427 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from shared_board import SharedMessageBoard
+from supplier import Supplier
+from buyer import Buyer
+from async_runtime import AsyncAgentRuntime
+from message import Message
+from metrics import NegotiationMetrics
+from timer_wheel import NegotiationDeadlines
+
+
+def measure_negotiation_latency(poll_interval=None):
+    """
+    Mesure la durée d'une négociation 1-à-1 de bout en bout.
+
+    Args:
+        poll_interval (float): Intervalle de scrutation des agents (None = mode événementiel)
+
+    Returns:
+        tuple: (durée en secondes, nombre de messages échangés)
+    """
+    message_board = SharedMessageBoard()
+    supplier = Supplier("supplier_1", message_board, first_price=1000, min_price=500, company="CompanyX", ticket_remaining=3)
+    buyer = Buyer("buyer_1", message_board, first_price=300, max_price=600, favourite_companies=["CompanyX"])
+    for agent in (supplier, buyer):
+        agent.poll_interval = poll_interval
+        agent.start()
+
+    start = time.perf_counter()
+    future = supplier.start_negotiation()
+    future.result(timeout=30)
+    elapsed = time.perf_counter() - start
+
+    supplier.stop()
+    buyer.stop()
+    return elapsed, len(message_board.get_all_messages(future.id_negotiation))
+
+
+def bench_wakeup_latency(repeat=5, poll_interval=0.1):
+    """
+    Compare la latence d'une négociation entre l'ancienne boucle de scrutation
+    (time.sleep) et le réveil événementiel des agents.
+
+    Args:
+        repeat (int): Nombre de négociations mesurées par mode
+        poll_interval (float): Intervalle de scrutation du mode historique
+
+    Returns:
+        dict: Latence médiane (en secondes) par mode
+    """
+    results = {}
+    for mode, interval in [("polling", poll_interval), ("event", None)]:
+        timings = []
+        for _ in range(repeat):
+            elapsed, message_count = measure_negotiation_latency(interval)
+            timings.append(elapsed)
+        results[mode] = statistics.median(timings)
+        results[f"{mode}_messages"] = message_count
+
+    print(f"Wakeup latency ({repeat} negotiations per mode):")
+    for mode in ["polling", "event"]:
+        print(f"  {mode:<8}: {results[mode] * 1000:9.3f} ms median, {results[mode + '_messages']} messages")
+    print(f"  speedup : {results['polling'] / results['event']:.0f}x")
+    return results
+
+
+async def measure_async_throughput(num_agents):
+    """
+    Exécute une négociation par fournisseur dans le runtime asyncio.
+
+    La moitié des agents sont des fournisseurs, l'autre moitié des acheteurs ; les
+    négociations sont attribuées aux acheteurs par le carnet d'ordres du runtime.
+
+    Args:
+        num_agents (int): Nombre total d'agents hébergés
+
+    Returns:
+        tuple: (nombre de négociations, durée en secondes)
+    """
+    message_board = SharedMessageBoard()
+    num_suppliers = max(1, num_agents // 2)
+    suppliers = [Supplier(f"supplier_{i}", message_board, first_price=(300 + i % 20 * 50) * 5,
+                          min_price=300 + i % 20 * 50, company=f"Company{i % 20}", ticket_remaining=5)
+                 for i in range(num_suppliers)]
+    buyers = [Buyer(f"buyer_{i}", message_board, first_price=(600 + i % 20 * 50) * 0.5,
+                    max_price=600 + i % 20 * 50, favourite_companies=[f"Company{i % 20}"])
+              for i in range(num_agents - num_suppliers)]
+
+    runtime = AsyncAgentRuntime(message_board)
+    runtime.add_agents(suppliers + buyers)
+    runtime.start()
+    start = time.perf_counter()
+    negotiations = await runtime.run_negotiations(suppliers, 1, timeout=600)
+    elapsed = time.perf_counter() - start
+    await runtime.stop()
+    return len(negotiations), elapsed
+
+
+def bench_async_scaling(agent_counts=(100, 1000, 5000, 10000)):
+    """
+    Mesure le débit (négociations par seconde) du runtime asyncio selon le nombre d'agents.
+
+    Args:
+        agent_counts (tuple): Nombres d'agents à tester
+
+    Returns:
+        dict: Négociations par seconde pour chaque nombre d'agents
+    """
+    results = {}
+    print("Asyncio runtime scaling:")
+    for num_agents in agent_counts:
+        count, elapsed = asyncio.run(measure_async_throughput(num_agents))
+        results[num_agents] = count / elapsed
+        print(f"  {num_agents:>6} agents: {count:>6} negotiations in {elapsed:7.3f} s ({results[num_agents]:9.1f} neg/s)")
+    return results
+
+
+def measure_board_memory(num_messages, columnar, messages_per_negotiation=10):
+    """
+    Mesure la mémoire occupée par les messages stockés dans un tableau.
+
+    Args:
+        num_messages (int): Nombre de messages à stocker
+        columnar (bool): Utiliser le stockage en colonnes
+        messages_per_negotiation (int): Nombre de messages par négociation
+
+    Returns:
+        int: Octets alloués par les messages
+    """
+    tracemalloc.start()
+    message_board = SharedMessageBoard(columnar=columnar)
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(num_messages):
+        sender, msg_type = ("supplier_1", "supplier") if i % 2 == 0 else ("buyer_1", "buyer")
+        message_board.add_message(Message(msg_type, sender, i // messages_per_negotiation, 500.0 + i % 97,
+                                          message_number=i % messages_per_negotiation // 2,
+                                          message_remaining=9 - i % messages_per_negotiation,
+                                          company="CompanyX"))
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used
+
+
+def bench_message_memory(num_messages=200_000):
+    """
+    Compare la mémoire par message entre les listes de Message et le stockage en colonnes.
+
+    Args:
+        num_messages (int): Nombre de messages stockés
+
+    Returns:
+        dict: Octets par message pour chaque stockage
+    """
+    results = {mode: measure_board_memory(num_messages, mode == "columnar") / num_messages
+               for mode in ["objects", "columnar"]}
+    print(f"Board memory ({num_messages} messages):")
+    for mode, per_message in results.items():
+        print(f"  {mode:<8}: {per_message:7.1f} bytes/message")
+    print(f"  ratio   : {results['objects'] / results['columnar']:.1f}x")
+    return results
+
+
+def bench_bulk_open(num_negotiations=20_000, num_buyers=50):
+    """
+    Compare l'ouverture des négociations une par une (start_negotiation) et en bloc
+    (start_negotiations : un passage par bande, une prise de verrou pour les échéances
+    et les mesures, une notification par acheteur).
+
+    Le tableau a des mesures et des échéances (assez longues pour ne pas expirer), et
+    les acheteurs sont sur le canal des négociations ouvertes sans dispatcher : chaque
+    ouverture les réveille par notify / notify_many. Ils ne sont pas démarrés : seule
+    l'ouverture est mesurée.
+
+    Args:
+        num_negotiations (int): Nombre de négociations ouvertes
+        num_buyers (int): Nombre d'acheteurs prévenus des négociations ouvertes
+
+    Returns:
+        dict: Négociations ouvertes par seconde pour chaque mode
+    """
+    results = {}
+    for mode in ["single", "bulk"]:
+        message_board = SharedMessageBoard(metrics=NegotiationMetrics())
+        deadlines = NegotiationDeadlines(message_board, 3600)
+        supplier = Supplier("supplier_1", message_board, 400, 500, company="CompanyX")
+        for i in range(num_buyers):
+            message_board.add_open_observer(Buyer(f"buyer_{i}", message_board, 450, 300))
+        start = time.perf_counter()
+        if mode == "bulk":
+            supplier.start_negotiations(num_negotiations)
+        else:
+            for _ in range(num_negotiations):
+                supplier.start_negotiation()
+        results[mode] = num_negotiations / (time.perf_counter() - start)
+        deadlines.close()
+    print(f"Negotiation opening ({num_negotiations} negotiations, {num_buyers} buyers):")
+    for mode, rate in results.items():
+        print(f"  {mode:<6}: {rate:10.1f} neg/s")
+    print(f"  ratio : {results['bulk'] / results['single']:.1f}x")
+    return results
+
+
+# Graine fixe de la suite (moteur simulé, anneau de jetons)
+BENCHMARK_SEED = 42
+
+# Nombres d'agents (fournisseurs + acheteurs) des scénarios à plusieurs négociations
+BENCHMARK_AGENT_COUNTS = (8, 16, 32, 64)
+
+# IDP énumère tous les sous-ensembles : au-delà, un scénario prend plusieurs secondes
+IDP_MAX_AGENTS = 24
+
+COALITION_ALGOS = ("coupling", "idp", "token")
+
+# Mesures comparées entre deux exécutions et sens d'une amélioration
+BENCHMARK_MEASURES = {
+    "negotiations_per_second": "higher",
+    "latency_p50": "lower",
+    "latency_p99": "lower",
+    "coalition_formation_time": "lower",
+    "peak_rss_kb": "lower",
+}
+
+
+def benchmark_scenarios(agent_counts=BENCHMARK_AGENT_COUNTS, engine="simulated", negotiations_per_supplier=3, seed=BENCHMARK_SEED):
+    """
+    Construit la liste des scénarios de la suite : la négociation 1-à-1, puis pour
+    chaque nombre d'agents run_multiple_negotiations et chaque algorithme de coalition.
+
+    Args:
+        agent_counts (tuple): Nombres d'agents, répartis à parts égales entre fournisseurs et acheteurs
+        engine (str): Moteur des scénarios à plusieurs négociations ("simulated", "asyncio", "pool" ou "threaded")
+        negotiations_per_supplier (int): Nombre de négociations par fournisseur
+        seed (int): Graine transmise aux scénarios
+
+    Returns:
+        list: Scénarios (dict avec name, function et params)
+    """
+    scenarios = [{"name": "single", "function": "run_single_negotiation", "params": {}}]
+    for num_agents in agent_counts:
+        sizes = {"num_suppliers": num_agents // 2, "num_buyers": num_agents - num_agents // 2,
+                 "negotiations_per_supplier": negotiations_per_supplier, "engine": engine, "seed": seed,
+                 "save_reports": False}
+        scenarios.append({"name": f"multiple/{engine}/{num_agents}", "function": "run_multiple_negotiations",
+                          "params": sizes})
+        for algo in COALITION_ALGOS:
+            if algo == "idp" and num_agents > IDP_MAX_AGENTS:
+                continue
+            scenarios.append({"name": f"coalitions/{algo}/{engine}/{num_agents}",
+                              "function": "run_multiple_negotiations_with_coalitions",
+                              "params": dict(sizes, coalition_algo=algo, coalition_type="both")})
+    return scenarios
+
+
+def peak_rss_kb():
+    """
+    Pic de mémoire résidente du processus courant, en kilo-octets.
+
+    Returns:
+        int: Le pic de RSS, ou None si le module resource n'existe pas (Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # Octets sous macOS
+
+
+def run_benchmark_scenario(scenario):
+    """
+    Exécute un scénario sans affichage et en extrait les mesures.
+
+    Appelé dans un processus neuf (voir run_benchmark_suite) : le pic de RSS est
+    alors celui du scénario seul.
+
+    Args:
+        scenario (dict): Le scénario (voir benchmark_scenarios)
+
+    Returns:
+        dict: Le scénario et ses mesures
+    """
+    import main
+    function = getattr(main, scenario["function"])
+    results = function(verbose=False, **scenario["params"])
+    duration = results["metrics"]["negotiation_duration"]
+    return dict(scenario,
+                negotiations=results["summary"]["total"],
+                accepted=results["summary"]["accepted"],
+                completed=results["metrics"]["negotiations_completed"],
+                elapsed=results["elapsed"],
+                negotiations_per_second=results["negotiations_per_second"],
+                latency_p50=duration["p50"],
+                latency_p99=duration["p99"],
+                coalition_formation_time=results["coalition_formation_time"],
+                peak_rss_kb=peak_rss_kb())
+
+
+def run_benchmark_suite(scenarios=None, repeat=3):
+    """
+    Exécute chaque scénario repeat fois, chacun dans un processus neuf, et garde la
+    médiane de chaque mesure (le maximum pour le pic de RSS).
+
+    Args:
+        scenarios (list): Les scénarios (benchmark_scenarios() par défaut)
+        repeat (int): Nombre d'exécutions par scénario
+
+    Returns:
+        list: Les mesures de chaque scénario
+    """
+    scenarios = scenarios or benchmark_scenarios()
+    context = multiprocessing.get_context("spawn")
+    results = []
+    print(f"Benchmark suite ({len(scenarios)} scenarios, {repeat} runs each):")
+    for scenario in scenarios:
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs.append(executor.submit(run_benchmark_scenario, scenario).result())
+        result = dict(runs[0], repeat=repeat)
+        for measure in ["elapsed", "negotiations_per_second", "latency_p50", "latency_p99", "coalition_formation_time"]:
+            values = [run[measure] for run in runs if run[measure] is not None]
+            result[measure] = statistics.median(values) if values else None
+        rss = [run["peak_rss_kb"] for run in runs if run["peak_rss_kb"] is not None]
+        result["peak_rss_kb"] = max(rss) if rss else None
+        results.append(result)
+        formation = result["coalition_formation_time"]
+        print(f"  {scenario['name']:<32} {result['negotiations_per_second']:9.1f} neg/s"
+              f"  p50 {result['latency_p50'] * 1000:8.3f} ms  p99 {result['latency_p99'] * 1000:8.3f} ms"
+              f"  rss {result['peak_rss_kb'] or 0:>7} kB"
+              + (f"  formation {formation * 1000:8.3f} ms" if formation is not None else ""))
+    return results
+
+
+def current_commit():
+    """Commit git courant (abrégé), ou None hors d'un dépôt git."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_benchmark_results(results, label=None):
+    """
+    Enregistre les mesures de la suite en JSON dans ./result/benchmarks.
+
+    Args:
+        results (list): Les mesures renvoyées par run_benchmark_suite
+        label (str): Nom du fichier (le commit courant par défaut)
+
+    Returns:
+        str: Le chemin du fichier écrit
+    """
+    commit = current_commit()
+    label = label or commit or "latest"
+    output_dir = "./result/benchmarks"
+    os.makedirs(output_dir, exist_ok=True)
+    full_path = os.path.join(output_dir, f"{label}.json")
+    with open(full_path, "w") as file:
+        json.dump({
+            "label": label,
+            "commit": commit,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": BENCHMARK_SEED,
+            "scenarios": results,
+        }, file, indent=2)
+    print(f"Benchmark results saved to {full_path}")
+    return full_path
+
+
+def compare_benchmarks(baseline_path, current_path, tolerance=0.10):
+    """
+    Compare deux fichiers de résultats scénario par scénario et signale les régressions.
+
+    Args:
+        baseline_path (str): Résultats de référence (par exemple ceux du commit précédent)
+        current_path (str): Résultats à comparer
+        tolerance (float): Écart relatif toléré avant de signaler une régression
+
+    Returns:
+        list: Régressions (scénario, mesure, valeur de référence, valeur courante, écart relatif)
+    """
+    with open(baseline_path) as file:
+        baseline = {scenario["name"]: scenario for scenario in json.load(file)["scenarios"]}
+    with open(current_path) as file:
+        current = {scenario["name"]: scenario for scenario in json.load(file)["scenarios"]}
+
+    regressions = []
+    print(f"Comparison {baseline_path} -> {current_path}:")
+    for name in [name for name in current if name in baseline]:
+        for measure, better in BENCHMARK_MEASURES.items():
+            old, new = baseline[name].get(measure), current[name].get(measure)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change < -tolerance if better == "higher" else change > tolerance
+            if worse:
+                regressions.append((name, measure, old, new, change))
+            print(f"  {name:<32} {measure:<26} {old:12.6g} -> {new:12.6g} ({change:+7.1%}){'  REGRESSION' if worse else ''}")
+    print(f"  {len(regressions)} regression(s) beyond {tolerance:.0%}")
+    return regressions
+
+
+if __name__ == "__main__":
+    # python benchmark.py suite [baseline.json] : suite reproductible, enregistrée puis comparée à la référence
+    if sys.argv[1:2] == ["suite"]:
+        path = save_benchmark_results(run_benchmark_suite())
+        if len(sys.argv) > 2:
+            compare_benchmarks(sys.argv[2], path)
+    else:
+        bench_wakeup_latency()
+        bench_async_scaling()
+        bench_message_memory()
+        bench_bulk_open()
@@ -1,16 +1,22 @@
 from agent import Agent
 import strategies
-import time
+from coalition_value import coalition_value
 
 class BuyerCoalition(Agent):
     def __init__(self, coalition_id, message_board, members):
         super().__init__(coalition_id, "buyer", message_board)
         self.members = members
-        self.negotiations_to_process = set()
+        # Les membres ne reçoivent plus les négociations ouvertes : la coalition négocie pour eux
+        for member in members:
+            message_board.remove_open_observer(member)
 
+        self.first_price = min(getattr(member, 'first_price', None) or member.max_price * 0.5 for member in members)
+        self.update_aggregates()
+
+    def update_aggregates(self):
+        """Recalcule les attributs fusionnés des membres (le prix courant est conservé)."""
+        members = self.members
         self.max_price = max(member.max_price for member in members)
-        self.first_price = min(getattr(member, 'current_price', member.max_price * 0.5) for member in members)
-        self.current_price = self.first_price
 
         self.favourite_companies = list(set().union(*(m.favourite_companies for m in members)))
         self.worst_companies = list(set().union(*(m.worst_companies for m in members)))
@@ -22,45 +28,56 @@ class BuyerCoalition(Agent):
 
         self.coalition_value = self.calculate_value()
 
-    def calculate_value(self):
-        base_value = len(self.members) * 10
-        return base_value * (1 + 0.05 * len(self.members))
+    def add_member(self, member):
+        """Ajoute un acheteur à la coalition sans interrompre ses négociations."""
+        self.members = self.members + [member]
+        self.message_board.remove_open_observer(member)
+        self.update_aggregates()
+
+    def remove_member(self, member):
+        """Retire un acheteur de la coalition sans interrompre ses négociations."""
+        self.members = [m for m in self.members if m is not member]
+        self.update_aggregates()
 
-    def notify(self, id_negotiation):
-        if (self.message_board.is_participant(id_negotiation, self.id) or
-            not self.message_board.has_buyer_participant(id_negotiation)):
-            self.negotiations_to_process.add(id_negotiation)
+    def calculate_value(self):
+        return self.value_of(self.members)
 
-    def run(self):
-        while self.running:
-            for id_neg in list(self.negotiations_to_process):
-                self.handle_negotiation(id_neg)
-                self.negotiations_to_process.remove(id_neg)
-            time.sleep(0.1)
+    @staticmethod
+    def value_of(members):
+        return coalition_value(members, "buyer")
 
     def handle_negotiation(self, id_negotiation):
         msg = self.message_board.get_last_message(id_negotiation)
+        # Avant le filtre sur l'émetteur : un abandon "system" termine aussi la négociation
+        self.release_if_terminal(msg)
         if not msg or msg.type != "supplier":
             return
 
         if id_negotiation not in self.active_negotiations:
-            self.message_board.register_participant(id_negotiation, self.id)
+            # Déjà inscrite par le carnet d'ordres s'il y en a un
+            if self.message_board.matchmaker is None:
+                if self.retiring:
+                    return
+                self.message_board.register_participant(id_negotiation, self.id)
             self.active_negotiations[id_negotiation] = -1
 
         if not self.process_message(msg):
             return
 
+        negotiation = self.negotiation_state(id_negotiation)
+        negotiation.counterpart = msg.id
         if self.strategy_type == "default":
             price, state = strategies.buyer_default_strategy(
-                self.current_price, self.max_price, msg.price,
+                negotiation.price, self.max_price, msg.price,
                 self.favourite_companies, self.worst_companies, self.blocked_companies, msg.company
             )
         else:
             price, state = strategies.buyer_aggressive_strategy(
-                self.current_price, self.max_price, msg.price,
+                negotiation.price, self.max_price, msg.price,
                 self.favourite_companies, self.worst_companies, self.blocked_companies, msg.company
             )
 
-        self.send_message(id_negotiation, price, state)
+        negotiation.round += 1
         if state == "processing":
-            self.current_price = price
\ No newline at end of file
+            negotiation.price = price
+        self.send_message(id_negotiation, price, state)
@@ -1,6 +1,14 @@
+import itertools
 import random
+import time
 from buyerCoalition import BuyerCoalition
 from supplierCoalition import SupplierCoalition
+from coalition_value import coalition_value
+
+# Taille maximale par défaut d'une coalition formée par IDP
+IDP_MAX_COALITION_SIZE = 3
+# Nombre maximum de transitions de la programmation dynamique d'IDP
+IDP_MAX_TRANSITIONS = 20_000_000
 
 def form_buyer_coalitions(buyers, max_coalition_size=3):
     coalitions = []
@@ -32,67 +40,189 @@ def form_supplier_coalitions(suppliers, max_coalition_size=3):
 
     return coalitions, remaining_suppliers
 
-def idp_coalition_formation(agents, agent_type, max_coalition_size=None):
-    if not agents:
-        return []
-
+def idp_coalition_formation(agents, agent_type, max_coalition_size=IDP_MAX_COALITION_SIZE, stats=None):
+    """
+    Structure de coalitions optimale par programmation dynamique sur les sous-ensembles.
+
+    Les sous-ensembles d'agents sont codés par des masques de bits. best[mask] est la
+    meilleure valeur d'une partition de mask ; on la calcule en choisissant la
+    coalition qui contient le plus petit agent de mask, à partir de l'ensemble de
+    tous les agents : seuls les sous-ensembles atteignables sont résolus, et la
+    valeur d'une coalition (0 pour un agent seul) n'est calculée qu'à sa première
+    rencontre, sans créer d'agent. Seules les coalitions de la structure finale sont
+    instanciées.
+
+    Le nombre de transitions croît en 3^n sans limite de taille, mais reste de
+    l'ordre de 3 millions pour 20 agents en coalitions de 3 au plus ; au-delà de
+    IDP_MAX_TRANSITIONS la formation est abandonnée.
+
+    Args:
+        agents (list): Les agents (Buyer ou Supplier) à regrouper
+        agent_type (str): "buyer" ou "supplier"
+        max_coalition_size (int): Taille maximale d'une coalition (None = sans limite)
+        stats (dict): Si fourni, reçoit "coalition_values" (coalitions évaluées),
+            "subsets_evaluated" (transitions de la programmation dynamique) et "elapsed" (secondes)
+
+    Returns:
+        list: Les coalitions de la structure optimale ; les agents restés seuls n'y figurent pas
+
+    Raises:
+        ValueError: Si la programmation dynamique dépasse IDP_MAX_TRANSITIONS transitions
+    """
+    start = time.perf_counter()
+    n = len(agents)
     if max_coalition_size is None:
-        max_coalition_size = len(agents)
-
-    dp = [[] for _ in range(len(agents) + 1)]
-    dp[0] = []
-
-    for i in range(1, len(agents) + 1):
-        best_value = 0
-        best_structure = []
-
-        for j in range(1, min(i, max_coalition_size) + 1):
-            last_agents = agents[i - j:i]
-
-            if j > 1:
-                coalition_id = f"Coalition_{'_'.join([a.id for a in last_agents])}"
-                if agent_type == "buyer":
-                    last_coalition = BuyerCoalition(coalition_id, last_agents[0].message_board, last_agents)
-                else:
-                    last_coalition = SupplierCoalition(coalition_id, last_agents[0].message_board, last_agents)
-                value = last_coalition.coalition_value
-            else:
-                last_coalition = last_agents[0]
-                value = 0
-
-            if i - j > 0:
-                value += sum(getattr(c, 'coalition_value', 0) for c in dp[i - j])
-
-            if value > best_value:
+        max_coalition_size = n
+    max_coalition_size = max(min(max_coalition_size, n), 1)
+    if max_coalition_size == n and 3 ** max(n - 1, 0) > IDP_MAX_TRANSITIONS:
+        raise ValueError(f"IDP: {n} agents without a coalition size limit exceed {IDP_MAX_TRANSITIONS} "
+                         f"transitions; set max_coalition_size or use the token algorithm")
+
+    values = {}  # masque -> valeur de la coalition, calculée à la première rencontre
+    best = {0: 0}
+    choice = {}
+    evaluated = 0
+
+    def value_of(coalition):
+        value = values.get(coalition)
+        if value is None:
+            members = [agents[i] for i in range(n) if coalition >> i & 1]
+            value = coalition_value(members, agent_type) if len(members) > 1 else 0
+            values[coalition] = value
+        return value
+
+    def coalitions_of(mask):
+        """Coalitions admissibles de mask qui contiennent son plus petit agent."""
+        low = mask & -mask
+        rest = mask ^ low
+        if bin(mask).count("1") <= max_coalition_size:
+            # Tous les sous-masques sont admissibles
+            sub = rest
+            while True:
+                yield sub | low
+                if sub == 0:
+                    return
+                sub = (sub - 1) & rest
+        bits = [1 << i for i in range(n) if rest >> i & 1]
+        for size in range(max_coalition_size):
+            for others in itertools.combinations(bits, size):
+                yield low | sum(others)
+
+    def solve(mask):
+        nonlocal evaluated
+        known = best.get(mask)
+        if known is not None:
+            return known
+        best_value = None
+        for coalition in coalitions_of(mask):
+            evaluated += 1
+            value = value_of(coalition) + solve(mask ^ coalition)
+            if best_value is None or value > best_value:
                 best_value = value
-                if j > 1:
-                    best_structure = dp[i - j] + [last_coalition]
-                else:
-                    best_structure = dp[i - j] + last_agents
-
-        dp[i] = best_structure
-
-    return dp[len(agents)]
-
-def token_based_coalition_formation(agents, agent_type, max_iterations=10):
-    if not agents:
-        return []
-
-    coalitions = []
-    used_pairs = set()
-
-    for _ in range(max_iterations):
-        random.shuffle(agents)
-        for i in range(len(agents) - 1):
-            a1, a2 = agents[i], agents[i + 1]
-            pair = tuple(sorted([a1.id, a2.id]))
-            if pair not in used_pairs:
-                coalition_id = f"Coalition_{'_'.join([a1.id, a2.id])}"
-                if agent_type == "buyer":
-                    new_coalition = BuyerCoalition(coalition_id, a1.message_board, [a1, a2])
-                else:
-                    new_coalition = SupplierCoalition(coalition_id, a1.message_board, [a1, a2])
-                coalitions.append(new_coalition)
-                used_pairs.add(pair)
-
-    return coalitions
\ No newline at end of file
+                choice[mask] = coalition
+        if evaluated > IDP_MAX_TRANSITIONS:
+            raise ValueError(f"IDP: {n} agents in coalitions of up to {max_coalition_size} exceed "
+                             f"{IDP_MAX_TRANSITIONS} transitions; lower max_coalition_size or use the token algorithm")
+        best[mask] = best_value
+        return best_value
+
+    full = (1 << n) - 1
+    solve(full)
+
+    # Reconstruction de la structure optimale
+    groups = []
+    mask = full
+    while mask:
+        coalition = choice[mask]
+        members = [agents[i] for i in range(n) if coalition >> i & 1]
+        if len(members) > 1:
+            groups.append(members)
+        mask ^= coalition
+    coalitions = create_coalitions(groups, agent_type)
+
+    if stats is not None:
+        stats["coalition_values"] = len(values)
+        stats["subsets_evaluated"] = evaluated
+        stats["elapsed"] = time.perf_counter() - start
+    return coalitions
+
+def token_based_coalition_formation(agents, agent_type, max_iterations=10, max_coalition_size=2, seed=None, stats=None):
+    """
+    Formation de coalitions disjointes par circulation d'un jeton.
+
+    Chaque agent commence seul, les coalitions sont disposées en anneau dans un
+    ordre tiré au hasard. À chaque tour, le jeton parcourt l'anneau : la coalition
+    qui le détient propose une fusion à sa voisine, acceptée si la taille reste
+    <= max_coalition_size et si la valeur totale augmente ; sinon le jeton passe à
+    la voisine. Chaque tour coûte O(n) évaluations mémorisées, et la formation
+    s'arrête dès qu'un tour n'apporte plus aucune fusion.
+
+    Args:
+        agents (list): Les agents (Buyer ou Supplier) à regrouper
+        agent_type (str): "buyer" ou "supplier"
+        max_iterations (int): Nombre maximum de tours du jeton
+        max_coalition_size (int): Taille maximale d'une coalition
+        seed (int): Graine de l'ordre initial de l'anneau
+        stats (dict): Si fourni, reçoit "rounds", "tokens_passed", "merges" et "elapsed" (secondes)
+
+    Returns:
+        list: Une partition des agents en coalitions ; les agents restés seuls n'y figurent pas
+    """
+    start = time.perf_counter()
+    ring = [[agent] for agent in agents]
+    random.Random(seed).shuffle(ring)
+
+    def value(members):
+        return coalition_value(members, agent_type) if len(members) > 1 else 0
+
+    rounds = 0
+    tokens_passed = 0
+    merges = 0
+    while ring and rounds < max_iterations:
+        rounds += 1
+        round_merges = 0
+        next_ring = []
+        holder = ring[0]
+        for neighbour in ring[1:]:
+            if len(holder) + len(neighbour) <= max_coalition_size:
+                merged = holder + neighbour
+                if value(merged) > value(holder) + value(neighbour):
+                    holder = merged
+                    round_merges += 1
+                    continue
+            next_ring.append(holder)
+            holder = neighbour
+            tokens_passed += 1
+        next_ring.append(holder)
+        ring = next_ring
+        merges += round_merges
+        if round_merges == 0:
+            break
+
+    if stats is not None:
+        stats["rounds"] = rounds
+        stats["tokens_passed"] = tokens_passed
+        stats["merges"] = merges
+        stats["elapsed"] = time.perf_counter() - start
+    return create_coalitions([members for members in ring if len(members) > 1], agent_type)
+
+
+def create_coalitions(groups, agent_type):
+    """
+    Instancie les agents coalitions d'une structure finale.
+
+    Les algorithmes de formation ne manipulent que des listes de membres et des
+    valeurs mémorisées (coalition_value) : seuls les groupes retenus deviennent des
+    agents, qui s'enregistrent alors comme observateurs du tableau.
+
+    Args:
+        groups (list): Listes de membres, une par coalition
+        agent_type (str): "buyer" ou "supplier"
+
+    Returns:
+        list: Les coalitions, nommées Coalition_B_<n> ou Coalition_S_<n>
+    """
+    coalition_class = BuyerCoalition if agent_type == "buyer" else SupplierCoalition
+    prefix = "B" if agent_type == "buyer" else "S"
+    return [coalition_class(f"Coalition_{prefix}_{i + 1}", members[0].message_board, members)
+            for i, members in enumerate(groups)]
\ No newline at end of file
@@ -0,0 +1,280 @@
+import itertools
+import threading
+
+from buyerCoalition import BuyerCoalition
+from supplierCoalition import SupplierCoalition
+from coalition_value import coalition_value
+
+
+class CoalitionManager:
+    def __init__(self, message_board, agent_type, coalitions=None, singles=None, max_coalition_size=3, start_agents=True, pool=None):
+        """
+        Maintient une structure de coalitions au fil des arrivées et des départs d'agents.
+
+        Seules les coalitions touchées par un changement sont réparées : un nouvel
+        agent rejoint la coalition où son gain marginal est le plus élevé (ou forme
+        une paire avec un agent isolé), un agent retiré quitte sa coalition, dont les
+        agrégats (max_price, min_price, ticket_remaining...) sont mis à jour sur place.
+        Les autres coalitions ne sont jamais redémarrées.
+
+        Un agent seul retiré ou une coalition dissoute ne reçoit plus de nouvelles
+        négociations mais termine celles qui sont en cours : il n'est arrêté et retiré
+        du tableau qu'à l'issue de la dernière (le gestionnaire écoute les issues de
+        négociation). Une coalition d'acheteurs dont les membres changent est replacée
+        dans le carnet d'ordres.
+
+        Le gestionnaire sert aux exécutions longues où des agents arrivent et partent
+        entre deux vagues de négociations (par exemple retire_sold_out entre deux appels
+        à start_negotiations) ; main.py forme les coalitions une seule fois par
+        exécution et ne l'utilise pas.
+
+        Args:
+            message_board (SharedMessageBoard): Le tableau de messages partagé
+            agent_type (str): "buyer" ou "supplier"
+            coalitions (list): Coalitions issues d'une formation initiale
+            singles (list): Agents restés seuls après la formation initiale
+            max_coalition_size (int): Taille maximale d'une coalition
+            start_agents (bool): Démarre les coalitions créées par le gestionnaire et les
+                membres redevenus seuls
+            pool (WorkerPool): Pool sur lequel démarrer ces agents (thread dédié sinon)
+        """
+        self.message_board = message_board
+        self.agent_type = agent_type
+        self.max_coalition_size = max_coalition_size
+        self.start_agents = start_agents
+        self.pool = pool
+        self.coalition_class = BuyerCoalition if agent_type == "buyer" else SupplierCoalition
+        self.prefix = "B" if agent_type == "buyer" else "S"
+        self.coalitions = list(coalitions or [])
+        self.singles = list(singles or [])
+        self.coalition_of = {}  # id_membre -> coalition
+        for coalition in self.coalitions:
+            for member in coalition.members:
+                self.coalition_of[member.id] = coalition
+        self.lock = threading.Lock()  # Protège les coalitions dissoutes (issues reçues depuis les agents)
+        self.retiring = {}  # id_agent -> (agent retiré ou coalition dissoute, négociations encore ouvertes)
+        self.retiring_by_negotiation = {}  # id_negotiation -> ids des agents retirés qui l'attendent
+        message_board.register_outcome_listener(self)
+        self.ids = itertools.count(len(self.coalitions) + 1)
+
+    def value(self, members):
+        """
+        Valeur mémorisée d'un groupe d'agents (0 pour un agent seul).
+
+        Args:
+            members (list): Les membres du groupe
+
+        Returns:
+            float: La valeur du groupe
+        """
+        return coalition_value(members, self.agent_type) if len(members) > 1 else 0
+
+    def add_agent(self, agent):
+        """
+        Intègre un nouvel agent dans la structure.
+
+        Args:
+            agent (Agent): L'agent qui arrive
+
+        Returns:
+            Agent: La coalition qu'il a rejointe ou créée, ou None s'il reste seul
+        """
+        best_gain = 0
+        best_coalition = None
+        for coalition in self.coalitions:
+            if len(coalition.members) < self.max_coalition_size:
+                gain = self.value(coalition.members + [agent]) - coalition.coalition_value
+                if gain > best_gain:
+                    best_gain, best_coalition = gain, coalition
+
+        best_partner = None
+        if self.max_coalition_size >= 2:
+            for single in self.singles:
+                gain = self.value([single, agent])
+                if gain > best_gain:
+                    best_gain, best_partner = gain, single
+
+        if best_partner is not None:
+            self.singles.remove(best_partner)
+            return self._create([best_partner, agent])
+        if best_coalition is not None:
+            self._withdraw(agent)
+            best_coalition.add_member(agent)
+            self.coalition_of[agent.id] = best_coalition
+            self._refresh(best_coalition)
+            return best_coalition
+        self.singles.append(agent)
+        return None
+
+    def retire_agent(self, agent):
+        """
+        Retire un agent de la structure (départ, plus de tickets...).
+
+        Un agent seul cesse de recevoir des négociations et s'arrête une fois les
+        siennes terminées (voir _drain). Une coalition réduite à un seul membre est
+        dissoute de la même façon et le membre restant est réintégré comme un nouvel
+        arrivant ; s'il reste seul, il négocie de nouveau pour lui-même.
+
+        Args:
+            agent (Agent): L'agent qui part
+        """
+        if agent in self.singles:
+            self.singles.remove(agent)
+            self._offer_again(self._drain(agent))
+            return
+        coalition = self.coalition_of.pop(agent.id, None)
+        if coalition is None:
+            return
+        if len(coalition.members) > 2:
+            coalition.remove_member(agent)
+            self._refresh(coalition)
+            return
+
+        unclaimed = self._dissolve(coalition)
+        for member in coalition.members:
+            if member is not agent:
+                self.coalition_of.pop(member.id, None)
+                if self.add_agent(member) is None:
+                    self._activate(member)
+        self._offer_again(unclaimed)
+
+    def retire_sold_out(self):
+        """
+        Retire les fournisseurs qui n'ont plus de tickets à vendre.
+
+        Returns:
+            list: Les fournisseurs retirés
+        """
+        members = self.singles + [m for c in self.coalitions for m in c.members]
+        sold_out = [m for m in members if getattr(m, "ticket_remaining", 1) <= 0]
+        for member in sold_out:
+            self.retire_agent(member)
+        return sold_out
+
+    def _create(self, members):
+        """Instancie (et démarre) une nouvelle coalition."""
+        coalition_id = f"Coalition_{self.prefix}_{next(self.ids)}"
+        while coalition_id in self.message_board.observers_by_id:
+            coalition_id = f"Coalition_{self.prefix}_{next(self.ids)}"
+        for member in members:
+            self._withdraw(member)
+        coalition = self.coalition_class(coalition_id, self.message_board, members)
+        self.coalitions.append(coalition)
+        for member in members:
+            self.coalition_of[member.id] = coalition
+        if self.start_agents:
+            coalition.start(self.pool)
+            matchmaker = self.message_board.matchmaker
+            if matchmaker is not None and coalition.type == "buyer":
+                matchmaker.add_buyers([coalition])
+        return coalition
+
+    def _withdraw(self, agent):
+        """Retire du carnet d'ordres un agent qui rejoint une coalition (elle négocie pour lui)."""
+        matchmaker = self.message_board.matchmaker
+        if matchmaker is not None and agent.type == "buyer":
+            matchmaker.remove_buyer(agent)
+
+    def _refresh(self, coalition):
+        """Replace dans le carnet d'ordres une coalition d'acheteurs dont les membres ont changé."""
+        matchmaker = self.message_board.matchmaker
+        if matchmaker is not None and coalition.type == "buyer":
+            matchmaker.refresh_buyer(coalition)
+
+    def _offer_again(self, negotiations):
+        """Propose de nouveau aux acheteurs les négociations ouvertes qu'un agent retiré n'avait pas prises."""
+        for id_negotiation in negotiations:
+            self.message_board.notify_observers(id_negotiation)
+
+    def _activate(self, agent):
+        """Remet un agent redevenu seul en relation avec le tableau (démarrage, canal ouvert, carnet)."""
+        if not self.start_agents:
+            return
+        if agent.thread is None and agent.pool is None:
+            agent.start(self.pool)
+        else:
+            self.message_board.add_open_observer(agent)
+        matchmaker = self.message_board.matchmaker
+        if matchmaker is not None and agent.type == "buyer":
+            matchmaker.add_buyers([agent])
+
+    def _dissolve(self, coalition):
+        """
+        Dissout une coalition sans abandonner ses négociations en cours (voir _drain).
+
+        Returns:
+            list: Les négociations ouvertes reçues par la coalition mais pas encore prises
+        """
+        self.coalitions.remove(coalition)
+        return self._drain(coalition)
+
+    def _drain(self, agent):
+        """
+        Retire un agent (coalition ou agent seul) sans abandonner ses négociations en cours.
+
+        L'agent quitte le carnet d'ordres et le canal des négociations ouvertes, puis
+        n'est arrêté et retiré du tableau qu'une fois toutes ses négociations ouvertes
+        terminées (tout de suite s'il n'y en a aucune).
+
+        Returns:
+            list: Les négociations ouvertes reçues par l'agent mais pas encore prises,
+                à proposer à d'autres acheteurs
+        """
+        agent.retiring = True
+        self.message_board.remove_open_observer(agent)
+        matchmaker = self.message_board.matchmaker
+        candidates = set(agent.active_negotiations)
+        if matchmaker is not None:
+            matchmaker.remove_buyer(agent)
+            candidates.update(matchmaker.assigned_negotiations(agent))
+        with agent.wakeup:
+            queued = set(agent.negotiations_to_process)
+        unclaimed = [i for i in queued
+                     if i not in candidates and not self.message_board.is_participant(i, agent.id)]
+        candidates.update(queued.difference(unclaimed))
+
+        # Inscrire l'attente avant de consulter le tableau : une issue arrivée entre-temps
+        # est soit déjà visible comme message terminal, soit reçue par on_outcome
+        with self.lock:
+            self.retiring[agent.id] = (agent, candidates)
+            for id_negotiation in candidates:
+                self.retiring_by_negotiation.setdefault(id_negotiation, set()).add(agent.id)
+        for id_negotiation in list(candidates):
+            last = self.message_board.get_last_message(id_negotiation)
+            if last is None or last.is_terminal():
+                self._negotiation_closed(id_negotiation)
+        if not candidates:
+            self._negotiation_closed(None, agent.id)
+        return unclaimed
+
+    def on_outcome(self, message, participants):
+        """
+        Arrête les agents retirés (coalitions dissoutes comprises) dont c'était la dernière
+        négociation ouverte.
+
+        Args:
+            message (Message): Le message terminal
+            participants (set): Les participants de la négociation
+        """
+        if self.retiring_by_negotiation:
+            self._negotiation_closed(message.id_negotiation)
+
+    def _negotiation_closed(self, id_negotiation, agent_id=None):
+        """Retire une négociation de l'attente des agents retirés et arrête ceux qui n'attendent plus rien."""
+        finished = []
+        with self.lock:
+            waiting = self.retiring_by_negotiation.pop(id_negotiation, set())
+            if agent_id is not None:
+                waiting.add(agent_id)
+            for waiting_id in waiting:
+                entry = self.retiring.get(waiting_id)
+                if entry is None:
+                    continue
+                entry[1].discard(id_negotiation)
+                if not entry[1]:
+                    del self.retiring[waiting_id]
+                    finished.append(entry[0])
+        for agent in finished:
+            # Peut être appelé depuis un thread du pool : ne pas attendre l'agent
+            agent.stop(wait=False)
+            self.message_board.unregister_observer(agent)
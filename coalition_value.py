@@ -0,0 +1,81 @@
+from functools import lru_cache
+
+# Taille maximale des mémos de valeurs de coalition
+VALUE_CACHE_SIZE = 1 << 16
+
+
+def buyer_attributes(member):
+    """
+    Attributs d'un acheteur dont dépend la valeur d'une coalition.
+
+    Args:
+        member (Buyer): L'acheteur
+
+    Returns:
+        tuple: (id,) — la valeur ne dépend que du nombre de membres
+    """
+    return (member.id,)
+
+
+def supplier_attributes(member):
+    """
+    Attributs d'un fournisseur dont dépend la valeur d'une coalition.
+
+    Args:
+        member (Supplier): Le fournisseur
+
+    Returns:
+        tuple: (id, prix minimum, stratégie)
+    """
+    return (member.id, member.min_price, member.strategy_type)
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def buyer_coalition_value(members):
+    """
+    Valeur d'une coalition d'acheteurs.
+
+    Args:
+        members (frozenset): Attributs des membres (voir buyer_attributes)
+
+    Returns:
+        float: La valeur de la coalition
+    """
+    base_value = len(members) * 10
+    return base_value * (1 + 0.05 * len(members))
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def supplier_coalition_value(members):
+    """
+    Valeur d'une coalition de fournisseurs.
+
+    Args:
+        members (frozenset): Attributs des membres (voir supplier_attributes)
+
+    Returns:
+        float: La valeur de la coalition
+    """
+    min_prices = [min_price for _, min_price, _ in members]
+    base_value = len(members) * 15
+    price_range = max(min_prices) - min(min_prices)
+    diversity_factor = 1 + (price_range / 1000)
+    strategies_count = len(set(strategy for _, _, strategy in members))
+    strategy_factor = 1 + (strategies_count / len(members)) * 0.2
+    return base_value * diversity_factor * strategy_factor
+
+
+def coalition_value(members, agent_type):
+    """
+    Valeur d'une coalition calculée à partir de ses membres, sans créer d'agent coalition.
+
+    Args:
+        members (list): Les agents membres
+        agent_type (str): "buyer" ou "supplier"
+
+    Returns:
+        float: La valeur de la coalition (mémorisée par ensemble de membres)
+    """
+    if agent_type == "buyer":
+        return buyer_coalition_value(frozenset(buyer_attributes(m) for m in members))
+    return supplier_coalition_value(frozenset(supplier_attributes(m) for m in members))
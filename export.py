@@ -0,0 +1,179 @@
+import os
+from array import array
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from message import STATES
+from message_store import ColumnarMessageStore
+
+# Nombre de messages par RecordBatch / groupe de lignes Parquet
+EXPORT_BATCH_SIZE = 1 << 16
+
+# Les chaînes répétées (émetteur, compagnie, type, état) sont codées par dictionnaire
+_STRINGS = pa.dictionary(pa.int32(), pa.string())
+
+MESSAGE_SCHEMA = pa.schema([
+    ("id_negotiation", pa.int64()),
+    ("sender", _STRINGS),
+    ("type", _STRINGS),
+    ("message_number", pa.int32()),
+    ("price", pa.float64()),
+    ("state", _STRINGS),
+    ("message_remaining", pa.int32()),
+    ("company", _STRINGS),
+])
+
+
+class _SymbolTable:
+    def __init__(self, symbols=()):
+        """Table chaîne -> code qui grandit d'un lot à l'autre (les dictionnaires Arrow restent compatibles)."""
+        self.symbols = list(symbols)
+        self.codes = {symbol: code for code, symbol in enumerate(self.symbols)}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.symbols)
+            self.symbols.append(value)
+        return code
+
+    def encode(self, codes):
+        return pa.DictionaryArray.from_arrays(pa.array(codes, pa.int32()), pa.array(self.symbols, pa.string()))
+
+
+def _iter_object_batches(message_board, batch_size):
+    """Lots de messages lus comme objets Message (tableau en defaultdict(list))."""
+    senders, types, companies = _SymbolTable(), _SymbolTable(), _SymbolTable()
+    states = _SymbolTable(STATES)
+    columns = [array("q"), array("i"), array("i"), array("i"), array("d"), array("i"), array("i"), array("i")]
+    for id_negotiation in sorted(message_board.messages.keys()):
+        for message in message_board.get_all_messages(id_negotiation):
+            columns[0].append(id_negotiation)
+            columns[1].append(senders.code(message.id))
+            columns[2].append(types.code(message.type))
+            columns[3].append(message.message_number)
+            columns[4].append(message.price)
+            columns[5].append(states.code(message.state))
+            columns[6].append(message.message_remaining)
+            columns[7].append(companies.code(message.company))
+            if len(columns[0]) >= batch_size:
+                yield _object_batch(columns, senders, types, states, companies)
+                columns = [array(column.typecode) for column in columns]
+    if columns[0]:
+        yield _object_batch(columns, senders, types, states, companies)
+
+
+def _object_batch(columns, senders, types, states, companies):
+    return pa.record_batch([
+        pa.array(columns[0], pa.int64()),
+        senders.encode(columns[1]),
+        types.encode(columns[2]),
+        pa.array(columns[3], pa.int32()),
+        pa.array(columns[4], pa.float64()),
+        states.encode(columns[5]),
+        pa.array(columns[6], pa.int32()),
+        companies.encode(columns[7]),
+    ], schema=MESSAGE_SCHEMA)
+
+
+def _zero_copy(column, arrow_type):
+    """Vue Arrow sur une colonne array, sans copie."""
+    return pa.Array.from_buffers(arrow_type, len(column), [None, pa.py_buffer(column)])
+
+
+def _iter_columnar_batches(store, batch_size):
+    """
+    Lots de messages lus directement dans les colonnes d'un ColumnarMessageStore,
+    sans reconstruire d'objet Message.
+    """
+    with store.lock:
+        # Instantané des colonnes (les ajouts concurrents ne sont pas exportés)
+        count = len(store.price)
+        price = _zero_copy(store.price[:count], pa.float64())
+        message_number = _zero_copy(store.message_number[:count], pa.int32())
+        message_remaining = _zero_copy(store.message_remaining[:count], pa.int32())
+        state = _zero_copy(store.state[:count], pa.uint8()).cast(pa.int32())
+        type_code = _zero_copy(store.type[:count], pa.uint32()).cast(pa.int32())
+        sender = _zero_copy(store.sender[:count], pa.uint32()).cast(pa.int32())
+        company = _zero_copy(store.company[:count], pa.uint32()).cast(pa.int32())
+        symbols = pa.array(store.symbols, pa.string())
+    states = pa.array(STATES, pa.string())
+
+    # Lignes dans l'ordre des négociations puis des messages, comme le tableau les renvoie
+    rows = array("I")
+    negotiation_ids = array("q")
+    for id_negotiation in sorted(store.keys()):
+        log_rows = [row for row in store[id_negotiation].ordered_rows() if row < count]
+        rows.extend(log_rows)
+        negotiation_ids.extend([id_negotiation] * len(log_rows))
+
+    for start in range(0, len(rows), batch_size):
+        indices = _zero_copy(rows[start:start + batch_size], pa.uint32())
+        yield pa.record_batch([
+            _zero_copy(negotiation_ids[start:start + batch_size], pa.int64()),
+            pa.DictionaryArray.from_arrays(sender.take(indices), symbols),
+            pa.DictionaryArray.from_arrays(type_code.take(indices), symbols),
+            message_number.take(indices),
+            price.take(indices),
+            pa.DictionaryArray.from_arrays(state.take(indices), states),
+            message_remaining.take(indices),
+            pa.DictionaryArray.from_arrays(company.take(indices), symbols),
+        ], schema=MESSAGE_SCHEMA)
+
+
+def iter_message_batches(message_board, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Parcourt tous les messages d'un tableau par lots de colonnes typées (MESSAGE_SCHEMA).
+
+    Args:
+        message_board (SharedMessageBoard): Le tableau à exporter
+        batch_size (int): Nombre de messages par lot
+
+    Yields:
+        pyarrow.RecordBatch: Les messages, triés par négociation puis par numéro de message
+    """
+    if isinstance(message_board.messages, ColumnarMessageStore):
+        return _iter_columnar_batches(message_board.messages, batch_size)
+    return _iter_object_batches(message_board, batch_size)
+
+
+def export_messages(message_board, filename="messages.parquet", format=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Exporte l'historique complet des messages dans ./result, en Parquet ou Arrow IPC.
+
+    Les messages sont écrits lot par lot : l'export ne garde jamais plus d'un lot en
+    mémoire (en plus du tableau lui-même). Le fichier se relit par exemple avec
+    pyarrow.parquet.read_table(path) ou pyarrow.ipc.open_file(pyarrow.memory_map(path)).
+
+    Args:
+        message_board (SharedMessageBoard): Le tableau à exporter
+        filename (str): Nom du fichier dans ./result
+        format (str): "parquet" ou "arrow" (déduit de l'extension si None : .arrow, .feather, .ipc)
+        batch_size (int): Nombre de messages par lot
+
+    Returns:
+        int: Nombre de messages exportés
+    """
+    if format is None:
+        format = "arrow" if os.path.splitext(filename)[1] in (".arrow", ".feather", ".ipc") else "parquet"
+    if format not in ("parquet", "arrow"):
+        raise ValueError(f"Unknown export format: {format}")
+
+    output_dir = "./result"
+    os.makedirs(output_dir, exist_ok=True)
+    full_path = os.path.join(output_dir, filename)
+
+    count = 0
+    if format == "parquet":
+        writer = pq.ParquetWriter(full_path, MESSAGE_SCHEMA)
+    else:
+        writer = pa.ipc.new_file(full_path, MESSAGE_SCHEMA, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+    try:
+        for batch in iter_message_batches(message_board, batch_size):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    finally:
+        writer.close()
+    print(f"{count} messages exportés dans {full_path}")
+    return count
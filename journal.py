@@ -0,0 +1,271 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+from message import Message
+from shared_board import SharedMessageBoard
+
+# En-tête du fichier : signature + version du format
+JOURNAL_MAGIC = b"NEGJ\x01"
+
+# Enregistrements (petit-boutiste, sans alignement). Les chaînes (émetteur, type,
+# compagnie, agent) sont écrites une seule fois dans un enregistrement SYMBOL puis
+# désignées par leur code.
+SYMBOL = ord("S")  # code, longueur, octets UTF-8
+MESSAGE = ord("M")  # négociation, émetteur, type, état, numéro, restants, prix, compagnie
+PARTICIPANT = ord("P")  # négociation, agent, acheteur ?
+SYMBOL_RECORD = struct.Struct("<BIH")
+MESSAGE_RECORD = struct.Struct("<BqIIIiidI")
+PARTICIPANT_RECORD = struct.Struct("<BqIB")
+
+# Délai maximal entre deux écritures groupées, en secondes
+FLUSH_INTERVAL = 0.005
+
+
+class MessageJournal:
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL, fsync=False, synchronous=False):
+        """
+        Journal binaire append-only (write-ahead) des opérations d'un SharedMessageBoard.
+
+        Les enregistrements sont encodés en mémoire puis écrits par un thread dédié
+        en une seule écriture par lot (group commit), au plus tard flush_interval
+        secondes après leur ajout.
+
+        Args:
+            path (str): Chemin du fichier journal (ajout en fin si le fichier existe)
+            flush_interval (float): Délai maximal avant l'écriture d'un lot, en secondes
+            fsync (bool): Force l'écriture sur disque (os.fsync) à chaque lot
+            synchronous (bool): add_message attend que son lot soit écrit (durable
+                à son retour, au prix de la latence d'un lot)
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.synchronous = synchronous
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.symbol_codes = {} if new_file else _recover(path)
+        self.file = open(path, "ab")
+        if new_file:
+            self.file.write(JOURNAL_MAGIC)
+            self.file.flush()
+        self.lock = threading.Condition()
+        self.pending = bytearray()
+        self.appended = 0  # Nombre d'enregistrements ajoutés
+        self.written = 0  # Nombre d'enregistrements déjà écrits dans le fichier
+        self.running = True
+        self.flusher = threading.Thread(target=self._flush_loop, name="journal-flusher", daemon=True)
+        self.flusher.start()
+
+    def _symbol(self, value, out):
+        """Code d'une chaîne ; l'enregistrement SYMBOL est ajouté à out à la première occurrence (verrou tenu)."""
+        code = self.symbol_codes.get(value)
+        if code is None:
+            code = self.symbol_codes[value] = len(self.symbol_codes)
+            data = str(value).encode("utf-8")
+            out += SYMBOL_RECORD.pack(SYMBOL, code, len(data))
+            out += data
+        return code
+
+    def record_message(self, message):
+        """
+        Journalise un message ajouté au tableau.
+
+        Args:
+            message (Message): Le message ajouté
+
+        Returns:
+            int: Numéro de l'enregistrement (voir wait_written)
+        """
+        with self.lock:
+            out = self.pending
+            out += MESSAGE_RECORD.pack(
+                MESSAGE, message.id_negotiation, self._symbol(message.id, out), self._symbol(message.type, out),
+                self._symbol(message.state, out), message.message_number, message.message_remaining,
+                message.price, self._symbol(message.company, out))
+            return self._appended()
+
+    def record_participant(self, id_negotiation, agent_id, is_buyer):
+        """
+        Journalise l'inscription d'un participant à une négociation.
+
+        Args:
+            id_negotiation (int): L'identifiant de la négociation
+            agent_id (str): L'identifiant de l'agent
+            is_buyer (bool): L'agent est un acheteur
+
+        Returns:
+            int: Numéro de l'enregistrement (voir wait_written)
+        """
+        with self.lock:
+            out = self.pending
+            out += PARTICIPANT_RECORD.pack(PARTICIPANT, id_negotiation, self._symbol(agent_id, out), is_buyer)
+            return self._appended()
+
+    def _appended(self):
+        """Compte un enregistrement et réveille le thread d'écriture (verrou tenu)."""
+        self.appended += 1
+        self.lock.notify_all()
+        return self.appended
+
+    def wait_written(self, ticket):
+        """
+        Attend que l'enregistrement de numéro ticket soit écrit dans le fichier.
+
+        Args:
+            ticket (int): Valeur renvoyée par record_message ou record_participant
+        """
+        with self.lock:
+            while self.written < ticket and self.running:
+                self.lock.wait()
+
+    def _flush_loop(self):
+        """Boucle du thread d'écriture : un write() (et éventuellement un fsync) par lot."""
+        while True:
+            with self.lock:
+                while self.running and not self.pending:
+                    self.lock.wait()
+                if not self.running and not self.pending:
+                    return
+            # Laisser les autres threads compléter le lot avant de l'écrire
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Écrit immédiatement les enregistrements en attente."""
+        with self.lock:
+            data, self.pending = self.pending, bytearray()
+            ticket = self.appended
+            # L'écriture se fait sous le verrou pour garder l'ordre des lots
+            if data:
+                self.file.write(data)
+                self.file.flush()
+                if self.fsync:
+                    os.fsync(self.file.fileno())
+            self.written = ticket
+            self.lock.notify_all()
+
+    def close(self):
+        """Écrit les enregistrements en attente, arrête le thread d'écriture et ferme le fichier."""
+        with self.lock:
+            self.running = False
+            self.lock.notify_all()
+        self.flusher.join()
+        self.flush()
+        self.file.close()
+
+
+def _iter_records(data):
+    """
+    Décode les enregistrements d'un journal.
+
+    Un enregistrement incomplet en fin de fichier (arrêt brutal pendant une
+    écriture) est ignoré.
+
+    Args:
+        data (bytes | mmap.mmap): Le contenu du journal
+
+    Yields:
+        tuple: (type d'enregistrement, champs décodés, position de fin de l'enregistrement)
+    """
+    if data[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+        raise ValueError("Not a negotiation journal")
+    offset = len(JOURNAL_MAGIC)
+    size = len(data)
+    message_unpack, message_size = MESSAGE_RECORD.unpack_from, MESSAGE_RECORD.size
+    while offset < size:
+        kind = data[offset]
+        if kind == MESSAGE:
+            if offset + message_size > size:
+                return
+            offset += message_size
+            yield kind, message_unpack(data, offset - message_size), offset
+        elif kind == PARTICIPANT:
+            if offset + PARTICIPANT_RECORD.size > size:
+                return
+            offset += PARTICIPANT_RECORD.size
+            yield kind, PARTICIPANT_RECORD.unpack_from(data, offset - PARTICIPANT_RECORD.size), offset
+        elif kind == SYMBOL:
+            if offset + SYMBOL_RECORD.size > size:
+                return
+            _, code, length = SYMBOL_RECORD.unpack_from(data, offset)
+            start = offset + SYMBOL_RECORD.size
+            if start + length > size:
+                return
+            offset = start + length
+            yield kind, (code, bytes(data[start:offset]).decode("utf-8")), offset
+        else:
+            raise ValueError(f"Corrupted journal: unknown record {kind!r} at offset {offset}")
+
+
+def _recover(path):
+    """
+    Prépare un journal existant pour y ajouter des enregistrements : relit sa table
+    de symboles et tronque un éventuel enregistrement incomplet en fin de fichier.
+
+    Returns:
+        dict: Table chaîne -> code du journal
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    symbol_codes = {}
+    end = len(JOURNAL_MAGIC)
+    for kind, fields, end in _iter_records(data):
+        if kind == SYMBOL:
+            code, value = fields
+            symbol_codes[value] = code
+    if end < len(data):
+        with open(path, "r+b") as file:
+            file.truncate(end)
+    return symbol_codes
+
+
+def replay_journal(path, columnar=False, use_mmap=True):
+    """
+    Reconstruit l'état d'un SharedMessageBoard à partir de son journal, sans agent.
+
+    Les messages sont rangés avec la même logique d'insertion que add_message et
+    les participants (ainsi que les négociations ayant un acheteur) sont restaurés ;
+    aucun observateur n'est notifié. Le compteur de négociations reprend après le
+    plus grand identifiant rencontré.
+
+    Args:
+        path (str): Chemin du fichier journal
+        columnar (bool): Reconstruit un tableau en colonnes (ColumnarMessageStore)
+        use_mmap (bool): Lit le journal par projection mémoire plutôt qu'en un seul read()
+
+    Returns:
+        SharedMessageBoard: Le tableau reconstruit
+    """
+    board = SharedMessageBoard(columnar=columnar)
+    symbols = {}
+    max_id = 0
+    with open(path, "rb") as file:
+        if use_mmap and os.path.getsize(path) > 0:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = file.read()
+        try:
+            for kind, fields, _ in _iter_records(data):
+                if kind == MESSAGE:
+                    _, id_negotiation, sender, msg_type, state, number, remaining, price, company = fields
+                    board.store_message(Message(
+                        msg_type=symbols[msg_type], sender_id=symbols[sender], id_negotiation=id_negotiation,
+                        price=price, state=symbols[state], message_number=number,
+                        message_remaining=remaining, company=symbols[company]))
+                elif kind == PARTICIPANT:
+                    _, id_negotiation, agent, is_buyer = fields
+                    board.negotiation_participants[id_negotiation].add(symbols[agent])
+                    if is_buyer:
+                        board.buyer_negotiations.add(id_negotiation)
+                else:
+                    code, value = fields
+                    symbols[code] = value
+                    continue
+                max_id = max(max_id, id_negotiation)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+    board.negotiation_id_counter = max_id
+    return board
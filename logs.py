@@ -0,0 +1,109 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Niveau plus fin que DEBUG : un enregistrement par message envoyé
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+# Racine de tous les journaux du système de négociation
+ROOT_LOGGER = "negotiation"
+
+# Champs structurés acceptés dans extra=...
+FIELDS = ("agent", "negotiation", "price", "state")
+
+_listener = None
+
+
+def get_logger(name):
+    """
+    Retourne le logger d'un composant (agent, board, main...).
+
+    Tant que setup_logging n'a pas été appelé, seuls les avertissements et les
+    erreurs sont émis : les appels aux niveaux inférieurs ne coûtent qu'un test
+    de niveau, sans formatage ni entrée-sortie.
+
+    Args:
+        name (str): Nom du composant
+
+    Returns:
+        logging.Logger: Le logger "negotiation.<name>"
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        """Une ligne JSON par enregistrement, avec les champs structurés présents."""
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for field in FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level=logging.INFO, trace=False, structured=False, stream=None, filename=None):
+    """
+    Active les journaux du système de négociation derrière une file.
+
+    Les threads des agents ne font que déposer leurs enregistrements dans une
+    queue.Queue (QueueHandler) ; un QueueListener les formate et les écrit depuis
+    son propre thread. Un nouvel appel remplace la configuration précédente.
+
+    Args:
+        level (int): Niveau minimal (logging.INFO par défaut)
+        trace (bool): Active en plus la trace de chaque message envoyé (niveau TRACE)
+        structured (bool): Écrit des lignes JSON (voir JsonFormatter) au lieu du texte seul
+        stream: Flux de sortie (sys.stdout par défaut, sauf si filename est donné)
+        filename (str): Fichier de sortie
+
+    Returns:
+        logging.handlers.QueueListener: L'écouteur démarré
+    """
+    global _listener
+    shutdown_logging()
+
+    formatter = JsonFormatter() if structured else logging.Formatter("%(message)s")
+    handlers = []
+    if filename is not None:
+        handlers.append(logging.FileHandler(filename))
+    if stream is not None or filename is None:
+        handlers.append(logging.StreamHandler(stream or sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    root.setLevel(TRACE if trace else level)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Vide la file, arrête l'écouteur et revient à la configuration par défaut (silencieuse)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = []
+    root.setLevel(logging.NOTSET)
+    root.propagate = True
+
+
+atexit.register(shutdown_logging)
@@ -1,222 +1,429 @@
+import asyncio
 import time
+from concurrent.futures import wait
 import csv
 import uuid
 import random
 
-from coalition import form_buyer_coalitions, form_supplier_coalitions, idp_coalition_formation, token_based_coalition_formation
+from coalition import (IDP_MAX_COALITION_SIZE, form_buyer_coalitions, form_supplier_coalitions, idp_coalition_formation,
+                       token_based_coalition_formation)
 from shared_board import SharedMessageBoard
 from supplier import Supplier
 from buyer import Buyer
-from buyerCoalition import BuyerCoalition
-from output import save_summary_to_csv, save_summary_to_html, save_summary_to_html_bis
-from supplierCoalition import SupplierCoalition
+from output import save_summary_to_csv, save_summary_to_html, save_summary_to_html_bis, wait_for_reports
+from simulation import NegotiationSimulator
+from async_runtime import run_async_negotiations
+from outcome_sink import OutcomeSink
+from logs import get_logger, setup_logging
+from metrics import NegotiationMetrics, save_metrics
+from matchmaking import MatchmakingBook
+from worker_pool import WorkerPool
+from timer_wheel import NegotiationDeadlines
 
+logger = get_logger("main")
 
-def run_single_negotiation():
-    message_board = SharedMessageBoard()
+
+def run_single_negotiation(verbose=True):
+    """
+    Exécute une négociation entre un fournisseur et un acheteur.
+
+    Args:
+        verbose (bool): Affiche les agents et les messages échangés
+
+    Returns:
+        dict: Résultats de l'exécution (voir collect_results)
+    """
+    metrics = NegotiationMetrics()
+    message_board = SharedMessageBoard(metrics=metrics)
+    sink = OutcomeSink(message_board)
 
     # Création des agents
     supplier = Supplier("supplier_1", message_board, first_price=1000, min_price=500, company="CompanyX", ticket_remaining=3)
     buyer = Buyer("buyer_1", message_board, first_price=300, max_price=600, favourite_companies=["CompanyX"], worst_companies=[], blocked_companies=[])
 
-    supplier.start()
-    buyer.start()
+    # Les deux agents partagent un pool de deux threads
+    pool = WorkerPool(max_workers=2)
+    supplier.start(pool)
+    buyer.start(pool)
 
     # Affichage des infos
-    print("Supplier Information:")
-    print(f"Supplier ID: {supplier.id}")
-    print(f"Min Price: {supplier.min_price}")
-    print(f"Company: {supplier.company}")
-    print(f"Tickets Remaining: {supplier.ticket_remaining}")
-    print("Buyer Information:")
-    print(f"Buyer ID: {buyer.id}")
-    print(f"Max Price: {buyer.max_price}")
-    print(f"Favorite Companies: {', '.join(buyer.favourite_companies)}")
-    print(f"Worst Companies: {', '.join(buyer.worst_companies)}")
-    print(f"Blocked Companies: {', '.join(buyer.blocked_companies) if buyer.blocked_companies else 'None'}")
-    print("------")
-    print("Starting negotiation...")
+    if verbose:
+        print("Supplier Information:")
+        print(f"Supplier ID: {supplier.id}")
+        print(f"Min Price: {supplier.min_price}")
+        print(f"Company: {supplier.company}")
+        print(f"Tickets Remaining: {supplier.ticket_remaining}")
+        print("Buyer Information:")
+        print(f"Buyer ID: {buyer.id}")
+        print(f"Max Price: {buyer.max_price}")
+        print(f"Favorite Companies: {', '.join(buyer.favourite_companies)}")
+        print(f"Worst Companies: {', '.join(buyer.worst_companies)}")
+        print(f"Blocked Companies: {', '.join(buyer.blocked_companies) if buyer.blocked_companies else 'None'}")
+        print("------")
+        print("Starting negotiation...")
 
     # Lancer la négociation
-    negotiation_id = supplier.start_negotiation()
+    start = time.perf_counter()
+    future = supplier.start_negotiation()
+    negotiation_id = future.id_negotiation
 
-    # Attendre la fin de la négociation
+    # Attendre la fin de la négociation (accord, abandon ou plus de messages)
     try:
-        while True:
-            last_msg = message_board.get_last_message(negotiation_id)
-            if last_msg and last_msg.state in ["accepted", "aborted"]:
-                break
-            time.sleep(0.5)
+        future.result()
     except KeyboardInterrupt:
         print("Negotiation interrupted by user")
+    elapsed = time.perf_counter() - start
 
-    # Arrêt des threads
+    # Arrêt des agents puis du pool
     supplier.stop()
     buyer.stop()
+    pool.shutdown()
 
     # Récupération des messages
-    print("\nSummary:")
-    messages = message_board.get_all_messages(negotiation_id)
-    for msg in messages:
-        print(f"  {msg}")
+    if verbose:
+        print("\nSummary:")
+        messages = message_board.get_all_messages(negotiation_id)
+        for msg in messages:
+            print(f"  {msg}")
 
-   
-        
+    return collect_results([negotiation_id], sink, metrics, elapsed)
 
 
-def run_multiple_negotiations(num_suppliers, num_buyers, negotiations_per_supplier):
+def collect_results(negotiations, sink, metrics, elapsed, coalition_formation_time=None):
     """
-    Exécute plusieurs négociations entre plusieurs fournisseurs et acheteurs.
+    Rassemble les résultats d'une exécution (valeur de retour des fonctions run_*).
+
+    Args:
+        negotiations (list): Les identifiants des négociations ouvertes
+        sink (OutcomeSink): Le collecteur de résultats de l'exécution
+        metrics (NegotiationMetrics): Les mesures de l'exécution
+        elapsed (float): Durée des négociations (de la première ouverture à la fin), en secondes
+        coalition_formation_time (float): Durée de formation des coalitions, en secondes
+
+    Returns:
+        dict: summary (OutcomeSink.summary), elapsed, negotiations_per_second,
+            coalition_formation_time et metrics (NegotiationMetrics.snapshot)
+    """
+    summary = sink.summary(total=len(negotiations))
+    return {
+        "summary": summary,
+        "elapsed": elapsed,
+        "negotiations_per_second": summary["total"] / elapsed if elapsed > 0 else 0,
+        "coalition_formation_time": coalition_formation_time,
+        "metrics": metrics.snapshot(),
+    }
+
+
+def print_metrics(metrics):
+    """
+    Affiche les principales mesures de latence et de débit d'une exécution.
+
+    Args:
+        metrics (NegotiationMetrics): Les mesures de l'exécution
+    """
+    snapshot = metrics.snapshot()
+    print(f"  Throughput: {snapshot['negotiations_per_second']:.1f} negotiations/s, {snapshot['messages_per_second']:.1f} messages/s")
+    for name in ["time_to_first_counter", "round_latency", "negotiation_duration", "lock_wait"]:
+        histogram = snapshot[name]
+        print(f"  {name}: p50 {histogram['p50'] * 1000:.3f} ms, p99 {histogram['p99'] * 1000:.3f} ms ({histogram['count']} samples)")
+
+
+def agent_strategy(strategy, index, alternative):
+    """
+    Stratégie d'un agent selon son indice.
+
+    Args:
+        strategy (str): Nom de la stratégie, ou "mixed" pour alterner entre alternative
+            (indices pairs) et "default"
+        index (int): Indice de l'agent
+        alternative (str): Stratégie des agents d'indice pair en mode "mixed"
+
+    Returns:
+        str: La stratégie de l'agent
+    """
+    if strategy == "mixed":
+        return alternative if index % 2 == 0 else "default"
+    return strategy
+
+
+def create_agents(message_board, num_suppliers, num_buyers, supplier_strategy="mixed", buyer_strategy="default"):
+    """
+    Crée les fournisseurs et les acheteurs d'une expérience.
+
+    Le fournisseur i a un prix minimum de 300 + 50 i et vend pour la compagnie Company{i} ;
+    l'acheteur i a un prix maximum de 600 + 50 i, préfère Company{i} et classe
+    Company{i+1} parmi ses pires compagnies.
 
     Args:
+        message_board (SharedMessageBoard): Le tableau de messages partagé
         num_suppliers (int): Nombre de fournisseurs
         num_buyers (int): Nombre d'acheteurs
-        negotiations_per_supplier (int): Nombre de négociations par fournisseur
-    """
-    # Créer le tableau de messages partagé
-    message_board = SharedMessageBoard()
+        supplier_strategy (str): Stratégie des fournisseurs ("mixed" alterne "conciliatory" et "default")
+        buyer_strategy (str): Stratégie des acheteurs ("mixed" alterne "aggressive" et "default")
 
-    # Créer les fournisseurs avec différentes stratégies
+    Returns:
+        tuple: (fournisseurs, acheteurs)
+    """
     suppliers = []
     for i in range(num_suppliers):
-        strategy = "conciliatory" if i % 2 == 0 else "default"
         min_price = 300 + (i * 50)  # Différents prix minimums
-        supplier = Supplier(f"supplier_{i}", message_board, first_price=min_price * 5, min_price=min_price, strategy_type=strategy, company=f"Company{i}", ticket_remaining=5)
-        suppliers.append(supplier)
-
-    # Afficher les informations des fournisseurs
-    print("Suppliers Information:")
-    for supplier in suppliers:
-        print(f"Supplier ID: {supplier.id}")
-        print(f"Min Price: {supplier.min_price}")
-        print(f"Company: {supplier.company}")
-        print(f"Tickets Remaining: {supplier.ticket_remaining}")
-        print(f"Strategy: {supplier.strategy_type}")
-        print("------")
-
-    # Créer les acheteurs avec différentes stratégies
+        suppliers.append(Supplier(f"supplier_{i}", message_board, first_price=min_price * 5, min_price=min_price,
+                                  strategy_type=agent_strategy(supplier_strategy, i, "conciliatory"),
+                                  company=f"Company{i}", ticket_remaining=5))
     buyers = []
     for i in range(num_buyers):
-        strategy = "default" if i % 2 == 0 else "default"
         max_price = 600 + (i * 50)  # Différents prix maximums
-        buyer = Buyer(f"buyer_{i}", message_board, first_price=max_price*0.5, max_price=max_price, strategy_type=strategy, favourite_companies=[f"Company{i}"], worst_companies=[f"Company{(i+1)%num_suppliers}"], blocked_companies=None)
-        buyers.append(buyer)
+        buyers.append(Buyer(f"buyer_{i}", message_board, first_price=max_price * 0.5, max_price=max_price,
+                            strategy_type=agent_strategy(buyer_strategy, i, "aggressive"),
+                            favourite_companies=[f"Company{i}"],
+                            worst_companies=[f"Company{(i + 1) % num_suppliers}"],
+                            blocked_companies=[]))
+    return suppliers, buyers
 
-    # Afficher les informations des acheteurs
-    print("Buyers Information:")
-    for buyer in buyers:
-        print(f"Buyer ID: {buyer.id}")
-        print(f"Max Price: {buyer.max_price}")
-        print(f"Favorite Companies: {', '.join(buyer.favourite_companies)}")
-        print(f"Worst Companies: {', '.join(buyer.worst_companies)}")
-        print(f"Blocked Companies: {', '.join(buyer.blocked_companies) if buyer.blocked_companies else 'None'}")
-        print(f"Strategy: {buyer.strategy_type}")
-        print("------")
 
+def form_coalitions(agents, agent_type, coalition_algo, max_coalition_size=None, seed=None, verbose=False):
+    """
+    Forme les coalitions d'un type d'agents avec l'algorithme demandé.
+
+    Args:
+        agents (list): Les agents à regrouper
+        agent_type (str): "buyer" ou "supplier"
+        coalition_algo (str): "coupling", "idp" ou "token"
+        max_coalition_size (int): Taille maximale d'une coalition (None = taille par défaut :
+            3 acheteurs ou 2 fournisseurs en couplage, IDP_MAX_COALITION_SIZE pour IDP, 2 avec les jetons)
+        seed (int): Graine de l'anneau de jetons
+        verbose (bool): Affiche les statistiques de formation (IDP et jetons)
+
+    Returns:
+        tuple: (coalitions, agents restés seuls)
+    """
+    label = "buyers" if agent_type == "buyer" else "suppliers"
+    if coalition_algo == "coupling":
+        if agent_type == "buyer":
+            return form_buyer_coalitions(agents, max_coalition_size=max_coalition_size or 3)
+        return form_supplier_coalitions(agents, max_coalition_size=max_coalition_size or 2)
+    stats = {}
+    if coalition_algo == "idp":
+        coalitions = idp_coalition_formation(agents, agent_type=agent_type,
+                                             max_coalition_size=max_coalition_size or IDP_MAX_COALITION_SIZE,
+                                             stats=stats)
+        if verbose:
+            print(f"IDP ({label}): {stats['subsets_evaluated']} subsets evaluated in {stats['elapsed']:.3f} s")
+    elif coalition_algo == "token":
+        coalitions = token_based_coalition_formation(agents, agent_type=agent_type,
+                                                     max_coalition_size=max_coalition_size or 2, seed=seed, stats=stats)
+        if verbose:
+            print(f"Token ({label}): {stats['rounds']} rounds, {stats['tokens_passed']} tokens passed in {stats['elapsed']:.3f} s")
+    else:
+        return [], agents
+    members = {member.id for coalition in coalitions for member in coalition.members}
+    return coalitions, [agent for agent in agents if agent.id not in members]
+
+
+def run_threaded_negotiations(message_board, suppliers, buyers, negotiations_per_supplier, pool=None, deadline=None, timeout=10):
+    """
+    Démarre les agents, ouvre les négociations et attend leur fin.
+
+    Args:
+        message_board (SharedMessageBoard): Le tableau de messages partagé
+        suppliers (list): Les fournisseurs qui ouvrent les négociations
+        buyers (list): Les acheteurs
+        negotiations_per_supplier (int): Nombre de négociations par fournisseur
+        pool (WorkerPool): Pool qui exécute les agents (un thread par agent si None)
+        deadline (float): Délai maximal d'une négociation avant abandon automatique, en secondes
+        timeout (float): Durée maximale d'attente de l'ensemble des négociations, en secondes
+
+    Returns:
+        list: Les identifiants des négociations ouvertes
+    """
+    deadlines = NegotiationDeadlines(message_board, deadline) if deadline is not None else None
 
     # Démarrer tous les agents
     for agent in suppliers + buyers:
-        agent.start()
+        agent.start(pool)
 
-    # Démarrer les négociations
-    negotiations = []
-    for supplier in suppliers:
-        for _ in range(negotiations_per_supplier):
-            id_negotiation = supplier.start_negotiation()
-            negotiations.append(id_negotiation)
-            time.sleep(0.2)
+    # Démarrer toutes les négociations d'un coup, une transaction du tableau par fournisseur :
+    # chaque agent garde un état par négociation
+    futures = [future
+               for supplier in suppliers
+               for future in supplier.start_negotiations(negotiations_per_supplier)]
+    negotiations = [future.id_negotiation for future in futures]
 
-    # Nouvelle logique pour attendre la fin des négociations
+    # Attendre les futures : retour dès que la dernière négociation se termine
     try:
-        start_time = time.time()
-        timeout = 10  # 10 secondes de timeout maximum
-        active_negotiations = set(negotiations)
-        
-        while active_negotiations and (time.time() - start_time) < timeout:
-            completed = set()
-            for id_negotiation in active_negotiations:
-                last_message = message_board.get_last_message(id_negotiation)
-                if not last_message:
-                    continue
-                    
-                if last_message.state in ["accepted", "aborted"] or last_message.message_remaining <= 0:
-                    completed.add(id_negotiation)
-                    
-            active_negotiations -= completed
-            if active_negotiations:
-                print(f"Remaining negotiations: {len(active_negotiations)}")
-                time.sleep(0.5)
-                
-        if active_negotiations:
-            print(f"Timeout reached, {len(active_negotiations)} negotiations didn't complete")
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            print(f"Timeout reached, {len(not_done)} negotiations didn't complete")
     except KeyboardInterrupt:
         print("Negotiations interrupted by user")
+    finally:
+        if deadlines is not None:
+            deadlines.close()
 
     # Arrêter tous les agents
     for agent in suppliers + buyers:
         agent.stop()
 
-    # Calculer des statistiques
-    accepted_count = 0
-    aborted_count = 0
-    final_prices = []
+    return negotiations
+
+
+def run_negotiations(engine, message_board, suppliers, buyers, negotiations_per_supplier, seed=None, matchmaking=True,
+                     deadline=None):
+    """
+    Ouvre les négociations des fournisseurs et attend leur fin avec le moteur demandé.
+
+    Args:
+        engine (str): "pool" (agents exécutés par un WorkerPool borné), "threaded" (un thread
+            par agent), "asyncio" (une coroutine par agent) ou "simulated" (moteur à
+            événements discrets)
+        message_board (SharedMessageBoard): Le tableau de messages partagé
+        suppliers (list): Les fournisseurs (ou coalitions) qui ouvrent les négociations
+        buyers (list): Les acheteurs (ou coalitions)
+        negotiations_per_supplier (int): Nombre de négociations par fournisseur
+        seed (int): Graine du moteur simulé pour des résultats reproductibles
+        matchmaking (bool): Chaque négociation ouverte est attribuée à un seul acheteur par
+            un carnet d'ordres (MatchmakingBook) au lieu d'être proposée à tous les acheteurs
+        deadline (float): Délai maximal d'une négociation avant abandon automatique, en secondes
+            (moteurs "pool" et "threaded")
+
+    Returns:
+        list: Les identifiants des négociations ouvertes
+    """
+    if matchmaking:
+        MatchmakingBook(message_board).add_buyers(buyers)
+
+    if engine == "simulated":
+        # Comme les autres moteurs, toutes les négociations sont ouvertes d'un coup
+        # puis se déroulent en parallèle (en temps simulé), sans thread ni attente
+        simulator = NegotiationSimulator(message_board, suppliers + buyers, seed=seed)
+        negotiations = [future.id_negotiation
+                        for supplier in suppliers
+                        for future in supplier.start_negotiations(negotiations_per_supplier)]
+        simulator.run()
+        return negotiations
+    if engine == "asyncio":
+        return asyncio.run(run_async_negotiations(message_board, suppliers, buyers, negotiations_per_supplier,
+                                                  matchmaking=matchmaking))
+    if engine == "pool":
+        with WorkerPool() as pool:
+            return run_threaded_negotiations(message_board, suppliers, buyers, negotiations_per_supplier,
+                                             pool=pool, deadline=deadline)
+    return run_threaded_negotiations(message_board, suppliers, buyers, negotiations_per_supplier, deadline=deadline)
+
+
+def run_multiple_negotiations(num_suppliers, num_buyers, negotiations_per_supplier, engine="pool", seed=None,
+                              verbose=True, save_reports=True, matchmaking=True, deadline=5,
+                              supplier_strategy="mixed", buyer_strategy="default"):
+    """
+    Exécute plusieurs négociations entre plusieurs fournisseurs et acheteurs.
+
+    Args:
+        num_suppliers (int): Nombre de fournisseurs
+        num_buyers (int): Nombre d'acheteurs
+        negotiations_per_supplier (int): Nombre de négociations par fournisseur
+        engine (str): Moteur d'exécution : "pool", "threaded", "asyncio" ou "simulated"
+            (voir run_negotiations)
+        seed (int): Graine du moteur simulé pour des résultats reproductibles
+        verbose (bool): Affiche le résumé et les mesures
+        matchmaking (bool): Attribue les négociations aux acheteurs par carnet d'ordres (voir run_negotiations)
+        deadline (float): Délai maximal d'une négociation avant abandon automatique (voir run_negotiations)
+        save_reports (bool): Écrit les rapports (CSV, HTML, mesures JSON) dans ./result
+        supplier_strategy (str): Stratégie des fournisseurs (voir create_agents)
+        buyer_strategy (str): Stratégie des acheteurs (voir create_agents)
+
+    Returns:
+        dict: Résultats de l'exécution (voir collect_results)
+    """
+    # Créer le tableau de messages partagé, les mesures et le collecteur de résultats
+    metrics = NegotiationMetrics()
+    message_board = SharedMessageBoard(metrics=metrics)
+    sink = OutcomeSink(message_board)
+
+    # Créer les fournisseurs et les acheteurs avec différentes stratégies
+    suppliers, buyers = create_agents(message_board, num_suppliers, num_buyers, supplier_strategy, buyer_strategy)
 
-    for id_negotiation in negotiations:
-        messages = message_board.get_all_messages(id_negotiation)
-        if not messages:
-            continue
+    # Afficher les informations des fournisseurs
+    logger.info("Suppliers Information:")
+    for supplier in suppliers:
+        logger.info("Supplier ID: %s\nMin Price: %s\nCompany: %s\nTickets Remaining: %s\nStrategy: %s\n------",
+                    supplier.id, supplier.min_price, supplier.company, supplier.ticket_remaining, supplier.strategy_type)
+
+    # Afficher les informations des acheteurs
+    logger.info("Buyers Information:")
+    for buyer in buyers:
+        logger.info("Buyer ID: %s\nMax Price: %s\nFavorite Companies: %s\nWorst Companies: %s\nBlocked Companies: %s\nStrategy: %s\n------",
+                    buyer.id, buyer.max_price, ', '.join(buyer.favourite_companies), ', '.join(buyer.worst_companies),
+                    ', '.join(buyer.blocked_companies) if buyer.blocked_companies else 'None', buyer.strategy_type)
+
+
+    start = time.perf_counter()
+    negotiations = run_negotiations(engine, message_board, suppliers, buyers, negotiations_per_supplier,
+                                    seed=seed, matchmaking=matchmaking, deadline=deadline)
+    elapsed = time.perf_counter() - start
 
-        last_message = messages[-1]
-        if last_message.state == "accepted":
-            accepted_count += 1
-            final_prices.append(last_message.price)
-        else:
-            aborted_count += 1
+    # Statistiques tenues à jour par le sink pendant l'exécution
+    results = collect_results(negotiations, sink, metrics, elapsed)
+    summary = results["summary"]
 
     # Afficher les résultats
-    print("\nNegotiations complete. Summary:")
-    print(f"  Total negotiations: {len(negotiations)}")
-    print(f"  Accepted: {accepted_count} ({accepted_count/len(negotiations)*100:.1f}%)")
-    print(f"  Aborted: {aborted_count} ({aborted_count/len(negotiations)*100:.1f}%)")
-
-    if final_prices:
-        avg_price = sum(final_prices) / len(final_prices)
-        print(f"  Average final price: {avg_price:.2f}")
-        print(f"  Min price: {min(final_prices):.2f}")
-        print(f"  Max price: {max(final_prices):.2f}")
-    
-    # Save summary to CSV
-    save_summary_to_csv(negotiations, message_board, filename="multiple_negotiation_summary.csv")
+    if verbose:
+        print("\nNegotiations complete. Summary:")
+        print(f"  Total negotiations: {summary['total']}")
+        print(f"  Accepted: {summary['accepted']} ({summary['accepted']/summary['total']*100:.1f}%)")
+        print(f"  Aborted: {summary['aborted']} ({summary['aborted']/summary['total']*100:.1f}%)")
 
-    # Appel de la fonction pour générer le fichier HTML
-    save_summary_to_html_bis(negotiations, message_board, buyers, suppliers, filename="multiple_negotiation_summary.html")
+        if summary["accepted"]:
+            print(f"  Average final price: {summary['average_price']:.2f}")
+            print(f"  Min price: {summary['min_price']:.2f}")
+            print(f"  Max price: {summary['max_price']:.2f}")
 
+        print_metrics(metrics)
 
+    if save_reports:
+        save_metrics(metrics, filename="multiple_negotiation_metrics.json")
 
+        # Save summary to CSV
+        save_summary_to_csv(negotiations, sink, filename="multiple_negotiation_summary.csv")
 
-def run_multiple_negotiations_with_coalitions(num_suppliers, num_buyers, negotiations_per_supplier, coalition_algo="coupling", coalition_type="buyers", filename="coalition_analysis.html"):
-    message_board = SharedMessageBoard()
+        # Appel de la fonction pour générer le fichier HTML
+        save_summary_to_html_bis(negotiations, sink, filename="multiple_negotiation_summary.html", page_size=100)
 
-    # --- Fournisseurs ---
-    suppliers = []
-    for i in range(num_suppliers):
-        strategy = "conciliatory" if i % 2 == 0 else "default"
-        min_price = 300 + (i * 50)
-        supplier = Supplier(f"supplier_{i}", message_board, first_price=min_price * 5, min_price=min_price,
-                            strategy_type=strategy, company=f"Company{i}", ticket_remaining=5)
-        suppliers.append(supplier)
+    return results
 
-    # --- Acheteurs ---
-    buyers = []
-    for i in range(num_buyers):
-        strategy = "aggressive" if i % 2 == 0 else "default"
-        max_price = 600 + (i * 50)
-        buyer = Buyer(f"buyer_{i}", message_board, first_price=max_price * 0.5, max_price=max_price,
-                      strategy_type=strategy,
-                      favourite_companies=[f"Company{i}"],
-                      worst_companies=[f"Company{(i + 1) % num_suppliers}"],
-                      blocked_companies=[])
-        buyers.append(buyer)
+
+def run_multiple_negotiations_with_coalitions(num_suppliers, num_buyers, negotiations_per_supplier, coalition_algo="coupling", coalition_type="buyers", filename="coalition_analysis.html",
+                                              engine="pool", seed=None, verbose=True, save_reports=True, matchmaking=True,
+                                              deadline=5, supplier_strategy="mixed", buyer_strategy="mixed",
+                                              max_coalition_size=None):
+    """
+    Forme des coalitions d'acheteurs et/ou de fournisseurs puis exécute leurs négociations.
+
+    Args:
+        num_suppliers (int): Nombre de fournisseurs
+        num_buyers (int): Nombre d'acheteurs
+        negotiations_per_supplier (int): Nombre de négociations par fournisseur (ou coalition)
+        coalition_algo (str): "coupling", "idp" ou "token"
+        coalition_type (str): "buyers", "suppliers" ou "both"
+        filename (str): Nom du rapport HTML dans ./result
+        engine (str): Moteur d'exécution (voir run_negotiations)
+        seed (int): Graine du moteur simulé et de l'anneau de jetons
+        verbose (bool): Affiche les statistiques de formation, le résumé et les mesures
+        matchmaking (bool): Attribue les négociations aux acheteurs par carnet d'ordres (voir run_negotiations)
+        deadline (float): Délai maximal d'une négociation avant abandon automatique (voir run_negotiations)
+        save_reports (bool): Écrit les rapports (CSV, HTML, mesures JSON) dans ./result
+        supplier_strategy (str): Stratégie des fournisseurs (voir create_agents)
+        buyer_strategy (str): Stratégie des acheteurs (voir create_agents)
+        max_coalition_size (int): Taille maximale d'une coalition (voir form_coalitions)
+
+    Returns:
+        dict: Résultats de l'exécution (voir collect_results), avec en plus le nombre
+            de coalitions formées (buyer_coalitions, supplier_coalitions)
+    """
+    metrics = NegotiationMetrics()
+    message_board = SharedMessageBoard(metrics=metrics)
+    sink = OutcomeSink(message_board)
+
+    suppliers, buyers = create_agents(message_board, num_suppliers, num_buyers, supplier_strategy, buyer_strategy)
 
     supplier_coalitions = []
     buyer_coalitions = []
@@ -224,89 +431,50 @@ def run_multiple_negotiations_with_coalitions(num_suppliers, num_buyers, negotia
     remaining_buyers = buyers
 
     # --- Formations de coalitions ---
+    formation_start = time.perf_counter()
     if coalition_type in ["buyers", "both"]:
-        if coalition_algo == "coupling":
-            buyer_coalitions, remaining_buyers = form_buyer_coalitions(buyers, max_coalition_size=3)
-        elif coalition_algo == "idp":
-            buyer_coalitions = idp_coalition_formation(buyers, agent_type="buyer")
-            remaining_buyers = [b for b in buyers if not any(b in c.members for c in buyer_coalitions)]
-        elif coalition_algo == "token":
-            buyer_coalitions = token_based_coalition_formation(buyers, agent_type="buyer")
-            remaining_buyers = [b for b in buyers if not any(b in c.members for c in buyer_coalitions)]
-        buyer_coalitions = [BuyerCoalition(f"Coalition_B_{i}", message_board, c.members) for i, c in enumerate(buyer_coalitions)]
-
+        buyer_coalitions, remaining_buyers = form_coalitions(buyers, "buyer", coalition_algo, max_coalition_size,
+                                                             seed=seed, verbose=verbose)
     if coalition_type in ["suppliers", "both"]:
-        if coalition_algo == "coupling":
-            supplier_coalitions, remaining_suppliers = form_supplier_coalitions(suppliers, max_coalition_size=2)
-        elif coalition_algo == "idp":
-            supplier_coalitions = idp_coalition_formation(suppliers, agent_type="supplier")
-            remaining_suppliers = [s for s in suppliers if not any(s in c.members for c in supplier_coalitions)]
-        elif coalition_algo == "token":
-            supplier_coalitions = token_based_coalition_formation(suppliers, agent_type="supplier")
-            remaining_suppliers = [s for s in suppliers if not any(s in c.members for c in supplier_coalitions)]
-        supplier_coalitions = [SupplierCoalition(f"Coalition_S_{i}", message_board, c.members) for i, c in enumerate(supplier_coalitions)]
-
-    # --- Démarrer les agents ---
-    all_agents = remaining_suppliers + supplier_coalitions + remaining_buyers + buyer_coalitions
-    for agent in all_agents:
-        agent.start()
-
-    # --- Démarrer les négociations ---
-    negotiations = []
-    for supplier in remaining_suppliers + supplier_coalitions:
-        for _ in range(negotiations_per_supplier):
-            negotiation_id = supplier.start_negotiation()
-            negotiations.append(negotiation_id)
-            time.sleep(0.2)
-
-    # --- Attendre la fin ---
-    try:
-        timeout = 10
-        start_time = time.time()
-        active = set(negotiations)
-
-        while active and (time.time() - start_time < timeout):
-            finished = {n for n in active if (
-                (msg := message_board.get_last_message(n)) and
-                msg.state in ["accepted", "aborted"]
-            )}
-            active -= finished
-            time.sleep(0.5)
-    except KeyboardInterrupt:
-        print("Interruption")
+        supplier_coalitions, remaining_suppliers = form_coalitions(suppliers, "supplier", coalition_algo,
+                                                                   max_coalition_size, seed=seed, verbose=verbose)
+    coalition_formation_time = time.perf_counter() - formation_start
 
-    # --- Arrêter les agents ---
-    for agent in all_agents:
-        agent.stop()
+    # --- Négociations ---
+    start = time.perf_counter()
+    negotiations = run_negotiations(engine, message_board, remaining_suppliers + supplier_coalitions,
+                                    remaining_buyers + buyer_coalitions, negotiations_per_supplier,
+                                    seed=seed, matchmaking=matchmaking, deadline=deadline)
+    elapsed = time.perf_counter() - start
 
     # --- Résumé ---
-    accepted = 0
-    aborted = 0
-    final_prices = []
-
-    for id_neg in negotiations:
-        messages = message_board.get_all_messages(id_neg)
-        if messages:
-            last_msg = messages[-1]
-            if last_msg.state == "accepted":
-                accepted += 1
-                final_prices.append(last_msg.price)
-            else:
-                aborted += 1
-
-    print("\nRésultats des négociations :")
-    print(f"  Total : {len(negotiations)}")
-    print(f"  Acceptées : {accepted}")
-    print(f"  Abandonnées : {aborted}")
-    if final_prices:
-        print(f"  Prix moyen : {sum(final_prices)/len(final_prices):.2f}")
-
-    save_summary_to_csv(negotiations, message_board,filename="multiple_negotiation_coalition_summary.csv")
-    save_summary_to_html(negotiations, message_board, buyers, suppliers, filename)
+    results = collect_results(negotiations, sink, metrics, elapsed, coalition_formation_time)
+    results["buyer_coalitions"] = len(buyer_coalitions)
+    results["supplier_coalitions"] = len(supplier_coalitions)
+    summary = results["summary"]
+
+    if verbose:
+        print("\nRésultats des négociations :")
+        print(f"  Total : {summary['total']}")
+        print(f"  Acceptées : {summary['accepted']}")
+        print(f"  Abandonnées : {summary['aborted']}")
+        if summary["accepted"]:
+            print(f"  Prix moyen : {summary['average_price']:.2f}")
+        print(f"  Formation des coalitions : {coalition_formation_time:.3f} s")
+        print_metrics(metrics)
+
+    if save_reports:
+        save_metrics(metrics, filename=filename.rsplit(".", 1)[0] + "_metrics.json")
+        save_summary_to_csv(negotiations, sink, filename="multiple_negotiation_coalition_summary.csv")
+        save_summary_to_html(negotiations, sink, buyers, suppliers, filename)
+
+    return results
 
 
 # --- Lancer les expériences ---
 if __name__ == "__main__":
+    # Journaux des agents sur la console ; setup_logging(trace=True) ajoute chaque message envoyé
+    setup_logging()
 
     print("=== Running a single negotiation ===")
     run_single_negotiation()
@@ -324,4 +492,7 @@ if __name__ == "__main__":
 
     print("\n=== Négociations avec coalitions acheteurs et fournisseurs ===")
     run_multiple_negotiations_with_coalitions(num_suppliers=10, num_buyers=8, negotiations_per_supplier=10,
-                                              coalition_algo="idp", coalition_type="both", filename="coalition_analysis_both.html")
\ No newline at end of file
+                                              coalition_algo="idp", coalition_type="both", filename="coalition_analysis_both.html")
+
+    # Les rapports avec graphiques sont rendus en arrière-plan pendant les expériences
+    wait_for_reports()
\ No newline at end of file
@@ -0,0 +1,293 @@
+import heapq
+import threading
+from collections import deque
+
+
+class MatchmakingBook:
+    def __init__(self, message_board, capacity=None):
+        """
+        Carnet d'ordres des acheteurs : attribue chaque négociation ouverte à un seul
+        acheteur compatible, au lieu de prévenir tous les acheteurs qui se disputent
+        ensuite la place.
+
+        Les acheteurs disponibles sont rangés dans des tas indexés par compagnie pour ceux
+        qui la préfèrent et ceux qui la classent parmi leurs pires, et dans un tas par
+        ensemble de compagnies exclues (bloquées ou parmi les pires) pour les autres : un
+        acheteur n'a d'entrées que dans les tas de ses propres listes, et un changement
+        de charge ne touche que celles-ci. Une négociation est donnée en priorité à un
+        acheteur qui préfère la compagnie du fournisseur (s'il n'est pas plus chargé que
+        les autres), sinon à un acheteur qui l'accepte, un acheteur qui la classe parmi
+        ses pires n'étant retenu qu'en dernier recours ; un acheteur qui la bloque n'est
+        jamais examiné. Dans chaque tas, le moins chargé passe en premier, puis le plus
+        offrant.
+
+        Un acheteur plein (capacity atteinte) sort du carnet et y revient quand l'une de
+        ses négociations se termine ; les négociations sans acheteur compatible attendent,
+        par compagnie, dans l'ordre d'ouverture. Un acheteur dont les listes de compagnies
+        changent (coalition) doit être réinscrit par add_buyers.
+
+        Le carnet s'enregistre sur le tableau (message_board.matchmaker) et comme
+        écouteur des issues de négociation.
+
+        Args:
+            message_board (SharedMessageBoard): Le tableau de messages partagé
+            capacity (int): Nombre maximum de négociations simultanées par acheteur
+                (None = illimité, la charge servant seulement à répartir les négociations)
+        """
+        self.message_board = message_board
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.buyers = {}  # id_acheteur -> acheteur inscrit
+        self.load = {}  # id_acheteur -> nombre de négociations en cours
+        self.entries = {}  # id_acheteur -> entrée valide dans les tas (acheteurs disponibles seulement)
+        self.sequence = 0  # Départage les acheteurs de même charge et même prix dans l'ordre d'arrivée
+        self.favourites = {}  # compagnie -> tas des acheteurs qui la préfèrent
+        self.groups = {}  # compagnies exclues (frozenset) -> tas des acheteurs qui excluent exactement celles-ci
+        self.worst = {}  # compagnie -> tas des acheteurs qui la classent parmi leurs pires
+        self.assignments = {}  # id_negotiation -> acheteur attribué
+        self.waiting = {}  # compagnie -> deque des négociations en attente d'un acheteur
+        self.waiting_ids = set()
+        message_board.matchmaker = self
+        message_board.register_outcome_listener(self)
+
+    def add_buyers(self, buyers):
+        """
+        Inscrit (ou réinscrit) des acheteurs ou coalitions d'acheteurs dans le carnet ;
+        leurs négociations leur sont désormais attribuées par le carnet, ils quittent
+        donc le canal des négociations ouvertes du tableau.
+
+        Args:
+            buyers (list): Les acheteurs à inscrire
+        """
+        for buyer in buyers:
+            self.message_board.remove_open_observer(buyer)
+        with self.lock:
+            for buyer in buyers:
+                self.buyers[buyer.id] = buyer
+                self.load.setdefault(buyer.id, 0)
+                self._refresh(buyer)
+        self._assign_waiting()
+
+    def remove_buyer(self, buyer):
+        """
+        Retire un acheteur du carnet ; ses négociations en cours continuent.
+
+        Args:
+            buyer (Agent): L'acheteur à retirer
+        """
+        with self.lock:
+            if self.buyers.get(buyer.id) is buyer:
+                del self.buyers[buyer.id]
+                self.entries.pop(buyer.id, None)
+
+    def refresh_buyer(self, buyer):
+        """
+        Replace un acheteur inscrit dont les listes de compagnies ont changé (membres
+        d'une coalition) ; sans effet s'il n'est pas inscrit.
+
+        Args:
+            buyer (Agent): L'acheteur à replacer
+        """
+        with self.lock:
+            if self.buyers.get(buyer.id) is not buyer:
+                return
+            self._refresh(buyer)
+        self._assign_waiting()
+
+    def assigned_negotiations(self, buyer):
+        """
+        Négociations attribuées à un acheteur et pas encore terminées.
+
+        Args:
+            buyer (Agent): L'acheteur
+
+        Returns:
+            list: Les identifiants de ces négociations
+        """
+        with self.lock:
+            return [i for i, assigned in self.assignments.items() if assigned is buyer]
+
+    @staticmethod
+    def _accepts(buyer, company):
+        """Vrai si la compagnie n'est ni bloquée ni parmi les pires de l'acheteur."""
+        return company not in buyer.blocked_companies and company not in buyer.worst_companies
+
+    @staticmethod
+    def _not_blocked(buyer, company):
+        """Vrai si l'acheteur ne bloque pas la compagnie."""
+        return company not in buyer.blocked_companies
+
+    def _refresh(self, buyer):
+        """
+        Replace un acheteur inscrit dans les tas selon sa charge actuelle, ou l'en retire
+        s'il est plein (verrou tenu) ; ses anciennes entrées deviennent caduques.
+        """
+        if self.capacity is not None and self.load[buyer.id] >= self.capacity:
+            self.entries.pop(buyer.id, None)
+            return
+        entry = (self.load[buyer.id], -buyer.max_price, self.sequence, buyer)
+        self.sequence += 1
+        self.entries[buyer.id] = entry
+        blocked = buyer.blocked_companies
+        for company in buyer.favourite_companies:
+            if company not in blocked:
+                self._push(self.favourites.setdefault(company, []), entry)
+        for company in buyer.worst_companies:
+            if company not in blocked:
+                self._push(self.worst.setdefault(company, []), entry)
+        excluded = frozenset(blocked).union(buyer.worst_companies)
+        self._push(self.groups.setdefault(excluded, []), entry)
+
+    def _push(self, heap, entry):
+        """
+        Ajoute une entrée à un tas (verrou tenu). Un tas rarement consulté accumule des
+        entrées caduques : il est compacté quand il dépasse deux fois le nombre d'acheteurs.
+        """
+        heapq.heappush(heap, entry)
+        if len(heap) > 2 * len(self.buyers) + 64:
+            heap[:] = [e for e in heap if self._is_valid(e)]
+            heapq.heapify(heap)
+
+    def _is_valid(self, entry):
+        """Vrai si l'entrée est l'entrée courante d'un acheteur disponible (verrou tenu)."""
+        return self.entries.get(entry[3].id) is entry
+
+    def _peek_valid(self, heap, company, accepts):
+        """
+        Meilleure entrée valide d'un tas dont l'acheteur vérifie accepts (verrou tenu).
+
+        Les entrées caduques sont jetées ; les entrées valides écartées (listes de
+        compagnies modifiées depuis l'inscription) sont remises dans le tas, comme
+        l'entrée retournée, qui deviendra caduque quand l'acheteur sera replacé.
+        """
+        skipped = []
+        chosen = None
+        while heap:
+            entry = heapq.heappop(heap)
+            if not self._is_valid(entry):
+                continue
+            skipped.append(entry)
+            if accepts(entry[3], company):
+                chosen = entry
+                break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return chosen
+
+    def _peek_compatible(self, company):
+        """
+        Meilleure entrée valide parmi les groupes d'acheteurs qui n'excluent pas la
+        compagnie (verrou tenu) ; les groupes vidés sont supprimés.
+        """
+        best = None
+        emptied = []
+        for excluded, heap in self.groups.items():
+            if company in excluded:
+                continue
+            entry = self._peek_valid(heap, company, self._accepts)
+            if entry is None:
+                if not heap:
+                    emptied.append(excluded)
+            elif best is None or entry < best:
+                best = entry
+        for excluded in emptied:
+            del self.groups[excluded]
+        return best
+
+    def _pop_best(self, company):
+        """
+        Choisit le meilleur acheteur disponible pour une compagnie (verrou tenu).
+
+        Returns:
+            Agent: L'acheteur choisi, ou None si aucun acheteur compatible n'est disponible
+        """
+        favourite = self._peek_valid(self.favourites.get(company, []), company, self._not_blocked)
+        compatible = self._peek_compatible(company)
+        # Un acheteur qui préfère la compagnie passe devant, sauf s'il est plus chargé
+        if favourite is not None and (compatible is None or favourite[0] <= compatible[0]):
+            return favourite[3]
+        if compatible is not None:
+            return compatible[3]
+        worst = self._peek_valid(self.worst.get(company, []), company, self._not_blocked)
+        return worst[3] if worst is not None else None
+
+    def _take(self, buyer, id_negotiation):
+        """Attribue une négociation à un acheteur et met à jour sa place dans le carnet (verrou tenu)."""
+        self.assignments[id_negotiation] = buyer
+        self.load[buyer.id] += 1
+        self._refresh(buyer)
+
+    def assign(self, id_negotiation, company):
+        """
+        Attribue une négociation ouverte à un acheteur et l'inscrit comme participant
+        (appelé par notify_observers tant que la négociation n'a pas d'acheteur).
+
+        Args:
+            id_negotiation (int): L'identifiant de la négociation
+            company (str): La compagnie du fournisseur qui l'a ouverte
+
+        Returns:
+            Agent: L'acheteur attribué, ou None si la négociation attend un acheteur
+        """
+        with self.lock:
+            buyer = self.assignments.get(id_negotiation)
+            if buyer is not None:
+                return buyer
+            if id_negotiation in self.waiting_ids:
+                return None
+            buyer = self._pop_best(company) if self.entries else None
+            if buyer is None:
+                self.waiting.setdefault(company, deque()).append(id_negotiation)
+                self.waiting_ids.add(id_negotiation)
+                return None
+            self._take(buyer, id_negotiation)
+        self.message_board.register_participant(id_negotiation, buyer.id)
+        return buyer
+
+    def on_outcome(self, message, participants):
+        """
+        Libère l'acheteur d'une négociation terminée et lui confie si possible une
+        négociation en attente.
+
+        Args:
+            message (Message): Le message terminal
+            participants (set): Les participants de la négociation
+        """
+        with self.lock:
+            self.waiting_ids.discard(message.id_negotiation)
+            buyer = self.assignments.pop(message.id_negotiation, None)
+            if buyer is None:
+                return
+            self.load[buyer.id] -= 1
+            if self.buyers.get(buyer.id) is buyer:
+                self._refresh(buyer)
+            if not self.waiting:
+                return
+        self._assign_waiting()
+
+    def _assign_waiting(self):
+        """
+        Attribue les négociations en attente tant que des acheteurs compatibles sont
+        disponibles ; une compagnie sans acheteur compatible est passée d'un bloc.
+        """
+        assigned = []
+        with self.lock:
+            for company in list(self.waiting):
+                queue = self.waiting[company]
+                while queue and self.entries:
+                    id_negotiation = queue[0]
+                    if id_negotiation not in self.waiting_ids:
+                        queue.popleft()
+                        continue
+                    buyer = self._pop_best(company)
+                    if buyer is None:
+                        break
+                    queue.popleft()
+                    self.waiting_ids.discard(id_negotiation)
+                    self._take(buyer, id_negotiation)
+                    assigned.append((id_negotiation, buyer))
+                if not queue:
+                    del self.waiting[company]
+        for id_negotiation, buyer in assigned:
+            self.message_board.register_participant(id_negotiation, buyer.id)
+            self.message_board.notify_agent(buyer, id_negotiation)
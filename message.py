@@ -1,11 +1,25 @@
+import sys
+
+# États possibles d'un message ; l'indice sert de code compact (tableaux, stockage)
+STATES = ("processing", "accepted", "aborted")
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+# Types d'émetteurs d'un message, codés de la même manière ("system" : abandon automatique à l'échéance)
+TYPES = ("supplier", "buyer", "system")
+TYPE_CODES = {msg_type: code for code, msg_type in enumerate(TYPES)}
+
 
 class Message:
+    # Pas de __dict__ par instance : les longues simulations gardent des millions de messages
+    __slots__ = ("type", "id", "message_number", "id_negotiation", "price", "message_remaining", "state", "company")
+
     def __init__(self, msg_type, sender_id, id_negotiation, price, state="processing", message_number=0, message_remaining=10, company=""):
         """
         Initialise un message dans le système de négociation.
 
         Args:
-            msg_type (str): Type de l'agent émetteur ("supplier" ou "buyer")
+            msg_type (str): Type de l'agent émetteur ("supplier" ou "buyer", "system" pour
+                les messages postés par le système, voir timer_wheel.NegotiationDeadlines)
             sender_id (str): Identifiant unique de l'agent émetteur
             id_negotiation (str): Identifiant unique de la négociation
             price (float): Prix proposé dans le message
@@ -14,15 +28,34 @@ class Message:
             message_remaining (int): Nombre de messages restants avant annulation
             company (str): Nom de la compagnie du fournisseur
         """
-        self.type = msg_type
+        self.type = sys.intern(msg_type)
         self.id = sender_id
         self.message_number = message_number
         self.id_negotiation = id_negotiation
         self.price = price
         self.message_remaining = message_remaining
-        self.state = state
+        self.state = sys.intern(state)
         self.company = company
-        
+
+    def is_terminal(self):
+        """
+        Indique si ce message termine sa négociation.
+
+        Returns:
+            bool: True si le message est accepté, annulé ou s'il ne reste plus de messages
+        """
+        return self.state == "accepted" or self.state == "aborted" or self.message_remaining <= 0
+
+    def outcome(self):
+        """
+        Issue de la négociation si ce message en est le dernier.
+
+        Returns:
+            str: "accepted", "aborted", "timeout" (plus de messages) ou "processing"
+        """
+        if self.state != "processing":
+            return self.state
+        return "timeout" if self.message_remaining <= 0 else "processing"
 
     def __str__(self):
         """Représentation textuelle du message pour le débogage."""
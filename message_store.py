@@ -0,0 +1,209 @@
+import threading
+from array import array
+from operator import attrgetter
+
+from message import Message, STATES, STATE_CODES
+
+
+class ColumnarMessageStore:
+    def __init__(self):
+        """
+        Stockage en colonnes des messages de toutes les négociations.
+
+        Chaque champ numérique est une colonne array partagée par toutes les
+        négociations ; les chaînes (émetteur, compagnie, type) sont remplacées par un
+        code dans une table de symboles. Chaque négociation ne garde qu'un tableau
+        d'indices de lignes. Les objets Message ne sont reconstruits qu'à la lecture.
+
+        S'utilise comme le defaultdict(list) du SharedMessageBoard :
+        store[id_negotiation] renvoie (et crée au besoin) le journal de la négociation.
+        """
+        self.lock = threading.Lock()  # Protège l'ajout d'une ligne dans toutes les colonnes
+        self.price = array("d")
+        self.message_number = array("i")
+        self.message_remaining = array("i")
+        self.state = array("B")  # Indice dans message.STATES
+        self.type = array("I")  # Code dans la table de symboles
+        self.sender = array("I")
+        self.company = array("I")
+        self.symbols = []  # Code -> chaîne
+        self.symbol_codes = {}  # Chaîne -> code
+        self.logs = {}  # id_negotiation -> ColumnarNegotiationLog
+
+    def symbol(self, value):
+        """
+        Retourne le code d'une chaîne, en l'ajoutant à la table si nécessaire.
+
+        Args:
+            value (str): La chaîne à coder
+
+        Returns:
+            int: Le code de la chaîne
+        """
+        code = self.symbol_codes.get(value)
+        if code is None:
+            with self.lock:
+                code = self.symbol_codes.get(value)
+                if code is None:
+                    code = len(self.symbols)
+                    self.symbols.append(value)
+                    self.symbol_codes[value] = code
+        return code
+
+    def append_row(self, message):
+        """
+        Ajoute un message dans les colonnes.
+
+        Args:
+            message (Message): Le message à stocker
+
+        Returns:
+            int: L'indice de la ligne créée
+        """
+        type_code = self.symbol(message.type)
+        sender_code = self.symbol(message.id)
+        company_code = self.symbol(message.company)
+        with self.lock:
+            row = len(self.price)
+            self.price.append(message.price)
+            self.message_number.append(message.message_number)
+            self.message_remaining.append(message.message_remaining)
+            self.state.append(STATE_CODES[message.state])
+            self.type.append(type_code)
+            self.sender.append(sender_code)
+            self.company.append(company_code)
+        return row
+
+    def materialize(self, id_negotiation, row):
+        """
+        Reconstruit le Message stocké à une ligne.
+
+        Args:
+            id_negotiation (str): L'identifiant de la négociation du message
+            row (int): L'indice de la ligne
+
+        Returns:
+            Message: Le message reconstruit
+        """
+        symbols = self.symbols
+        return Message(
+            msg_type=symbols[self.type[row]],
+            sender_id=symbols[self.sender[row]],
+            id_negotiation=id_negotiation,
+            price=self.price[row],
+            state=STATES[self.state[row]],
+            message_number=self.message_number[row],
+            message_remaining=self.message_remaining[row],
+            company=symbols[self.company[row]],
+        )
+
+    def __getitem__(self, id_negotiation):
+        log = self.logs.get(id_negotiation)
+        if log is None:
+            log = self.logs.setdefault(id_negotiation, ColumnarNegotiationLog(self, id_negotiation))
+        return log
+
+    def get(self, id_negotiation, default=None):
+        return self.logs.get(id_negotiation, default)
+
+    def __contains__(self, id_negotiation):
+        return id_negotiation in self.logs
+
+    def __iter__(self):
+        return iter(self.logs)
+
+    def __len__(self):
+        return len(self.logs)
+
+    def keys(self):
+        return self.logs.keys()
+
+    def items(self):
+        return self.logs.items()
+
+    def values(self):
+        return self.logs.values()
+
+
+class NegotiationLog(list):
+    __slots__ = ("ordered",)
+
+    def __init__(self):
+        """
+        Journal d'une négociation en objets Message (tableau sans stockage en colonnes).
+
+        Les messages sont toujours ajoutés en fin de liste ; un message en retard sur le
+        numéro du précédent marque le journal, qui est trié (tri stable par numéro) à la
+        lecture suivante.
+        """
+        super().__init__()
+        self.ordered = True
+
+    def append(self, message):
+        if self.ordered and self and list.__getitem__(self, -1).message_number > message.message_number:
+            self.ordered = False
+        list.append(self, message)
+
+    def _order(self):
+        if not self.ordered:
+            list.sort(self, key=attrgetter("message_number"))
+            self.ordered = True
+
+    def __getitem__(self, index):
+        self._order()
+        return list.__getitem__(self, index)
+
+    def __iter__(self):
+        self._order()
+        return list.__iter__(self)
+
+
+class ColumnarNegotiationLog:
+    __slots__ = ("store", "id_negotiation", "rows", "ordered")
+
+    def __init__(self, store, id_negotiation):
+        """
+        Journal d'une négociation : indices de ses lignes dans le ColumnarMessageStore.
+        Se comporte comme une liste de Message (len, indices, tranches, itération).
+
+        Comme NegotiationLog, un message en retard est ajouté en fin et les lignes sont
+        triées à la lecture suivante ; l'ordre est vérifié sur la colonne des numéros,
+        sans reconstruire de Message.
+
+        Args:
+            store (ColumnarMessageStore): Le stockage en colonnes
+            id_negotiation (str): L'identifiant de la négociation
+        """
+        self.store = store
+        self.id_negotiation = id_negotiation
+        self.rows = array("I")
+        self.ordered = True
+
+    def append(self, message):
+        rows = self.rows
+        if self.ordered and rows and self.store.message_number[rows[-1]] > message.message_number:
+            self.ordered = False
+        rows.append(self.store.append_row(message))
+
+    def ordered_rows(self):
+        """
+        Returns:
+            array: Les indices des lignes dans l'ordre des numéros de message
+        """
+        if not self.ordered:
+            self.rows = array("I", sorted(self.rows, key=self.store.message_number.__getitem__))
+            self.ordered = True
+        return self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        rows = self.ordered_rows()
+        if isinstance(index, slice):
+            return [self.store.materialize(self.id_negotiation, row) for row in rows[index]]
+        return self.store.materialize(self.id_negotiation, rows[index])
+
+    def __iter__(self):
+        for row in self.ordered_rows():
+            yield self.store.materialize(self.id_negotiation, row)
@@ -0,0 +1,275 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bornes des seaux de durée (secondes) : 4 seaux par puissance de 2, de 1 µs à ~2 min
+LATENCY_BOUNDS = tuple(1e-6 * 2 ** (i / 4) for i in range(27 * 4 + 1))
+
+# Bornes des seaux de profondeur de file (nombre de négociations en attente)
+DEPTH_BOUNDS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64, 96, 128, 192, 256, 384, 512, 768, 1024)
+
+
+class Histogram:
+    def __init__(self, bounds=LATENCY_BOUNDS, lock=None):
+        """
+        Histogramme à seaux fixes : enregistrer une valeur coûte une recherche
+        dichotomique et quelques additions, la mémoire ne dépend pas du nombre de valeurs.
+
+        Args:
+            bounds (tuple): Bornes supérieures croissantes des seaux (un seau de plus
+                reçoit les valeurs au-delà de la dernière borne)
+            lock (threading.Lock): Verrou partagé avec d'autres histogrammes, pour en
+                alimenter plusieurs en une seule prise de verrou (voir add)
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.lock = lock or threading.Lock()
+
+    def record(self, value):
+        """
+        Enregistre une valeur.
+
+        Args:
+            value (float): La valeur mesurée
+        """
+        with self.lock:
+            self.add(value)
+
+    def add(self, value):
+        """Enregistre une valeur, le verrou de l'histogramme étant déjà tenu."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """
+        Estime un percentile à partir des seaux (borne supérieure du seau atteint).
+
+        Args:
+            p (float): Le percentile, entre 0 et 100
+
+        Returns:
+            float: La valeur estimée, ou 0 si l'histogramme est vide
+        """
+        with self.lock:
+            return self._percentile(self.counts, self.count, self.max, p)
+
+    def _percentile(self, counts, count, maximum, p):
+        if not count:
+            return 0
+        rank = max(1, round(count * p / 100))
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self.bounds[index], maximum) if index < len(self.bounds) else maximum
+        return maximum
+
+    def to_dict(self):
+        """
+        Résumé de l'histogramme.
+
+        Returns:
+            dict: count, sum, mean, min, max, p50, p90, p99 et les seaux non vides
+        """
+        with self.lock:
+            counts, count, total, minimum, maximum = list(self.counts), self.count, self.total, self.min, self.max
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0,
+            "min": minimum or 0,
+            "max": maximum or 0,
+            "p50": self._percentile(counts, count, maximum, 50),
+            "p90": self._percentile(counts, count, maximum, 90),
+            "p99": self._percentile(counts, count, maximum, 99),
+            "buckets": {str(self.bounds[i]) if i < len(self.bounds) else "+Inf": c
+                        for i, c in enumerate(counts) if c},
+        }
+
+
+class NegotiationMetrics:
+    def __init__(self, clock=time.perf_counter):
+        """
+        Mesures de latence et de débit d'une exécution.
+
+        Alimenté par le tableau (SharedMessageBoard(metrics=...)) à chaque message,
+        et par les agents (Agent.process_negotiations) à chaque lot de négociations.
+
+        Args:
+            clock (callable): Horloge en secondes (par exemple lambda: simulator.now
+                pour mesurer en temps simulé)
+        """
+        self.clock = clock
+        self.started = clock()
+        # Les histogrammes par message partagent le verrou des compteurs : un message = une prise de verrou
+        self.lock = threading.Lock()
+        self.time_to_first_counter = Histogram(lock=self.lock)  # Ouverture -> première réponse de l'autre partie
+        self.round_latency = Histogram(lock=self.lock)  # Délai entre deux messages d'une même négociation
+        self.negotiation_duration = Histogram(lock=self.lock)  # Ouverture -> message terminal
+        self.lock_wait = Histogram(lock=self.lock)  # Attente de chaque prise d'un verrou de bande par le tableau
+        self.handle_time = Histogram()  # Durée d'un appel à handle_negotiation
+        self.queue_depth = Histogram(DEPTH_BOUNDS)  # Négociations en attente au réveil d'un agent
+        self.queue_depth_by_agent = {}  # id_agent -> Histogram
+        self.open = {}  # id_negotiation -> [ouverture, dernier message, type de l'ouvreur, contre-offre reçue]
+        self.messages = 0
+        self.completed = 0
+        self.outcomes = {}  # issue -> nombre de négociations
+
+    def record_message(self, message, lock_wait):
+        """
+        Enregistre un message ajouté au tableau (appelé par add_message).
+
+        Args:
+            message (Message): Le message ajouté
+            lock_wait (float): Temps d'attente du verrou de bande, en secondes
+        """
+        self.record_messages((message,), (lock_wait,))
+
+    def record_messages(self, messages, lock_waits):
+        """
+        Enregistre un lot de messages ajoutés au tableau sous une seule prise du verrou
+        (appelé par add_messages et open_negotiations).
+
+        Args:
+            messages (list): Les messages ajoutés
+            lock_waits (list): Temps d'attente de chaque verrou de bande pris pour le lot, en secondes
+        """
+        now = self.clock()
+        with self.lock:
+            self.messages += len(messages)
+            for lock_wait in lock_waits:
+                self.lock_wait.add(lock_wait)
+            for message in messages:
+                state = self.open.get(message.id_negotiation)
+                if state is None:
+                    state = self.open[message.id_negotiation] = [now, now, message.type, False]
+                else:
+                    self.round_latency.add(now - state[1])
+                    state[1] = now
+                    if not state[3] and message.type != state[2] and message.type != "system":
+                        state[3] = True
+                        self.time_to_first_counter.add(now - state[0])
+                if message.is_terminal():
+                    del self.open[message.id_negotiation]
+                    self.negotiation_duration.add(now - state[0])
+                    self.completed += 1
+                    outcome = message.outcome()
+                    self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def record_queue_depth(self, agent_id, depth):
+        """
+        Enregistre le nombre de négociations qu'un agent trouve en attente à son réveil.
+
+        Args:
+            agent_id (str): L'identifiant de l'agent
+            depth (int): Nombre de négociations en attente
+        """
+        self.queue_depth.record(depth)
+        histogram = self.queue_depth_by_agent.get(agent_id)
+        if histogram is None:
+            histogram = self.queue_depth_by_agent.setdefault(agent_id, Histogram(DEPTH_BOUNDS))
+        histogram.record(depth)
+
+    def record_handle(self, agent_id, elapsed):
+        """
+        Enregistre la durée d'un traitement de négociation par un agent.
+
+        Args:
+            agent_id (str): L'identifiant de l'agent
+            elapsed (float): Durée de handle_negotiation, en secondes
+        """
+        self.handle_time.record(elapsed)
+
+    def snapshot(self):
+        """
+        État courant de toutes les mesures.
+
+        Returns:
+            dict: Compteurs, débits et histogrammes (sérialisable en JSON)
+        """
+        elapsed = self.clock() - self.started
+        with self.lock:
+            messages, completed, in_flight = self.messages, self.completed, len(self.open)
+            outcomes = dict(self.outcomes)
+        return {
+            "elapsed": elapsed,
+            "messages": messages,
+            "negotiations_completed": completed,
+            "negotiations_in_flight": in_flight,
+            "outcomes": outcomes,
+            "messages_per_second": messages / elapsed if elapsed > 0 else 0,
+            "negotiations_per_second": completed / elapsed if elapsed > 0 else 0,
+            "time_to_first_counter": self.time_to_first_counter.to_dict(),
+            "round_latency": self.round_latency.to_dict(),
+            "negotiation_duration": self.negotiation_duration.to_dict(),
+            "lock_wait": self.lock_wait.to_dict(),
+            "handle_time": self.handle_time.to_dict(),
+            "queue_depth": self.queue_depth.to_dict(),
+            "queue_depth_by_agent": {agent_id: histogram.to_dict()
+                                     for agent_id, histogram in sorted(self.queue_depth_by_agent.items())},
+        }
+
+
+def save_metrics(metrics, filename="metrics.json"):
+    """
+    Enregistre l'état des mesures en JSON dans ./result.
+
+    Args:
+        metrics (NegotiationMetrics): Les mesures à exporter
+        filename (str): Nom du fichier dans ./result
+
+    Returns:
+        str: Le chemin du fichier écrit
+    """
+    output_dir = "./result"
+    os.makedirs(output_dir, exist_ok=True)
+    full_path = os.path.join(output_dir, filename)
+    with open(full_path, "w") as file:
+        json.dump(metrics.snapshot(), file, indent=2)
+    return full_path
+
+
+def serve_metrics(metrics, host="127.0.0.1", port=0):
+    """
+    Publie les mesures en JSON sur un serveur HTTP local (GET / ou /metrics),
+    depuis un thread démon, pour les consulter pendant l'exécution.
+
+    Args:
+        metrics (NegotiationMetrics): Les mesures à publier
+        host (str): Adresse d'écoute
+        port (int): Port d'écoute (0 = choisi par le système, voir server.server_address)
+
+    Returns:
+        ThreadingHTTPServer: Le serveur démarré (server.shutdown() pour l'arrêter)
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = json.dumps(metrics.snapshot()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Pas d'écriture sur stderr à chaque requête
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
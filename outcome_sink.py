@@ -0,0 +1,149 @@
+import threading
+from collections import Counter
+
+
+class NegotiationOutcome:
+    __slots__ = ("id_negotiation", "state", "price", "supplier", "buyers", "supplier_id", "buyer_id")
+
+    def __init__(self, id_negotiation, state, price, supplier=None, buyers=None, supplier_id="", buyer_id=""):
+        """
+        Issue d'une négociation telle qu'enregistrée par l'OutcomeSink.
+
+        Args:
+            id_negotiation (str): L'identifiant de la négociation
+            state (str): "accepted", "aborted", "timeout" ou "processing" (pas encore terminée)
+            price (float): Prix du dernier message
+            supplier (Agent): Le fournisseur (ou la coalition) participant
+            buyers (list): Les acheteurs (ou coalitions) participants
+            supplier_id (str): Identifiant du fournisseur
+            buyer_id (str): Identifiant de l'acheteur
+        """
+        self.id_negotiation = id_negotiation
+        self.state = state
+        self.price = price
+        self.supplier = supplier
+        self.buyers = buyers or []
+        self.supplier_id = supplier_id
+        self.buyer_id = buyer_id
+
+
+class OutcomeSink:
+    def __init__(self, message_board):
+        """
+        Collecte au fil de l'eau l'issue des négociations d'un tableau.
+
+        Le sink est prévenu par le tableau à chaque message terminal (accepté, annulé
+        ou plus de messages) et tient les statistiques à jour incrémentalement ; les
+        rapports sont ensuite produits sans repasser sur le tableau. Le sink ne copie
+        pas les messages : l'historique d'une négociation est relu sur le tableau au
+        moment de l'afficher (transcript).
+
+        Args:
+            message_board (SharedMessageBoard): Le tableau à écouter
+        """
+        self.message_board = message_board
+        self.lock = threading.Lock()
+        self.outcomes = {}  # id_negotiation -> NegotiationOutcome
+        self.accepted = 0
+        self.final_prices = Counter()  # Prix des négociations acceptées -> nombre de négociations
+        self.price_sum = 0
+        self.min_price = None
+        self.max_price = None
+        message_board.register_outcome_listener(self)
+
+    def on_outcome(self, message, participants):
+        """
+        Enregistre le message terminal d'une négociation (appelé par le tableau).
+
+        Args:
+            message (Message): Le message qui termine la négociation
+            participants (set): Identifiants des participants à la négociation
+        """
+        outcome = self._build(message, participants)
+        with self.lock:
+            previous = self.outcomes.get(message.id_negotiation)
+            if previous is not None and previous.state == "accepted":
+                # Message terminal en double : on ne garde que le dernier
+                self.accepted -= 1
+                self.final_prices[previous.price] -= 1
+                self.price_sum -= previous.price
+                if not self.final_prices[previous.price]:
+                    del self.final_prices[previous.price]
+                    # Un extrême disparu est recalculé sur les prix distincts restants
+                    if previous.price in (self.min_price, self.max_price):
+                        self.min_price = min(self.final_prices, default=None)
+                        self.max_price = max(self.final_prices, default=None)
+            self.outcomes[message.id_negotiation] = outcome
+            if outcome.state == "accepted":
+                self.accepted += 1
+                self.final_prices[outcome.price] += 1
+                self.price_sum += outcome.price
+                self.min_price = outcome.price if self.min_price is None else min(self.min_price, outcome.price)
+                self.max_price = outcome.price if self.max_price is None else max(self.max_price, outcome.price)
+
+    def outcome(self, id_negotiation):
+        """
+        Retourne l'issue d'une négociation.
+
+        Une négociation pas encore terminée est décrite à partir de son dernier message.
+
+        Args:
+            id_negotiation (str): L'identifiant de la négociation
+
+        Returns:
+            NegotiationOutcome: L'issue, ou None si la négociation n'a aucun message
+        """
+        outcome = self.outcomes.get(id_negotiation)
+        if outcome is not None:
+            return outcome
+        last_message = self.message_board.get_last_message(id_negotiation)
+        if last_message is None:
+            return None
+        return self._build(last_message, self.message_board.get_negotiation_participants(id_negotiation))
+
+    def transcript(self, id_negotiation):
+        """
+        Historique d'une négociation, relu sur le tableau.
+
+        Args:
+            id_negotiation (str): L'identifiant de la négociation
+
+        Returns:
+            list: Les messages de la négociation
+        """
+        return self.message_board.get_all_messages(id_negotiation)
+
+    def _build(self, message, participants):
+        """Résout les participants d'une négociation et construit son NegotiationOutcome."""
+        observers_by_id = self.message_board.observers_by_id
+        agents = [observers_by_id.get(agent_id) for agent_id in sorted(participants)]
+        agents = [agent for agent in agents if agent is not None]
+        supplier = next((a for a in agents if a.type == "supplier"), None)
+        buyers = [a for a in agents if a.type == "buyer"]
+        return NegotiationOutcome(
+            message.id_negotiation, message.outcome(), message.price, supplier, buyers,
+            supplier_id=supplier.id if supplier else "",
+            buyer_id=buyers[0].id if buyers else "",
+        )
+
+    def summary(self, total=None):
+        """
+        Statistiques courantes, en O(1).
+
+        Args:
+            total (int): Nombre de négociations lancées (par défaut, celles déjà terminées) ;
+                celles qui ne sont pas acceptées comptent comme annulées
+
+        Returns:
+            dict: total, accepted, aborted, average_price, min_price, max_price
+        """
+        with self.lock:
+            total = len(self.outcomes) if total is None else total
+            return {
+                "total": total,
+                "accepted": self.accepted,
+                "aborted": total - self.accepted,
+                "average_price": self.price_sum / self.accepted if self.accepted else 0,
+                "min_price": self.min_price if self.min_price is not None else 0,
+                "max_price": self.max_price if self.max_price is not None else 0,
+            }
@@ -2,10 +2,17 @@ import csv
 import os
 import io
 import base64
-import matplotlib.pyplot as plt
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+# Les graphiques et les rapports HTML qui en contiennent sont produits par un
+# thread dédié, créé au premier rapport (voir submit_report)
+_report_executor = None
+_report_futures = []
+_report_lock = threading.Lock()
 
-def save_summary_to_csv(negotiation_ids, message_board, filename="negotiation_summary.csv"):
+
+def save_summary_to_csv(negotiation_ids, sink, filename="negotiation_summary.csv"):
     output_dir = "./result"
     os.makedirs(output_dir, exist_ok=True)  # Crée le dossier s'il n'existe pas
     
@@ -15,56 +22,112 @@ def save_summary_to_csv(negotiation_ids, message_board, filename="negotiation_su
         writer.writerow(["Negotiation ID", "Final Price", "State", "Buyer ID", "Supplier ID"])
 
         for neg_id in negotiation_ids:
-            messages = message_board.get_all_messages(neg_id)
-            if not messages:
+            outcome = sink.outcome(neg_id)
+            if outcome is None:
                 continue
-            last_msg = messages[-1]
-            buyer_id = next((msg.id for msg in messages if msg.type == "buyer"), "")
-            supplier_id = next((msg.id for msg in messages if msg.type == "supplier"), "")
-            writer.writerow([neg_id, last_msg.price, last_msg.state, buyer_id, supplier_id])
+            writer.writerow([neg_id, outcome.price, outcome.state, outcome.buyer_id, outcome.supplier_id])
     print(f"Résumé CSV enregistré dans {full_path}")
 
 
+def submit_report(function, *args):
+    """
+    Exécute une fonction de rendu dans le thread des rapports.
+
+    Args:
+        function (callable): La fonction à exécuter
+        *args: Ses arguments
+
+    Returns:
+        Future: Le résultat de la fonction
+    """
+    global _report_executor
+    with _report_lock:
+        if _report_executor is None:
+            _report_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report")
+        future = _report_executor.submit(function, *args)
+        _report_futures.append(future)
+    return future
+
+
+def wait_for_reports(timeout=None):
+    """
+    Attend la fin des rapports en cours de rendu.
+
+    Args:
+        timeout (float): Durée maximale d'attente en secondes (None = illimitée)
+
+    Returns:
+        list: Les résultats des rapports terminés (une erreur de rendu est levée ici)
+    """
+    with _report_lock:
+        futures = list(_report_futures)
+        _report_futures.clear()
+    return [future.result(timeout) for future in futures]
+
+
+def _figure_to_base64(figure):
+    """Rend une figure en PNG avec le backend Agg et l'encode en base64."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    FigureCanvasAgg(figure)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png')
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
 def generate_base64_graph(prices, states):
-    fig1, ax1 = plt.subplots()
+    # matplotlib n'est chargé qu'au premier graphique ; l'API objet (Figure) n'a pas
+    # d'état global, elle peut donc tourner dans le thread des rapports
+    from matplotlib.figure import Figure
+
+    fig1 = Figure()
+    ax1 = fig1.subplots()
     labels = ["Accepted", "Aborted"]
-    sizes = [states.count("accepted"), states.count("aborted")+ states.count("processing")]
+    sizes = [states.count("accepted"), len(states) - states.count("accepted")]
     ax1.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
     ax1.axis('equal')
-    pie_buf = io.BytesIO()
-    plt.savefig(pie_buf, format='png')
-    pie_data = base64.b64encode(pie_buf.getvalue()).decode('utf-8')
-    plt.close()
+    pie_data = _figure_to_base64(fig1)
 
-    fig2, ax2 = plt.subplots()
+    fig2 = Figure()
+    ax2 = fig2.subplots()
     ax2.hist(prices, bins=10, color='skyblue', edgecolor='black')
     ax2.set_title("Distribution des prix finaux (acceptés)")
     ax2.set_xlabel("Prix")
     ax2.set_ylabel("Nombre de négociations")
-    hist_buf = io.BytesIO()
-    plt.savefig(hist_buf, format='png')
-    hist_data = base64.b64encode(hist_buf.getvalue()).decode('utf-8')
-    plt.close()
+    hist_data = _figure_to_base64(fig2)
 
     return pie_data, hist_data
 
-def save_summary_to_html(negotiation_ids, message_board, buyers, suppliers, filename):
+def save_summary_to_html(negotiation_ids, sink, buyers, suppliers, filename):
+    """
+    Génère le rapport HTML avec graphiques d'une exécution.
+
+    Le tableau est construit tout de suite ; les graphiques et l'écriture du fichier
+    se font dans le thread des rapports (voir wait_for_reports).
+
+    Returns:
+        Future: Terminé une fois le fichier écrit
+    """
     prices = []
     states = []
-    rows = ""
+    rows = []
     for neg_id in negotiation_ids:
-        messages = message_board.get_all_messages(neg_id)
-        if not messages:
+        outcome = sink.outcome(neg_id)
+        if outcome is None:
             continue
-        last_msg = messages[-1]
-        buyer_id = next((msg.id for msg in messages if msg.type == "buyer"), "")
-        supplier_id = next((msg.id for msg in messages if msg.type == "supplier"), "")
-        row_class = "accepted" if last_msg.state == "accepted" else "aborted"
-        rows += f"<tr class='{row_class}'><td>{neg_id}</td><td>{last_msg.price:.2f}</td><td>{last_msg.state}</td><td>{buyer_id}</td><td>{supplier_id}</td></tr>"
-        if last_msg.state == "accepted":
-            prices.append(last_msg.price)
-        states.append(last_msg.state)
+        row_class = "accepted" if outcome.state == "accepted" else "aborted"
+        rows.append(f"<tr class='{row_class}'><td>{neg_id}</td><td>{outcome.price:.2f}</td><td>{outcome.state}</td><td>{outcome.buyer_id}</td><td>{outcome.supplier_id}</td></tr>")
+        if outcome.state == "accepted":
+            prices.append(outcome.price)
+        states.append(outcome.state)
+
+    buyer_items = ''.join(f'<li>{b.id} - max {b.max_price}</li>' for b in buyers)
+    supplier_items = ''.join(f'<li>{s.id} - min {s.min_price}</li>' for s in suppliers)
+    return submit_report(_write_summary_html, ''.join(rows), prices, states, buyer_items, supplier_items, filename)
+
 
+def _write_summary_html(rows, prices, states, buyer_items, supplier_items, filename):
+    """Rend les graphiques et écrit le rapport de save_summary_to_html."""
     pie_img, hist_img = generate_base64_graph(prices, states)
 
     html_content = f"""
@@ -99,132 +162,131 @@ def save_summary_to_html(negotiation_ids, message_board, buyers, suppliers, file
         <img src="data:image/png;base64,{hist_img}" width="600"/>
         <h2>Acheteurs</h2>
         <ul>
-            {''.join(f'<li>{b.id} - max {b.max_price}</li>' for b in buyers)}
+            {buyer_items}
         </ul>
         <h2>Fournisseurs</h2>
         <ul>
-            {''.join(f'<li>{s.id} - min {s.min_price}</li>' for s in suppliers)}
+            {supplier_items}
         </ul>
     </body>
     </html>
     """
 
+    os.makedirs("./result", exist_ok=True)
     with open("./result/"+filename, "w") as f:
         f.write(html_content)
     print(f"Résumé HTML avec graphiques sauvegardé dans ./result/{filename}")
+    return "./result/" + filename
 
 
-def save_summary_to_html_bis(negotiations, message_board, buyers, suppliers, filename="output.html"):
-    """
-    Génère un fichier HTML avec un tableau stylisé des résultats des négociations.
-    """
-    html_content = """
+HTML_BIS_HEAD = """
     <html>
     <head>
-        <title>Negotiation Summary</title>
+        <title>{title}</title>
         <style>
-            .negotiation-div {
+            .negotiation-div {{
                 border: 1px solid #ccc;
                 padding: 16px;
                 margin-bottom: 20px;
                 border-radius: 8px;
-            }
-            table {
+            }}
+            table {{
                 width: 100%;
                 border-collapse: collapse;
-            }
-            th, td {
+            }}
+            th, td {{
                 border: 1px solid black;
                 padding: 8px;
                 text-align: left;
                 font-weight: bold;
-            }
-            th {
+            }}
+            th {{
                 background-color: #f2f2f2;
-            }
-            .accepted {
+            }}
+            .accepted {{
                 background-color: #98FB98; /* Light Green */
-            }
-            .aborted {
+            }}
+            .aborted {{
                 background-color: #FFB6C1; /* Light Pink */
-            }
-            .negotiation-type {
+            }}
+            .negotiation-type {{
                 font-size: 1.2em;
                 margin-bottom: 10px;
                 padding: 8px;
                 border-radius: 4px;
                 background-color: #e6f3ff;
-            }
-            .one-to-one {
+            }}
+            .one-to-one {{
                 border-left: 5px solid #4CAF50;
-            }
-            .one-to-coalition {
+            }}
+            .one-to-coalition {{
                 border-left: 5px solid #FF9800;
-            }
+            }}
         </style>
     </head>
     <body>
-        <h1>Negotiation Summary</h1>
+        <h1>{title}</h1>
     """
 
+HTML_BIS_FOOT = """
+    </body>
+    </html>
+    """
 
-    # --- Section de résumé ---
-    accepted = 0
-    aborted = 0
-    final_prices = []
+# Taille du tampon d'écriture des rapports HTML
+HTML_BUFFER_SIZE = 1 << 16
 
-    for id_negotiation in negotiations:
-        messages = message_board.get_all_messages(id_negotiation)
-        if not messages:
-            continue
-        last_message = messages[-1]
-        if last_message.state == "accepted":
-            accepted += 1
-            final_prices.append(last_message.price)
-        else:
-            aborted += 1
-
-    total = len(negotiations)
-    avg_price = sum(final_prices) / len(final_prices) if final_prices else 0
-    min_price = min(final_prices) if final_prices else 0
-    max_price = max(final_prices) if final_prices else 0
-
-    html_content += f"""
+
+def _html_bis_summary(summary):
+    """Bloc "Statistiques Générales" d'un rapport."""
+    total = summary["total"]
+    accepted = summary["accepted"]
+    aborted = summary["aborted"]
+    return f"""
         <div style='padding:20px; border-radius:8px; margin-bottom:30px;'>
             <h2>Statistiques Générales</h2>
             <ul>
                 <li><strong>Total des négociations :</strong> {total}</li>
-                <li><strong>Acceptées :</strong> {accepted} ({(accepted/total)*100:.1f}%)</li>
-                <li><strong>Annulées :</strong> {aborted} ({(aborted/total)*100:.1f}%)</li>
-                <li><strong>Prix moyen final :</strong> {avg_price:.2f}</li>
-                <li><strong>Prix minimum :</strong> {min_price:.2f}</li>
-                <li><strong>Prix maximum :</strong> {max_price:.2f}</li>
+                <li><strong>Acceptées :</strong> {accepted} ({(accepted/total)*100 if total else 0:.1f}%)</li>
+                <li><strong>Annulées :</strong> {aborted} ({(aborted/total)*100 if total else 0:.1f}%)</li>
+                <li><strong>Prix moyen final :</strong> {summary["average_price"]:.2f}</li>
+                <li><strong>Prix minimum :</strong> {summary["min_price"]:.2f}</li>
+                <li><strong>Prix maximum :</strong> {summary["max_price"]:.2f}</li>
             </ul>
         </div>
     """
 
 
-    for id_negotiation in negotiations:
-        # Trouver le supplier et le(s) buyer(s) participants
-        participants = message_board.get_negotiation_participants(id_negotiation)
-        supplier = next((s for s in suppliers if s.id in participants), None)
-        buyers_in_negotiation = [b for b in buyers if b.id in participants]
-        
-        # Déterminer le type de négociation
-        negotiation_type = "one-to-one" if len(buyers_in_negotiation) == 1 else "one-to-coalition"
-        type_label = "1-to-1" if negotiation_type == "one-to-one" else "1-to-Coalition"
-        
-        messages = message_board.get_all_messages(id_negotiation)
-        last_message = messages[-1] if messages else None
-        negotiation_status = "accepted" if last_message and last_message.state == "accepted" else "aborted"
-
-        html_content += f"""
+def iter_negotiation_html(id_negotiation, outcome, messages):
+    """
+    Produit, morceau par morceau, le bloc HTML d'une négociation.
+
+    Args:
+        id_negotiation (str): L'identifiant de la négociation
+        outcome (NegotiationOutcome): Son issue, ou None si elle n'a aucun message
+        messages (list): Son historique
+
+    Yields:
+        str: Morceaux de HTML
+    """
+    # Le supplier et le(s) buyer(s) participants ont été résolus par le sink
+    supplier = outcome.supplier if outcome else None
+    buyers_in_negotiation = outcome.buyers if outcome else []
+
+    # Déterminer le type de négociation
+    is_coalition = len(buyers_in_negotiation) != 1 or hasattr(buyers_in_negotiation[0], "members")
+    negotiation_type = "one-to-coalition" if is_coalition else "one-to-one"
+    type_label = "1-to-1" if negotiation_type == "one-to-one" else "1-to-Coalition"
+
+    negotiation_status = "accepted" if outcome and outcome.state == "accepted" else "aborted"
+
+    yield f"""
         <div class="negotiation-div">
             <div class="negotiation-type {negotiation_type}">
                 <strong>Negotiation Type:</strong> {type_label} |
                 <strong>ID:</strong> {id_negotiation} |
                 <strong>Status:</strong> {negotiation_status} |
-                <strong>Final Price:</strong> {last_message.price if last_message else 'N/A'}
+                <strong>Final Price:</strong> {outcome.price if outcome else 'N/A'}
             </div>
             
             <h3>Supplier Information:</h3>
@@ -236,8 +298,8 @@ def save_summary_to_html_bis(negotiations, message_board, buyers, suppliers, fil
 
             <h3>Buyer(s) Information:</h3>
         """
-        for buyer in buyers_in_negotiation:
-            html_content += f"""
+    for buyer in buyers_in_negotiation:
+        yield f"""
             <div style="margin-bottom: 15px;">
                 <p><strong>Buyer ID:</strong> {buyer.id}</p>
                 <p><strong>Max Price:</strong> {buyer.max_price}</p>
@@ -248,7 +310,7 @@ def save_summary_to_html_bis(negotiations, message_board, buyers, suppliers, fil
             </div>
             """
 
-        html_content += """
+    yield f"""
             <h3>Negotiation Messages:</h3>
             <table class="{negotiation_status}">
                 <tr>
@@ -261,18 +323,19 @@ def save_summary_to_html_bis(negotiations, message_board, buyers, suppliers, fil
                 </tr>
         """
 
-        for msg in messages:
-            message_type = "Counter-offer"
-            if msg.message_number == 0:
-                message_type = "Initial offer"
-            elif msg.state in ["accepted", "aborted"]:
-                message_type = "Final agreement" if msg.state == "accepted" else "Aborted"
+    row_color = '#98FB98' if negotiation_status == 'accepted' else '#FFB6C1'
+    for msg in messages:
+        message_type = "Counter-offer"
+        if msg.message_number == 0:
+            message_type = "Initial offer"
+        elif msg.state in ["accepted", "aborted"]:
+            message_type = "Final agreement" if msg.state == "accepted" else "Aborted"
 
-            row_style = f"background-color: {'#98FB98' if negotiation_status == 'accepted' else '#FFB6C1'};"
-            if msg.type == "buyer":
-                row_style += " color: gray;"
+        row_style = f"background-color: {row_color};"
+        if msg.type == "buyer":
+            row_style += " color: gray;"
 
-            html_content += f"""
+        yield f"""
                 <tr style="{row_style}">
                     <td>{msg.message_number}</td>
                     <td>{msg.id}</td>
@@ -283,15 +346,90 @@ def save_summary_to_html_bis(negotiations, message_board, buyers, suppliers, fil
                 </tr>
             """
 
-        html_content += """
+    yield """
             </table>
         </div>
         """
 
-    html_content += """
-    </body>
-    </html>
+
+def iter_summary_html_bis(negotiations, sink, title="Negotiation Summary", summary=None, navigation=""):
     """
+    Produit, morceau par morceau, une page de rapport : en-tête, statistiques puis
+    un bloc par négociation. Le document n'est jamais assemblé en mémoire.
+
+    Args:
+        negotiations (iterable): Identifiants des négociations de la page
+        sink (OutcomeSink): Issues collectées pendant l'exécution
+        title (str): Titre de la page
+        summary (dict): Statistiques à afficher (sink.summary() sur les négociations si None)
+        navigation (str): HTML de navigation affiché avant et après les négociations
+
+    Yields:
+        str: Morceaux de HTML
+    """
+    if summary is None:
+        negotiations = list(negotiations)
+        summary = sink.summary(total=len(negotiations))
+    yield HTML_BIS_HEAD.format(title=title)
+    yield _html_bis_summary(summary)
+    yield navigation
+    for id_negotiation in negotiations:
+        yield from iter_negotiation_html(id_negotiation, sink.outcome(id_negotiation), sink.transcript(id_negotiation))
+    yield navigation
+    yield HTML_BIS_FOOT
+
+
+def _page_filename(filename, page):
+    """Nom du fichier de la page numéro page (à partir de 1) d'un rapport paginé."""
+    base, extension = os.path.splitext(filename)
+    return f"{base}_page_{page}{extension or '.html'}"
+
+
+def save_summary_to_html_bis(negotiations, sink, filename="output.html", page_size=None):
+    """
+    Génère un fichier HTML avec un tableau stylisé des résultats des négociations.
+
+    Les blocs sont écrits au fil de l'eau dans le fichier. Au-delà de page_size
+    négociations, le rapport est découpé en pages ({nom}_page_N.html) et filename
+    devient une page d'index avec les statistiques et les liens vers chaque page.
+
+    Args:
+        negotiations (list): Identifiants des négociations à inclure
+        sink (OutcomeSink): Issues collectées pendant l'exécution
+        filename (str): Nom du fichier dans ./result
+        page_size (int): Nombre de négociations par page (None = une seule page)
+    """
+    output_dir = "./result"
+    os.makedirs(output_dir, exist_ok=True)
+    summary = sink.summary(total=len(negotiations))
+
+    if not page_size or len(negotiations) <= page_size:
+        with open(os.path.join(output_dir, filename), "w", buffering=HTML_BUFFER_SIZE) as file:
+            file.writelines(iter_summary_html_bis(negotiations, sink, summary=summary))
+        return
+
+    pages = (len(negotiations) + page_size - 1) // page_size
+    for page in range(1, pages + 1):
+        start = (page - 1) * page_size
+        links = [f'<a href="{os.path.basename(filename)}">Index</a>']
+        if page > 1:
+            links.append(f'<a href="{os.path.basename(_page_filename(filename, page - 1))}">&larr; Page {page - 1}</a>')
+        if page < pages:
+            links.append(f'<a href="{os.path.basename(_page_filename(filename, page + 1))}">Page {page + 1} &rarr;</a>')
+        navigation = f"<p>{' | '.join(links)}</p>"
+        with open(os.path.join(output_dir, _page_filename(filename, page)), "w", buffering=HTML_BUFFER_SIZE) as file:
+            file.writelines(iter_summary_html_bis(
+                negotiations[start:start + page_size], sink,
+                title=f"Negotiation Summary - Page {page}/{pages}", summary=summary, navigation=navigation))
 
-    with open("./result/"+filename, "w") as file:
-        file.write(html_content)
\ No newline at end of file
+    with open(os.path.join(output_dir, filename), "w", buffering=HTML_BUFFER_SIZE) as file:
+        file.write(HTML_BIS_HEAD.format(title="Negotiation Summary"))
+        file.write(_html_bis_summary(summary))
+        file.write("<h2>Pages</h2>\n<ul>\n")
+        for page in range(1, pages + 1):
+            start = (page - 1) * page_size
+            first, last = negotiations[start], negotiations[min(start + page_size, len(negotiations)) - 1]
+            file.write(f'<li><a href="{os.path.basename(_page_filename(filename, page))}">Page {page}</a> '
+                       f'(négociations {first} à {last})</li>\n')
+        file.write("</ul>\n")
+        file.write(HTML_BIS_FOOT)
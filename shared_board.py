@@ -1,31 +1,287 @@
+import logging
 import threading
 import time
 from collections import defaultdict
+from concurrent.futures import Future
+
+from logs import get_logger
+from message import Message
+from message_store import ColumnarMessageStore, NegotiationLog
+
+logger = get_logger("board")
+
+# Nombre de verrous se partageant les négociations (verrouillage par bandes)
+NUM_LOCK_STRIPES = 64
+
+
+class NegotiationFuture(Future):
+    def __init__(self, id_negotiation):
+        """
+        Future d'une négociation, résolue par son message terminal (accepté, annulé
+        ou plus de messages) ; s'attend avec result() ou concurrent.futures.wait.
+
+        Args:
+            id_negotiation (int): L'identifiant de la négociation
+        """
+        super().__init__()
+        self.id_negotiation = id_negotiation
+
 
 class SharedMessageBoard:
    
-    def __init__(self):
+    def __init__(self, columnar=False, journal=None, metrics=None):
         """
-        Initialise le tableau de messages partagé avec un verrou pour l'accès thread-safe.
+        Initialise le tableau de messages partagé.
+
+        Chaque négociation est protégée par l'un des NUM_LOCK_STRIPES verrous de
+        bande, de sorte que des négociations distinctes ne se bloquent pas entre elles.
+        Le verrou global ne protège plus que l'enregistrement des observateurs.
+
+        Args:
+            columnar (bool): Stocke les messages en colonnes compactes (ColumnarMessageStore)
+                au lieu de listes d'objets Message, pour les longues simulations
+            journal (MessageJournal): Journal binaire où sont consignés les messages et
+                les participants (voir journal.replay_journal pour le relire)
+            metrics (NegotiationMetrics): Mesures de latence alimentées à chaque message
         """
-        self.messages = defaultdict(list)  # Dictionnaire avec id_negotiation comme clé
-        self.lock = threading.Lock()  # Verrou pour l'accès thread-safe
+        # Journal append-only par négociation (id_negotiation -> messages)
+        self.messages = ColumnarMessageStore() if columnar else defaultdict(NegotiationLog)
+        self.lock = threading.Lock()  # Verrou du registre des observateurs
+        self.stripes = [threading.Lock() for _ in range(NUM_LOCK_STRIPES)]  # Verrous par bande de négociations
         self.observers = []  # Liste des agents observant le tableau
+        self.observers_by_id = {}  # id_agent -> agent, pour router les messages vers les participants
+        self.open_observers = {}  # id_acheteur -> acheteur démarré et libre, prévenu des négociations sans acheteur
+        self.buyer_negotiations = set()  # Négociations ayant déjà un acheteur participant
+        self.closed = set()  # Négociations terminées : les messages suivants sont refusés
         self.negotiation_id_counter = 0  # Compteur pour les IDs de négociation
         self.negotiation_id_lock = threading.Lock()  # Verrou pour l'accès au compteur
         self.negotiation_participants = defaultdict(set)  # Participants par négociation
+        self.dispatcher = None  # Si défini, callable(observer, id_negotiation) qui remplace observer.notify
+        self.matchmaker = None  # Si défini, attribue chaque négociation ouverte à un seul acheteur (voir matchmaking.py)
+        self.outcome_listeners = []  # Prévenus de chaque message terminal (accepté, annulé, plus de messages)
+        self.journal = journal  # Journal write-ahead optionnel
+        self.metrics = metrics  # Mesures de latence et de débit optionnelles
+        self.futures = {}  # id_negotiation -> NegotiationFuture en attente du message terminal
+        self.deadlines = None  # Si défini, NegotiationDeadlines qui abandonne les négociations trop longues
 
     def add_message(self, message):
         """
         Ajoute un message au tableau et notifie les observateurs.
 
+        Les messages sont ajoutés en fin de journal (O(1)). Un message en retard sur
+        son prédécesseur marque le journal, trié à la lecture suivante par un tri
+        stable sur le numéro : le même ordre que l'ancien tri à chaque ajout. Un
+        message qui arrive après le message terminal de sa négociation est refusé.
+
         Args:
             message (Message): Le message à ajouter
+
+        Returns:
+            bool: True si le message a été ajouté, False si la négociation était terminée
         """
-        with self.lock:
-            self.messages[message.id_negotiation].append(message)
-            self.messages[message.id_negotiation].sort(key=lambda m: m.message_number)
-        self.notify_observers(message.id_negotiation)
+        return self._add(message.id_negotiation, lambda log: message) is not None
+
+    def abort_if_open(self, id_negotiation):
+        """
+        Termine une négociation par un message "aborted" de type "system", si elle
+        n'est pas déjà terminée.
+
+        Le dernier message est lu et l'abandon rangé sous le même verrou de bande :
+        aucune réponse d'agent ne peut s'intercaler, et celles qui arrivent ensuite
+        sont refusées par add_message.
+
+        Args:
+            id_negotiation (int): L'identifiant de la négociation
+
+        Returns:
+            Message: Le message d'abandon, ou None si la négociation était terminée ou sans message
+        """
+        return self._add(id_negotiation, lambda log: self._abort_message(log[-1]) if log else None)
+
+    @staticmethod
+    def _abort_message(last):
+        """Message d'abandon qui suit le dernier message d'une négociation."""
+        return Message(msg_type="system", sender_id="system", id_negotiation=last.id_negotiation,
+                       price=last.price, state="aborted", message_number=last.message_number + 1,
+                       message_remaining=last.message_remaining, company=last.company)
+
+    def _add(self, id_negotiation, build):
+        """
+        Range un message sous le verrou de bande de sa négociation, puis met à jour le
+        journal, les mesures, les écouteurs et la future, et notifie les observateurs.
+
+        Args:
+            id_negotiation (int): L'identifiant de la négociation
+            build (callable): Reçoit le journal de la négociation (None s'il n'existe pas,
+                verrou tenu) et retourne le message à ranger, ou None pour ne rien ranger
+
+        Returns:
+            Message: Le message rangé, ou None
+        """
+        stripe = self._stripe(id_negotiation)
+        metrics = self.metrics
+        if metrics is not None:
+            requested = time.perf_counter()
+        with stripe:
+            if metrics is not None:
+                lock_wait = time.perf_counter() - requested
+            if id_negotiation in self.closed:
+                return None
+            log = self.messages.get(id_negotiation)
+            message = build(log)
+            if message is None:
+                return None
+            terminal = message.is_terminal()
+            self.store_message(message)
+            # Journalisé sous le verrou de bande : le journal garde l'ordre d'insertion
+            ticket = self.journal.record_message(message) if self.journal is not None else 0
+            if terminal:
+                future = self.futures.pop(message.id_negotiation, None)
+                listeners = self.outcome_listeners
+                if listeners:
+                    participants = self.negotiation_participants.get(message.id_negotiation, set()).copy()
+        if ticket and self.journal.synchronous:
+            self.journal.wait_written(ticket)
+        if metrics is not None:
+            metrics.record_message(message, lock_wait)
+        if terminal:
+            for listener in listeners:
+                listener.on_outcome(message, participants)
+            # Après les écouteurs : qui attend la future trouve les statistiques à jour
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_result(message)
+        self.notify_observers(id_negotiation)
+        return message
+
+    def add_messages(self, messages):
+        """
+        Ajoute plusieurs messages en un seul passage, puis notifie les observateurs.
+        Comme pour add_message, les messages des négociations terminées sont refusés.
+
+        Les messages sont groupés par bande : chaque verrou de bande est pris une fois
+        pour tous les messages de sa bande, un seul à la fois. Les échéances, les mesures,
+        les écouteurs, les futures et les notifications suivent, verrous relâchés ; chaque
+        agent concerné reçoit en une fois toutes ses négociations du lot (notify_many).
+
+        Args:
+            messages (list): Les messages à ajouter
+        """
+        self._post(messages)
+
+    def open_negotiations(self, agent_id, messages):
+        """
+        Ouvre plusieurs négociations en un seul passage (voir add_messages) : enregistre
+        l'agent comme participant, crée les futures, range les offres d'ouverture,
+        programme les échéances (deadlines) puis notifie toutes les négociations en une
+        seule vague.
+
+        Args:
+            agent_id (str): L'identifiant de l'agent qui ouvre les négociations
+            messages (list): L'offre d'ouverture de chaque négociation (identifiants
+                réservés par reserve_negotiation_ids)
+
+        Returns:
+            list: Les NegotiationFuture des négociations, dans l'ordre des messages
+        """
+        futures = [NegotiationFuture(message.id_negotiation) for message in messages]
+        self._post(messages, opener_id=agent_id, futures=futures)
+        return futures
+
+    def _post(self, messages, opener_id=None, futures=None):
+        """
+        Range un lot de messages bande par bande, puis met à jour les échéances et les
+        mesures, prévient les écouteurs, résout les futures et notifie.
+
+        Args:
+            messages (list): Les messages à ranger
+            opener_id (str): Si défini, agent à inscrire comme participant de chaque
+                négociation (ouverture)
+            futures (list): Futures à enregistrer pour chaque négociation (ouverture)
+        """
+        if not messages:
+            return
+        by_stripe = defaultdict(list)  # indice de bande -> positions des messages
+        for position, message in enumerate(messages):
+            by_stripe[hash(message.id_negotiation) % len(self.stripes)].append(position)
+        is_buyer = opener_id is not None and self._is_buyer(opener_id)
+        journal = self.journal
+        metrics = self.metrics
+        listeners = self.outcome_listeners
+        stored = []  # Messages rangés (ceux des négociations déjà terminées sont refusés)
+        completed = []  # (message, future, participants) des messages terminaux
+        routes = {}  # id_negotiation -> destinataires relevés (voir _route)
+        lock_waits = []
+        ticket = 0
+        # Un verrou de bande à la fois : les autres bandes restent libres pendant le lot
+        for index, positions in by_stripe.items():
+            if metrics is not None:
+                requested = time.perf_counter()
+            with self.stripes[index]:
+                if metrics is not None:
+                    lock_waits.append(time.perf_counter() - requested)
+                touched = {}
+                for position in positions:
+                    message = messages[position]
+                    id_negotiation = message.id_negotiation
+                    if opener_id is not None:
+                        self.negotiation_participants[id_negotiation].add(opener_id)
+                        if is_buyer:
+                            self.buyer_negotiations.add(id_negotiation)
+                        self.futures[id_negotiation] = futures[position]
+                        if journal is not None:
+                            journal.record_participant(id_negotiation, opener_id, is_buyer)
+                    if id_negotiation in self.closed:
+                        continue
+                    self.store_message(message)
+                    stored.append(message)
+                    touched[id_negotiation] = None
+                    if journal is not None:
+                        ticket = max(ticket, journal.record_message(message))
+                    if message.is_terminal():
+                        participants = self.negotiation_participants.get(id_negotiation, set()).copy() if listeners else None
+                        completed.append((message, self.futures.pop(id_negotiation, None), participants))
+                # Destinataires relevés sous le verrou déjà tenu, après le dernier message de chaque négociation
+                for id_negotiation in touched:
+                    routes[id_negotiation] = self._route(id_negotiation)
+        # Le plus grand ticket couvre tout le lot : le journal écrit dans l'ordre
+        if ticket and journal.synchronous:
+            journal.wait_written(ticket)
+        if opener_id is not None and self.deadlines is not None:
+            self.deadlines.watch_many([message.id_negotiation for message in messages])
+        if metrics is not None and stored:
+            metrics.record_messages(stored, lock_waits)
+        for message, future, participants in completed:
+            for listener in listeners:
+                listener.on_outcome(message, participants)
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_result(message)
+        # Notifications dans l'ordre des messages, quel que soit l'ordre des bandes
+        self._deliver([routes.pop(message.id_negotiation) for message in stored
+                       if message.id_negotiation in routes])
+
+    def store_message(self, message):
+        """
+        Range un message dans l'historique de sa négociation, sans verrou ni notification ;
+        un message terminal ferme la négociation.
+
+        Args:
+            message (Message): Le message à ranger
+        """
+        self.messages[message.id_negotiation].append(message)
+        if message.is_terminal():
+            self.closed.add(message.id_negotiation)
+
+    def _stripe(self, id_negotiation):
+        """
+        Retourne le verrou de bande protégeant une négociation.
+
+        Args:
+            id_negotiation (str): L'identifiant de la négociation
+
+        Returns:
+            threading.Lock: Le verrou associé à la négociation
+        """
+        return self.stripes[hash(id_negotiation) % len(self.stripes)]
 
     def get_last_message(self, id_negotiation):
         """
@@ -37,7 +293,7 @@ class SharedMessageBoard:
         Returns:
             Message: Le dernier message ou None si aucun message n'existe
         """
-        with self.lock:
+        with self._stripe(id_negotiation):
             messages = self.messages.get(id_negotiation, [])
             return messages[-1] if messages else None
 
@@ -51,7 +307,7 @@ class SharedMessageBoard:
         Returns:
             list: Liste des messages
         """
-        with self.lock:
+        with self._stripe(id_negotiation):
             return self.messages.get(id_negotiation, [])[:]
 
     def register_observer(self, observer):
@@ -61,18 +317,169 @@ class SharedMessageBoard:
         Args:
             observer: L'agent à enregistrer
         """
-        if observer not in self.observers:
-            self.observers.append(observer)
+        # Modifié sur place en O(1) (des milliers d'agents s'enregistrent) ; les
+        # lectures par identifiant (observers_by_id.get) se passent du verrou global
+        with self.lock:
+            if self.observers_by_id.get(observer.id) is not observer:
+                self.observers.append(observer)
+                self.observers_by_id[observer.id] = observer
+
+    def add_open_observer(self, observer):
+        """
+        Inscrit un acheteur sur le canal "négociations ouvertes" (appelé au démarrage
+        de l'agent). Les autres types d'agents sont ignorés.
+
+        Args:
+            observer: L'acheteur à inscrire
+        """
+        if observer.type != "buyer":
+            return
+        with self.lock:
+            self.open_observers[observer.id] = observer
+
+    def remove_open_observer(self, observer):
+        """
+        Retire un acheteur du canal "négociations ouvertes" (arrêt, entrée dans une
+        coalition, attribution des négociations par un carnet d'ordres).
+
+        Args:
+            observer: L'acheteur à retirer
+        """
+        with self.lock:
+            if self.open_observers.get(observer.id) is observer:
+                del self.open_observers[observer.id]
+
+    def register_outcome_listener(self, listener):
+        """
+        Enregistre un objet prévenu à chaque message terminal.
+
+        Args:
+            listener: Objet exposant on_outcome(message, participants)
+        """
+        with self.lock:
+            self.outcome_listeners = self.outcome_listeners + [listener]
+
+    def unregister_observer(self, observer):
+        """
+        Retire un agent des observateurs du tableau.
+
+        Args:
+            observer: L'agent à retirer
+        """
+        with self.lock:
+            self.observers = [o for o in self.observers if o is not observer]
+            if self.open_observers.get(observer.id) is observer:
+                del self.open_observers[observer.id]
+            if self.observers_by_id.get(observer.id) is observer:
+                del self.observers_by_id[observer.id]
 
     def notify_observers(self, id_negotiation):
         """
-        Notifie les observateurs d'un changement.
-        Chaque observateur est responsable de déterminer s'il doit traiter le message.
-        
+        Notifie uniquement les observateurs concernés par une négociation.
+        Les participants reçoivent tous les messages de la négociation ; tant
+        qu'aucun acheteur n'a rejoint la négociation, les acheteurs du canal
+        "négociations ouvertes" (démarrés et hors coalition) sont aussi prévenus, ou, si un carnet d'ordres
+        (matchmaker) est défini, le seul acheteur qu'il attribue à la négociation.
+
         Args:
             id_negotiation (str): L'identifiant de la négociation mise à jour
         """
-        for observer in self.observers:
+        with self._stripe(id_negotiation):
+            route = self._route(id_negotiation)
+        self._deliver([route])
+
+    def _route(self, id_negotiation):
+        """
+        Relève ce qu'il faut pour notifier une négociation (verrou de bande tenu).
+
+        Returns:
+            tuple: (id_negotiation, participants, a déjà un acheteur, compagnie du fournisseur)
+        """
+        participants = self.negotiation_participants.get(id_negotiation, set()).copy()
+        has_buyer = id_negotiation in self.buyer_negotiations
+        company = ""
+        if not has_buyer and self.matchmaker is not None:
+            messages = self.messages.get(id_negotiation)
+            company = messages[0].company if messages else ""
+        return id_negotiation, participants, has_buyer, company
+
+    def _deliver(self, routes):
+        """
+        Notifie les destinataires d'une ou plusieurs négociations (voir notify_observers).
+
+        Le canal des négociations ouvertes est relu une seule fois pour toute la vague.
+        Sans dispatcher, chaque agent reçoit ses négociations en un seul appel
+        (notify_many), les négociations diffusées sur le canal ouvert formant une seule
+        liste partagée par ses acheteurs ; avec un dispatcher, les notifications lui sont
+        passées une à une, dans l'ordre des négociations, pour que les moteurs simulé et
+        asyncio restent reproductibles.
+
+        Args:
+            routes (list): Les tuples relevés par _route
+        """
+        observers_by_id = self.observers_by_id
+        matchmaker = self.matchmaker
+        dispatcher = self.dispatcher
+        open_observers = None
+        ordered = []  # (observer, id_negotiation) dans l'ordre des négociations
+        broadcast = []  # Négociations à diffuser à tout le canal ouvert (sans dispatcher)
+        for id_negotiation, participants, has_buyer, company in routes:
+            # Ordre stable (indépendant du hachage des chaînes) pour des exécutions reproductibles
+            for agent_id in sorted(participants):
+                observer = observers_by_id.get(agent_id)
+                if observer is not None:
+                    ordered.append((observer, id_negotiation))
+            if has_buyer:
+                continue
+            if matchmaker is None:
+                if open_observers is None:
+                    with self.lock:
+                        open_observers = dict(self.open_observers)
+                if dispatcher is None and not any(agent_id in open_observers for agent_id in participants):
+                    broadcast.append(id_negotiation)
+                else:
+                    ordered.extend((o, id_negotiation) for o in open_observers.values() if o.id not in participants)
+            else:
+                buyer = matchmaker.assign(id_negotiation, company)
+                if buyer is not None and buyer.id not in participants:
+                    ordered.append((buyer, id_negotiation))
+        if dispatcher is not None:
+            for observer, id_negotiation in ordered:
+                dispatcher(observer, id_negotiation)
+            return
+        if len(routes) == 1:
+            for observer, id_negotiation in ordered:
+                observer.notify(id_negotiation)
+            for observer in open_observers.values() if broadcast else ():
+                observer.notify(broadcast[0])
+            return
+        batches = {}  # id_agent -> (agent, négociations)
+        for observer, id_negotiation in ordered:
+            batch = batches.get(observer.id)
+            if batch is None:
+                batches[observer.id] = (observer, [id_negotiation])
+            else:
+                batch[1].append(id_negotiation)
+        for observer in open_observers.values() if broadcast else ():
+            batch = batches.get(observer.id)
+            if batch is None:
+                batches[observer.id] = (observer, broadcast)
+            else:
+                batch[1].extend(broadcast)
+        for observer, negotiations in batches.values():
+            observer.notify_many(negotiations)
+
+    def notify_agent(self, observer, id_negotiation):
+        """
+        Notifie un seul agent d'une négociation (par le dispatcher s'il est défini).
+
+        Args:
+            observer (Agent): L'agent à réveiller
+            id_negotiation (str): L'identifiant de la négociation
+        """
+        if self.dispatcher is not None:
+            self.dispatcher(observer, id_negotiation)
+        else:
             observer.notify(id_negotiation)
 
     def get_next_negotiation_id(self):
@@ -86,6 +493,22 @@ class SharedMessageBoard:
             self.negotiation_id_counter += 1
             return self.negotiation_id_counter
 
+    def reserve_negotiation_ids(self, count):
+        """
+        Réserve un bloc d'IDs consécutifs pour de nouvelles négociations, en une
+        seule prise du verrou du compteur.
+
+        Args:
+            count (int): Nombre d'IDs à réserver
+
+        Returns:
+            range: Les IDs réservés
+        """
+        with self.negotiation_id_lock:
+            first = self.negotiation_id_counter + 1
+            self.negotiation_id_counter += count
+        return range(first, first + count)
+
     def register_participant(self, id_negotiation, agent_id):
         """
         Enregistre un agent comme participant à une négociation.
@@ -94,9 +517,17 @@ class SharedMessageBoard:
             id_negotiation (str): L'identifiant de la négociation
             agent_id (str): L'identifiant de l'agent
         """
-        with self.lock:
+        with self._stripe(id_negotiation):
             self.negotiation_participants[id_negotiation].add(agent_id)
-        print(id_negotiation, " ajout de ", self.negotiation_participants[id_negotiation])
+            is_buyer = self._is_buyer(agent_id)
+            if is_buyer:
+                self.buyer_negotiations.add(id_negotiation)
+            ticket = self.journal.record_participant(id_negotiation, agent_id, is_buyer) if self.journal is not None else 0
+            participants = sorted(self.negotiation_participants[id_negotiation]) if logger.isEnabledFor(logging.DEBUG) else None
+        if ticket and self.journal.synchronous:
+            self.journal.wait_written(ticket)
+        if participants is not None:
+            logger.debug("%s ajout de %s", id_negotiation, participants, extra={"agent": agent_id, "negotiation": id_negotiation})
 
     def is_participant(self, id_negotiation, agent_id):
         """
@@ -109,8 +540,8 @@ class SharedMessageBoard:
         Returns:
             bool: True si l'agent est participant, False sinon
         """
-        with self.lock:
-            return agent_id in self.negotiation_participants[id_negotiation]
+        with self._stripe(id_negotiation):
+            return agent_id in self.negotiation_participants.get(id_negotiation, ())
 
     def get_negotiation_participants(self, id_negotiation):
         """
@@ -122,7 +553,7 @@ class SharedMessageBoard:
         Returns:
             set: Ensemble des identifiants des agents participants
         """
-        with self.lock:
+        with self._stripe(id_negotiation):
             return self.negotiation_participants.get(id_negotiation, set()).copy()
 
     def has_buyer_participant(self, id_negotiation):
@@ -135,9 +566,23 @@ class SharedMessageBoard:
         Returns:
             bool: True s'il y a déjà un acheteur participant, False sinon
         """
-        with self.lock:
-            participants = self.negotiation_participants.get(id_negotiation, set())
-            return any(p.startswith('B_') or p.startswith('buyer_') for p in participants)
+        with self._stripe(id_negotiation):
+            return id_negotiation in self.buyer_negotiations
+
+    def _is_buyer(self, agent_id):
+        """
+        Détermine si un agent est un acheteur.
+
+        Args:
+            agent_id (str): L'identifiant de l'agent
+
+        Returns:
+            bool: True si l'agent est un acheteur ou une coalition d'acheteurs
+        """
+        observer = self.observers_by_id.get(agent_id)
+        if observer is not None:
+            return observer.type == "buyer"
+        return agent_id.startswith('B_') or agent_id.startswith('buyer_')
 
         
     
\ No newline at end of file
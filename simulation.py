@@ -0,0 +1,73 @@
+import heapq
+import random
+
+
+class NegotiationSimulator:
+    def __init__(self, message_board, agents, seed=None, max_events=10_000_000):
+        """
+        Moteur à événements discrets qui pilote les agents sans aucun thread.
+
+        Les notifications du tableau sont interceptées et placées dans une file de
+        priorité ordonnée par instant simulé ; chaque événement appelle directement
+        handle_negotiation de l'agent concerné. Les délais d'acheminement sont tirés
+        d'un générateur initialisé avec la graine, ce qui rend l'ordre des réactions
+        (par exemple quel acheteur rejoint une négociation ouverte) reproductible.
+
+        Seuls les agents hébergés sont pilotés : les autres observateurs du tableau
+        (membres de coalitions, coalitions candidates) restent inactifs, comme des
+        threads jamais démarrés. Les acheteurs hébergés rejoignent le canal des
+        négociations ouvertes, comme au démarrage d'un agent.
+
+        Args:
+            message_board (SharedMessageBoard): Le tableau de messages à piloter
+            agents (list): Les agents pilotés par le simulateur
+            seed (int): Graine du générateur aléatoire
+            max_events (int): Nombre maximum d'événements traités (garde-fou)
+        """
+        self.message_board = message_board
+        self.agents = {agent.id: agent for agent in agents}
+        self.random = random.Random(seed)
+        self.max_events = max_events
+        self.queue = []  # Tas de (instant, séquence, agent, id_negotiation)
+        self.pending = set()  # (id_agent, id_negotiation) déjà planifiés
+        self.now = 0.0  # Instant simulé courant
+        self.sequence = 0  # Départage les événements simultanés dans l'ordre d'émission
+        self.events_processed = 0
+        message_board.dispatcher = self.post
+        for agent in agents:
+            message_board.add_open_observer(agent)
+
+    def post(self, observer, id_negotiation):
+        """
+        Planifie le traitement d'une négociation par un agent.
+
+        Comme avec le thread d'un agent, plusieurs notifications en attente pour la
+        même négociation sont fusionnées en un seul traitement.
+
+        Args:
+            observer (Agent): L'agent à réveiller
+            id_negotiation (str): L'identifiant de la négociation mise à jour
+        """
+        if self.agents.get(observer.id) is not observer:
+            return
+        key = (observer.id, id_negotiation)
+        if key in self.pending:
+            return
+        self.pending.add(key)
+        delay = 1.0 + self.random.random()
+        heapq.heappush(self.queue, (self.now + delay, self.sequence, observer, id_negotiation))
+        self.sequence += 1
+
+    def run(self):
+        """
+        Traite les événements jusqu'à ce que plus aucun agent n'ait de travail.
+
+        Returns:
+            int: Nombre total d'événements traités depuis la création du simulateur
+        """
+        while self.queue and self.events_processed < self.max_events:
+            self.now, _, observer, id_negotiation = heapq.heappop(self.queue)
+            self.pending.discard((observer.id, id_negotiation))
+            observer.process_negotiations((id_negotiation,))
+            self.events_processed += 1
+        return self.events_processed
@@ -1,5 +1,4 @@
-from agent import Agent
-import time
+from agent import Agent, logger
 import strategies
 
 class Supplier(Agent):
@@ -19,34 +18,17 @@ class Supplier(Agent):
         super().__init__(agent_id, "supplier", message_board)
         self.min_price = min_price
         self.strategy_type = strategy_type
-        self.current_price = first_price
-        self.negotiations_to_process = set()
+        self.first_price = first_price  # Prix de départ de chaque négociation (voir negotiation_state)
         self.company = company
         self.ticket_remaining = ticket_remaining
 
-    def notify(self, id_negotiation):
-        """
-        Traite les notifications de nouveaux messages.
-
-        Args:
-            id_negotiation (str): L'identifiant de la négociation mise à jour
-        """
-        self.negotiations_to_process.add(id_negotiation)
-
-    def run(self):
-        """Point d'entrée du thread du fournisseur."""
-        while self.running:
-            negotiations = self.negotiations_to_process.copy()
-            for id_negotiation in negotiations:
-                self.handle_negotiation(id_negotiation)
-                self.negotiations_to_process.remove(id_negotiation)
-            time.sleep(0.1)
-
     def handle_negotiation(self, id_negotiation):
         """
         Gère une négociation spécifique.
         """
         last_message = self.message_board.get_last_message(id_negotiation)
+        # Avant le filtre sur l'émetteur : un abandon "system" termine aussi la négociation
+        self.release_if_terminal(last_message)
         
         # Ne traiter que les négociations où ce supplier est participant
         if not self.message_board.is_participant(id_negotiation, self.id):
@@ -63,28 +45,31 @@ class Supplier(Agent):
         if not self.process_message(last_message):
             return
 
-        # Appliquer la stratégie
+        # Appliquer la stratégie au prix courant de cette négociation
+        negotiation = self.negotiation_state(id_negotiation)
+        negotiation.counterpart = last_message.id
         if self.strategy_type == "default":
             response_price, state = strategies.supplier_default_strategy(
-                self.current_price, self.min_price, last_message.price
+                negotiation.price, self.min_price, last_message.price
             )
         elif self.strategy_type == "conciliatory":
             response_price, state = strategies.supplier_conciliatory_strategy(
-                self.current_price, self.min_price, last_message.price
+                negotiation.price, self.min_price, last_message.price
             )
         else:
             response_price, state = strategies.supplier_default_strategy(
-                self.current_price, self.min_price, last_message.price
+                negotiation.price, self.min_price, last_message.price
             )
 
+        negotiation.round += 1
+        if state == "processing":
+            negotiation.price = response_price
         self.send_message(id_negotiation, response_price, state)
 
-        if state == "processing":
-            self.current_price = response_price
-        elif state == "accepted":
+        if state == "accepted":
             self.ticket_remaining -= 1
             if self.ticket_remaining <= 0:
-                print(f"Supplier {self.id} has no more tickets to sell.")
+                logger.info("Supplier %s has no more tickets to sell.", self.id, extra={"agent": self.id})
 
                 
     def start_negotiation(self):
@@ -92,12 +77,8 @@ class Supplier(Agent):
         Démarre une nouvelle négociation.
         
         Returns:
-            str: L'identifiant de la négociation créée
+            NegotiationFuture: Future résolue par le message terminal de la négociation
+                (son identifiant est future.id_negotiation)
         """
-        id_negotiation = self.message_board.get_next_negotiation_id()
-        self.active_negotiations[id_negotiation] = -1
-
-        # Enregistrer le fournisseur comme participant
-        self.message_board.register_participant(id_negotiation, self.id)
-        self.send_message(id_negotiation, self.current_price)
-        return id_negotiation
\ No newline at end of file
+        # Ouverture groupée d'une seule négociation (voir Agent.start_negotiations)
+        return self.start_negotiations(1)[0]
\ No newline at end of file
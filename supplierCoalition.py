@@ -1,44 +1,47 @@
-from agent import Agent
+from agent import Agent, logger
 import strategies
-import time
+from coalition_value import coalition_value
 
 class SupplierCoalition(Agent):
     def __init__(self, coalition_id, message_board, members):
         super().__init__(coalition_id, "supplier", message_board)
         self.members = members
-        self.negotiations_to_process = set()
 
+        self.first_price = max(member.min_price * 1.5 for member in members)
+        self.update_aggregates()
+
+    def update_aggregates(self):
+        """Recalcule les attributs fusionnés des membres (le prix courant est conservé)."""
+        members = self.members
         self.coalition_value = self.calculate_value()
         self.min_price = sum(member.min_price for member in members) / len(members)
-        self.first_price = max(member.min_price * 1.5 for member in members)
-        self.current_price = self.first_price
         self.ticket_remaining = sum(member.ticket_remaining for member in members)
         self.company = f"Coalition-{'-'.join([member.company for member in members])}"
         self.strategy_type = "default"
         if any(member.strategy_type == "conciliatory" for member in members):
             self.strategy_type = "conciliatory"
 
-    def calculate_value(self):
-        base_value = len(self.members) * 15
-        price_range = max(member.min_price for member in self.members) - min(member.min_price for member in self.members)
-        diversity_factor = 1 + (price_range / 1000)
-        strategies_count = len(set(member.strategy_type for member in self.members))
-        strategy_factor = 1 + (strategies_count / len(self.members)) * 0.2
-        return base_value * diversity_factor * strategy_factor
+    def add_member(self, member):
+        """Ajoute un fournisseur à la coalition sans interrompre ses négociations."""
+        self.members = self.members + [member]
+        self.update_aggregates()
 
-    def notify(self, id_negotiation):
-        self.negotiations_to_process.add(id_negotiation)
+    def remove_member(self, member):
+        """Retire un fournisseur de la coalition sans interrompre ses négociations."""
+        self.members = [m for m in self.members if m is not member]
+        self.update_aggregates()
 
-    def run(self):
-        while self.running:
-            negotiations = self.negotiations_to_process.copy()
-            for id_negotiation in negotiations:
-                self.handle_negotiation(id_negotiation)
-                self.negotiations_to_process.remove(id_negotiation)
-            time.sleep(0.1)
+    def calculate_value(self):
+        return self.value_of(self.members)
+
+    @staticmethod
+    def value_of(members):
+        return coalition_value(members, "supplier")
 
     def handle_negotiation(self, id_negotiation):
         last_message = self.message_board.get_last_message(id_negotiation)
+        # Avant le filtre sur l'émetteur : un abandon "system" termine aussi la négociation
+        self.release_if_terminal(last_message)
         if not self.message_board.is_participant(id_negotiation, self.id):
             return
         if last_message.type != "buyer":
@@ -46,38 +49,43 @@ class SupplierCoalition(Agent):
         if not self.process_message(last_message):
             return
 
+        negotiation = self.negotiation_state(id_negotiation)
+        negotiation.counterpart = last_message.id
         if self.strategy_type == "default":
             response_price, state = strategies.supplier_default_strategy(
-                self.current_price, self.min_price, last_message.price
+                negotiation.price, self.min_price, last_message.price
             )
         elif self.strategy_type == "conciliatory":
             response_price, state = strategies.supplier_conciliatory_strategy(
-                self.current_price, self.min_price, last_message.price
+                negotiation.price, self.min_price, last_message.price
             )
         else:
             response_price, state = strategies.supplier_default_strategy(
-                self.current_price, self.min_price, last_message.price
+                negotiation.price, self.min_price, last_message.price
             )
 
+        negotiation.round += 1
+        if state == "processing":
+            negotiation.price = response_price
         self.send_message(id_negotiation, response_price, state)
 
-        if state == "processing":
-            self.current_price = response_price
-        elif state == "accepted":
+        if state == "accepted":
+            # Le ticket vendu est pris au membre qui en a le plus
+            seller = max(self.members, key=lambda member: member.ticket_remaining)
+            seller.ticket_remaining -= 1
             self.ticket_remaining -= 1
-            print(f"Supplier Coalition {self.id} completed a sale at {response_price}")
+            logger.info("Supplier Coalition %s completed a sale at %s", self.id, response_price,
+                        extra={"agent": self.id, "negotiation": id_negotiation, "price": response_price, "state": state})
             if self.ticket_remaining <= 0:
-                print(f"Supplier Coalition {self.id} has no more tickets to sell.")
+                logger.info("Supplier Coalition %s has no more tickets to sell.", self.id, extra={"agent": self.id})
 
     def start_negotiation(self):
         """
         Démarre une nouvelle négociation.
 
         Returns:
-            str: L'identifiant de la négociation créée
+            NegotiationFuture: Future résolue par le message terminal de la négociation
+                (son identifiant est future.id_negotiation)
         """
-        id_negotiation = self.message_board.get_next_negotiation_id()
-        self.active_negotiations[id_negotiation] = -1
-        self.message_board.register_participant(id_negotiation, self.id)
-        self.send_message(id_negotiation, self.current_price)
-        return id_negotiation
\ No newline at end of file
+        # Ouverture groupée d'une seule négociation (voir Agent.start_negotiations)
+        return self.start_negotiations(1)[0]
\ No newline at end of file
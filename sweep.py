@@ -0,0 +1,189 @@
+import csv
+import itertools
+import os
+import signal
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from main import run_multiple_negotiations, run_multiple_negotiations_with_coalitions
+
+# Grille par défaut : chaque clé prend toutes les valeurs de sa liste
+DEFAULT_GRID = {
+    "num_suppliers": [4, 8],
+    "num_buyers": [4, 8],
+    "negotiations_per_supplier": [2],
+    "supplier_strategy": ["default", "conciliatory", "mixed"],
+    "buyer_strategy": ["default", "aggressive", "mixed"],
+    "coalition_algo": ["none", "coupling", "idp", "token"],
+    "coalition_type": ["buyers", "suppliers", "both"],
+    "max_coalition_size": [2, 3],
+    "seed": [0],
+}
+
+RESULT_FIELDS = ["status", "error", "negotiations", "accepted", "aborted", "acceptance_rate",
+                 "average_price", "min_price", "max_price", "buyer_coalitions", "supplier_coalitions", "elapsed"]
+
+
+def build_configurations(grid=None):
+    """
+    Construit le produit cartésien d'une grille de paramètres.
+
+    Les configurations sans coalition ne sont générées qu'une fois
+    (coalition_type et max_coalition_size n'ont alors pas d'effet).
+
+    Args:
+        grid (dict): Paramètre -> liste de valeurs (DEFAULT_GRID par défaut)
+
+    Returns:
+        list: Liste de configurations (dict)
+    """
+    grid = grid or DEFAULT_GRID
+    keys = list(grid)
+    configurations = []
+    seen = set()
+    for values in itertools.product(*(grid[key] for key in keys)):
+        config = dict(zip(keys, values))
+        if config.get("coalition_algo", "none") == "none":
+            config["coalition_type"] = "none"
+            config["max_coalition_size"] = 0
+        key = tuple(sorted(config.items()))
+        if key not in seen:
+            seen.add(key)
+            configurations.append(config)
+    return configurations
+
+
+def run_scenario(config):
+    """
+    Exécute une configuration avec son propre SharedMessageBoard, dans le moteur simulé.
+
+    Le scénario passe par les fonctions de main.py (mêmes agents, même carnet
+    d'ordres, toutes les négociations ouvertes d'un coup) : une configuration donne
+    le même résultat ici et dans main.py avec la même graine.
+
+    Args:
+        config (dict): Une configuration produite par build_configurations
+
+    Returns:
+        dict: La configuration complétée par les statistiques du scénario
+    """
+    start = time.perf_counter()
+    options = {key: config[key] for key in ("supplier_strategy", "buyer_strategy", "matchmaking") if key in config}
+    common = dict(num_suppliers=config["num_suppliers"], num_buyers=config["num_buyers"],
+                  negotiations_per_supplier=config["negotiations_per_supplier"], engine="simulated",
+                  seed=config.get("seed"), verbose=False, save_reports=False, **options)
+    algo = config.get("coalition_algo", "none")
+    if algo == "none":
+        results = run_multiple_negotiations(**common)
+    else:
+        results = run_multiple_negotiations_with_coalitions(coalition_algo=algo, coalition_type=config["coalition_type"],
+                                                            max_coalition_size=config["max_coalition_size"], **common)
+
+    summary = results["summary"]
+    return {
+        **config,
+        "status": "ok",
+        "error": "",
+        "negotiations": summary["total"],
+        "accepted": summary["accepted"],
+        "aborted": summary["aborted"],
+        "acceptance_rate": summary["accepted"] / summary["total"] if summary["total"] else 0,
+        "average_price": summary["average_price"],
+        "min_price": summary["min_price"],
+        "max_price": summary["max_price"],
+        "buyer_coalitions": results.get("buyer_coalitions", 0),
+        "supplier_coalitions": results.get("supplier_coalitions", 0),
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def _alarm(signum, frame):
+    raise TimeoutError("scenario timed out")
+
+
+def run_scenario_safely(config, timeout=None):
+    """
+    Exécute une configuration dans un processus de travail sans jamais lever d'exception.
+
+    Les journaux des agents restent désactivés (voir logs.setup_logging). Sur les
+    systèmes qui disposent de SIGALRM, le scénario est interrompu au bout de timeout secondes.
+
+    Args:
+        config (dict): La configuration à exécuter
+        timeout (float): Durée maximale du scénario en secondes (None = illimitée)
+
+    Returns:
+        dict: Le résultat du scénario, avec status "ok", "failed" ou "timeout"
+    """
+    use_alarm = timeout and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return run_scenario(config)
+    except TimeoutError:
+        return {**config, "status": "timeout", "error": f"exceeded {timeout} s"}
+    except Exception as exc:
+        return {**config, "status": "failed", "error": f"{type(exc).__name__}: {exc}",
+                "traceback": traceback.format_exc()}
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def run_sweep(configurations, max_workers=None, timeout=60):
+    """
+    Répartit les configurations sur un ProcessPoolExecutor (un processus par cœur par défaut).
+
+    Une configuration en échec ou hors délai est enregistrée comme telle sans
+    interrompre le balayage.
+
+    Args:
+        configurations (list): Configurations à exécuter
+        max_workers (int): Nombre de processus (os.cpu_count() par défaut)
+        timeout (float): Durée maximale d'un scénario en secondes
+
+    Returns:
+        list: Un résultat (dict) par configuration, dans l'ordre des configurations
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_scenario_safely, config, timeout) for config in configurations]
+        for config, future in zip(configurations, futures):
+            try:
+                results.append(future.result())
+            except BrokenProcessPool as exc:
+                results.append({**config, "status": "failed", "error": f"worker crashed: {exc}"})
+    return results
+
+
+def save_sweep_to_csv(results, filename="parameter_sweep.csv"):
+    """
+    Enregistre les résultats d'un balayage dans une table CSV unique.
+
+    Args:
+        results (list): Résultats renvoyés par run_sweep
+        filename (str): Nom du fichier dans ./result
+    """
+    output_dir = "./result"
+    os.makedirs(output_dir, exist_ok=True)
+    full_path = os.path.join(output_dir, filename)
+
+    config_fields = [key for key in results[0] if key not in RESULT_FIELDS and key != "traceback"] if results else []
+    with open(full_path, mode="w", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=config_fields + RESULT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Résultats du balayage enregistrés dans {full_path}")
+
+
+if __name__ == "__main__":
+    configurations = build_configurations()
+    print(f"Running {len(configurations)} configurations on {os.cpu_count()} cores...")
+    start = time.perf_counter()
+    results = run_sweep(configurations)
+    failed = sum(1 for r in results if r["status"] != "ok")
+    print(f"Done in {time.perf_counter() - start:.1f} s ({failed} failed or timed out)")
+    save_sweep_to_csv(results)
@@ -0,0 +1,53 @@
+import time
+
+from buyer import Buyer
+from shared_board import SharedMessageBoard
+from supplier import Supplier
+from timer_wheel import NegotiationDeadlines, TimerWheel
+from worker_pool import WorkerPool
+
+
+def expire_all(board, futures):
+    for future in futures:
+        assert future.result(timeout=5).state == "aborted"
+    # Laisser les agents traiter la notification de l'abandon
+    time.sleep(0.1)
+
+
+def test_expired_negotiation_leaves_no_supplier_state():
+    board = SharedMessageBoard()
+    deadlines = NegotiationDeadlines(board, 0.02, wheel=TimerWheel(tick=0.005))
+    pool = WorkerPool(2)
+    supplier = Supplier("S_1", board, 300, 500, company="A")
+    supplier.start(pool)
+    try:
+        # Aucun acheteur : personne ne répond, les négociations expirent
+        expire_all(board, supplier.start_negotiations(5))
+
+        assert supplier.negotiation_states == {}
+    finally:
+        supplier.stop()
+        pool.shutdown()
+        deadlines.close()
+        deadlines.wheel.stop()
+
+
+def test_expired_negotiation_leaves_no_buyer_state():
+    board = SharedMessageBoard()
+    deadlines = NegotiationDeadlines(board, 0.05, wheel=TimerWheel(tick=0.005))
+    pool = WorkerPool(2)
+    # Le fournisseur n'est pas démarré : l'acheteur répond une fois puis attend
+    supplier = Supplier("S_1", board, 300, 500, company="A")
+    buyer = Buyer("B_1", board, 450, 200)
+    buyer.start(pool)
+    try:
+        futures = supplier.start_negotiations(5)
+        expire_all(board, futures)
+
+        assert all(len(board.get_all_messages(f.id_negotiation)) == 3 for f in futures)
+        assert buyer.negotiation_states == {}
+    finally:
+        buyer.stop()
+        pool.shutdown()
+        deadlines.close()
+        deadlines.wheel.stop()
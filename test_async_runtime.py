@@ -0,0 +1,33 @@
+import asyncio
+import logging
+
+from async_runtime import AsyncMessageBoard, run_async_negotiations
+from buyer import Buyer
+from shared_board import SharedMessageBoard
+from supplier import Supplier
+
+
+def test_runtime_finishes_every_negotiation():
+    board = SharedMessageBoard()
+    suppliers = [Supplier(f"S_{i}", board, 300, 500, company="A") for i in range(3)]
+    buyers = [Buyer(f"B_{i}", board, 450, 200) for i in range(3)]
+
+    negotiations = asyncio.run(run_async_negotiations(board, suppliers, buyers, 2, timeout=5))
+
+    assert len(negotiations) == 6
+    assert all(board.get_last_message(i).is_terminal() for i in negotiations)
+
+
+def test_timeout_is_logged_with_the_open_negotiations(caplog):
+    board = SharedMessageBoard()
+    supplier = Supplier("S_1", board, 300, 500, company="A")
+
+    async def wait():
+        # Aucun agent ne tourne : la négociation reste ouverte
+        return await AsyncMessageBoard(board).wait_until_finished(supplier.start_negotiations(1), timeout=0.01)
+
+    assert len(asyncio.run(wait())) == 1
+
+    with caplog.at_level(logging.WARNING, logger="negotiation.async"):
+        asyncio.run(run_async_negotiations(board, [supplier], [], 1, timeout=0.01))
+    assert "Timeout reached, 1 negotiations" in caplog.text
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from coalition import idp_coalition_formation
+from coalition_value import coalition_value
+from shared_board import SharedMessageBoard
+from supplier import Supplier
+
+
+def make_suppliers(n, seed):
+    board = SharedMessageBoard()
+    rng = random.Random(seed)
+    return [Supplier(f"S_{i}", board, rng.randint(100, 400), 600,
+                     strategy_type=rng.choice(["linear", "tit_for_tat", "boulware"])) for i in range(n)]
+
+
+def partitions(agents):
+    """Toutes les partitions d'une liste d'agents."""
+    if not agents:
+        yield []
+        return
+    first, rest = agents[0], agents[1:]
+    for partition in partitions(rest):
+        yield [[first]] + partition
+        for i, group in enumerate(partition):
+            yield partition[:i] + [[first] + group] + partition[i + 1:]
+
+
+def structure_value(groups):
+    return sum(coalition_value(group, "supplier") for group in groups if len(group) > 1)
+
+
+@pytest.mark.parametrize("n, max_size", [(1, None), (4, None), (6, 2), (7, 3), (7, None)])
+def test_idp_matches_brute_force(n, max_size):
+    agents = make_suppliers(n, seed=n)
+    limit = max_size or n
+    expected = max(structure_value(p) for p in partitions(agents) if all(len(g) <= limit for g in p))
+
+    coalitions = idp_coalition_formation(agents, "supplier", max_coalition_size=max_size)
+
+    assert structure_value([c.members for c in coalitions]) == pytest.approx(expected)
+    assert all(len(c.members) <= limit for c in coalitions)
+    members = [m.id for c in coalitions for m in c.members]
+    assert len(members) == len(set(members))
+
+
+def test_idp_refuses_an_intractable_search(monkeypatch):
+    monkeypatch.setattr("coalition.IDP_MAX_TRANSITIONS", 1000)
+
+    with pytest.raises(ValueError):
+        idp_coalition_formation(make_suppliers(12, seed=0), "supplier", max_coalition_size=None)
+    with pytest.raises(ValueError):
+        idp_coalition_formation(make_suppliers(12, seed=0), "supplier", max_coalition_size=3)
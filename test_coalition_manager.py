@@ -0,0 +1,87 @@
+from buyer import Buyer
+from buyerCoalition import BuyerCoalition
+from coalition_manager import CoalitionManager
+from matchmaking import MatchmakingBook
+from message import Message
+from shared_board import SharedMessageBoard
+from worker_pool import WorkerPool
+
+
+def opening(id_negotiation, company="A"):
+    return Message("supplier", "S_1", id_negotiation, 500.0, "processing", 0, 10, company)
+
+
+def make_board():
+    board = SharedMessageBoard()
+    return board, MatchmakingBook(board)
+
+
+def test_retired_single_leaves_the_book_and_the_board():
+    board, book = make_board()
+    leaving, staying = Buyer("B_1", board, 900, 450), Buyer("B_2", board, 400, 200)
+    book.add_buyers([leaving, staying])
+    manager = CoalitionManager(board, "buyer", singles=[leaving, staying], start_agents=False)
+
+    manager.retire_agent(leaving)
+
+    assert "B_1" not in book.buyers
+    assert book.assign(1, "A") is staying
+    assert not leaving.running
+    assert "B_1" not in board.observers_by_id
+    assert manager.singles == [staying]
+
+
+def test_retired_single_finishes_its_negotiation_first():
+    board, book = make_board()
+    buyer = Buyer("B_1", board, 900, 450)
+    book.add_buyers([buyer])
+    manager = CoalitionManager(board, "buyer", singles=[buyer], start_agents=False)
+    board.add_message(opening(1))
+    assert book.assignments[1] is buyer
+
+    manager.retire_agent(buyer)
+
+    assert "B_1" not in book.buyers
+    assert buyer.running and "B_1" in board.observers_by_id
+    board.add_message(Message("supplier", "S_1", 1, 450.0, "accepted", 1, 9, "A"))
+    assert not buyer.running
+    assert "B_1" not in board.observers_by_id
+
+
+def test_joining_member_updates_the_coalition_in_the_book():
+    board, book = make_board()
+    coalition = BuyerCoalition("Coalition_B_1", board, [Buyer("B_1", board, 400, 200), Buyer("B_2", board, 400, 200)])
+    other = Buyer("B_other", board, 900, 450)
+    book.add_buyers([coalition, other])
+    manager = CoalitionManager(board, "buyer", coalitions=[coalition], start_agents=False)
+    fan = Buyer("B_fan", board, 400, 200, favourite_companies=["Z"])
+
+    assert manager.add_agent(fan) is coalition
+
+    # La compagnie préférée du nouveau membre est désormais indexée pour la coalition
+    assert book.assign(1, "Z") is coalition
+
+    manager.retire_agent(fan)
+
+    assert book.assign(2, "Z") is other
+    assert "Z" not in coalition.favourite_companies
+
+
+def test_dissolved_coalition_hands_its_member_back_to_the_book():
+    board, book = make_board()
+    first, second = Buyer("B_1", board, 400, 200), Buyer("B_2", board, 300, 150)
+    coalition = BuyerCoalition("Coalition_B_1", board, [first, second])
+    book.add_buyers([coalition])
+    pool = WorkerPool(1)
+    manager = CoalitionManager(board, "buyer", coalitions=[coalition], pool=pool)
+    try:
+        manager.retire_agent(first)
+
+        assert manager.coalitions == [] and manager.singles == [second]
+        assert "Coalition_B_1" not in book.buyers
+        assert "Coalition_B_1" not in board.observers_by_id
+        assert not coalition.running
+        assert book.assign(1, "A") is second
+    finally:
+        second.stop()
+        pool.shutdown()
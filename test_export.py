@@ -0,0 +1,56 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from export import export_messages
+from message import Message
+from shared_board import SharedMessageBoard
+
+
+def make_board(columnar):
+    board = SharedMessageBoard(columnar=columnar)
+    for id_negotiation in range(1, 8):
+        company = "ABC"[id_negotiation % 3]
+        board.add_message(Message("supplier", f"S_{id_negotiation}", id_negotiation, 500.0, "processing", 0, 10, company))
+        # Message en retard : le journal est trié à la lecture
+        board.add_message(Message("supplier", f"S_{id_negotiation}", id_negotiation, 420.0, "processing", 1, 8, company))
+        board.add_message(Message("buyer", f"B_{id_negotiation % 2}", id_negotiation, 300.0 + id_negotiation,
+                                  "processing", 0, 9, company))
+        if id_negotiation % 2:
+            board.add_message(Message("buyer", "B_1", id_negotiation, 420.0, "accepted", 1, 7, company))
+    return board
+
+
+def board_rows(board):
+    return [{"id_negotiation": i, "sender": m.id, "type": m.type, "message_number": m.message_number,
+             "price": m.price, "state": m.state, "message_remaining": m.message_remaining, "company": m.company}
+            for i in sorted(board.messages.keys()) for m in board.get_all_messages(i)]
+
+
+def read(path, format):
+    if format == "parquet":
+        return pq.read_table(path)
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+@pytest.mark.parametrize("columnar", [False, True])
+def test_export_round_trips_the_board(tmp_path, monkeypatch, format, columnar):
+    monkeypatch.chdir(tmp_path)
+    board = make_board(columnar)
+
+    # Lots de 5 messages : les tables de symboles grandissent d'un lot à l'autre
+    count = export_messages(board, f"messages.{format}", format=format, batch_size=5)
+
+    expected = board_rows(board)
+    assert count == len(expected)
+    assert read(tmp_path / "result" / f"messages.{format}", format).to_pylist() == expected
+
+
+def test_unknown_format_is_refused(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(ValueError):
+        export_messages(make_board(False), "messages.csv", format="csv")
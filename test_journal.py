@@ -0,0 +1,58 @@
+import pytest
+
+from buyer import Buyer
+from journal import MessageJournal, replay_journal
+from matchmaking import MatchmakingBook
+from shared_board import SharedMessageBoard
+from supplier import Supplier
+from worker_pool import WorkerPool
+
+
+def run_journaled_board(path, synchronous):
+    """Exécute quelques négociations sur un tableau journalisé et retourne le tableau et ses négociations."""
+    journal = MessageJournal(str(path), synchronous=synchronous)
+    board = SharedMessageBoard(journal=journal)
+    suppliers = [Supplier(f"S_{i}", board, 300, 500, company="A") for i in range(3)]
+    buyers = [Buyer(f"B_{i}", board, 450, 200) for i in range(4)]
+    MatchmakingBook(board).add_buyers(buyers)
+    pool = WorkerPool(4)
+    for agent in suppliers + buyers:
+        agent.start(pool)
+    futures = [future for supplier in suppliers for future in supplier.start_negotiations(5)]
+    for future in futures:
+        future.result(timeout=10)
+    for agent in suppliers + buyers:
+        agent.stop()
+    pool.shutdown()
+    journal.close()
+    return board, [future.id_negotiation for future in futures]
+
+
+def transcript(board, id_negotiation):
+    return [(m.id, m.type, m.message_number, m.message_remaining, m.price, m.state, m.company)
+            for m in board.get_all_messages(id_negotiation)]
+
+
+@pytest.mark.parametrize("synchronous", [False, True])
+@pytest.mark.parametrize("columnar", [False, True])
+def test_replay_rebuilds_the_same_board(tmp_path, synchronous, columnar):
+    board, negotiations = run_journaled_board(tmp_path / "board.journal", synchronous)
+
+    replayed = replay_journal(str(tmp_path / "board.journal"), columnar=columnar)
+
+    assert sorted(replayed.messages.keys()) == sorted(board.messages.keys())
+    for id_negotiation in negotiations:
+        assert transcript(replayed, id_negotiation) == transcript(board, id_negotiation)
+        assert (replayed.get_negotiation_participants(id_negotiation)
+                == board.get_negotiation_participants(id_negotiation))
+        assert replayed.has_buyer_participant(id_negotiation) == board.has_buyer_participant(id_negotiation)
+    assert replayed.get_next_negotiation_id() == max(negotiations) + 1
+
+
+def test_replay_without_mmap(tmp_path):
+    board, negotiations = run_journaled_board(tmp_path / "board.journal", synchronous=False)
+
+    replayed = replay_journal(str(tmp_path / "board.journal"), use_mmap=False)
+
+    for id_negotiation in negotiations:
+        assert transcript(replayed, id_negotiation) == transcript(board, id_negotiation)
@@ -0,0 +1,141 @@
+import random
+
+from buyer import Buyer
+from matchmaking import MatchmakingBook
+from message import Message
+from shared_board import SharedMessageBoard
+
+
+def make_book(capacity=None, **buyers):
+    """Carnet sur un tableau neuf ; buyers : id -> (prix maximum, options de Buyer)."""
+    board = SharedMessageBoard()
+    book = MatchmakingBook(board, capacity=capacity)
+    agents = {agent_id: Buyer(agent_id, board, max_price, max_price * 0.5, **options)
+              for agent_id, (max_price, options) in buyers.items()}
+    book.add_buyers(list(agents.values()))
+    return board, book, agents
+
+
+def finish(book, id_negotiation):
+    book.on_outcome(Message("buyer", "B", id_negotiation, 1.0, "accepted", 3, 0, "A"), set())
+
+
+def test_least_loaded_first_then_highest_price():
+    board, book, _ = make_book(B_low=(300, {}), B_high=(400, {}))
+
+    assert book.assign(1, "A").id == "B_high"
+    assert book.assign(2, "A").id == "B_low"
+    assert book.assign(3, "A").id == "B_high"
+    assert board.is_participant(1, "B_high")
+
+
+def test_capacity_queues_negotiations_until_an_outcome():
+    board, book, _ = make_book(capacity=1, B_1=(400, {}))
+
+    assert book.assign(1, "A").id == "B_1"
+    assert book.assign(2, "A") is None
+    assert book.assign(3, "A") is None
+    assert book.waiting_ids == {2, 3}
+
+    finish(book, 1)
+
+    assert book.assignments[2].id == "B_1"
+    assert book.waiting_ids == {3}
+    assert board.is_participant(2, "B_1")
+
+
+def test_blocked_company_is_never_assigned():
+    _, book, _ = make_book(B_1=(400, {"blocked_companies": ["A"]}))
+
+    assert book.assign(1, "A") is None
+    assert book.assign(2, "B").id == "B_1"
+    assert book.waiting_ids == {1}
+
+
+def test_waiting_negotiation_goes_to_a_new_compatible_buyer():
+    board, book, _ = make_book(B_1=(400, {"blocked_companies": ["A"]}))
+    book.assign(1, "A")
+
+    book.add_buyers([Buyer("B_2", board, 300, 150)])
+
+    assert book.assignments[1].id == "B_2"
+    assert not book.waiting_ids
+
+
+def test_favourite_beats_higher_price_and_worst_is_a_fallback():
+    _, book, _ = make_book(
+        B_rich=(500, {"worst_companies": ["A"]}),
+        B_fan=(300, {"favourite_companies": ["A"]}),
+        B_other=(400, {}),
+    )
+
+    assert book.assign(1, "A").id == "B_fan"
+    assert book.assign(2, "A").id == "B_other"
+
+    _, book, _ = make_book(B_rich=(500, {"worst_companies": ["A"]}), B_blocks=(600, {"blocked_companies": ["A"]}))
+    assert book.assign(1, "A").id == "B_rich"
+
+
+def test_favourite_that_blocks_the_company_is_skipped_and_kept():
+    board, book, agents = make_book(capacity=1, B_fan=(400, {"favourite_companies": ["A", "B"]}),
+                                    B_other=(300, {}))
+    # La coalition change ses listes après son inscription
+    agents["B_fan"].blocked_companies = ["A"]
+
+    assert book.assign(1, "A").id == "B_other"
+    assert book.assign(2, "B").id == "B_fan"
+
+
+def test_removed_buyer_keeps_its_negotiations_but_gets_no_new_ones():
+    _, book, agents = make_book(B_1=(400, {}), B_2=(300, {}))
+    assert book.assign(1, "A").id == "B_1"
+
+    book.remove_buyer(agents["B_1"])
+
+    assert book.assigned_negotiations(agents["B_1"]) == [1]
+    assert book.assign(2, "A").id == "B_2"
+    assert book.assign(3, "A").id == "B_2"
+
+
+def expected_buyer(book, agents, company):
+    """Choix attendu par examen de tous les acheteurs (même règle que le carnet)."""
+    def best(candidates):
+        # Entrée courante : (charge, -prix, ordre de placement, acheteur) ; absente si plein
+        entries = [book.entries[b.id] for b in candidates if b.id in book.entries]
+        return min(entries)[3] if entries else None
+
+    allowed = [b for b in agents.values() if company not in b.blocked_companies]
+    favourite = best([b for b in allowed if company in b.favourite_companies])
+    compatible = best([b for b in allowed if company not in b.worst_companies])
+    if favourite is not None and (compatible is None
+                                  or book.load[favourite.id] <= book.load[compatible.id]):
+        return favourite
+    return compatible or best([b for b in allowed if company in b.worst_companies])
+
+
+def test_heaps_match_a_full_scan():
+    rng = random.Random(7)
+    companies = ["A", "B", "C", "D"]
+    buyers = {}
+    for i in range(12):
+        picked = rng.sample(companies, 3)
+        buyers["B_%d" % i] = (rng.randint(200, 600), {"favourite_companies": picked[:1],
+                                                      "worst_companies": picked[1:2],
+                                                      "blocked_companies": picked[2:3]})
+    _, book, agents = make_book(capacity=2, **buyers)
+    running = []
+    assigned = 0
+    for id_negotiation in range(400):
+        if running and rng.random() < 0.45:
+            finish(book, running.pop(rng.randrange(len(running))))
+            continue
+        company = rng.choice(companies)
+        expected = expected_buyer(book, agents, company)
+        assert book.assign(id_negotiation, company) is expected
+        if expected is None:
+            # Abandonnée aussitôt : la file d'attente ne fausse pas les choix suivants
+            book.waiting_ids.discard(id_negotiation)
+        else:
+            running.append(id_negotiation)
+        assigned += expected is not None
+    assert assigned > 100
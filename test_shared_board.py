@@ -0,0 +1,35 @@
+import pytest
+
+from message import Message
+from message_store import ColumnarMessageStore
+from shared_board import SharedMessageBoard
+
+
+def message(number, price, sender="S_1"):
+    return Message("supplier", sender, 1, price, "processing", number, 10 - number, "A")
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_late_messages_are_read_in_number_order(columnar):
+    board = SharedMessageBoard(columnar=columnar)
+    # Deux messages de même numéro gardent leur ordre d'arrivée (tri stable)
+    for number, price, sender in [(0, 500.0, "S_1"), (2, 450.0, "S_1"), (1, 300.0, "B_1"), (1, 310.0, "B_2")]:
+        board.add_message(message(number, price, sender))
+
+    assert [(m.message_number, m.id) for m in board.get_all_messages(1)] == [(0, "S_1"), (1, "B_1"), (1, "B_2"), (2, "S_1")]
+    assert board.get_last_message(1).message_number == 2
+
+    board.add_message(message(3, 440.0))
+    assert board.get_last_message(1).price == 440.0
+
+
+def test_columnar_store_does_not_rebuild_messages(monkeypatch):
+    board = SharedMessageBoard(columnar=True)
+    built = []
+    monkeypatch.setattr(ColumnarMessageStore, "materialize",
+                        lambda store, id_negotiation, row: built.append(row))
+
+    for number in (0, 2, 1, 3):
+        board.add_message(message(number, 400.0))
+
+    assert built == []
@@ -0,0 +1,35 @@
+from buyer import Buyer
+from shared_board import SharedMessageBoard
+from simulation import NegotiationSimulator
+from supplier import Supplier
+
+
+def simulate(seed):
+    """Négociations en diffusion (sans carnet) : le premier acheteur servi dépend des délais tirés."""
+    board = SharedMessageBoard()
+    suppliers = [Supplier(f"S_{i}", board, 250 + 30 * i, 500, company="ABC"[i % 3],
+                          strategy_type="conciliatory" if i % 2 else "default") for i in range(4)]
+    buyers = [Buyer(f"B_{i}", board, 380 + 25 * i, 150 + 10 * i, strategy_type="aggressive" if i % 2 else "default")
+              for i in range(5)]
+    simulator = NegotiationSimulator(board, suppliers + buyers, seed=seed)
+    futures = [future for supplier in suppliers for future in supplier.start_negotiations(3)]
+    events = simulator.run()
+    transcript = [[(m.id, m.state, m.price, m.message_remaining) for m in board.get_all_messages(f.id_negotiation)]
+                  for f in futures]
+    return events, transcript, simulator.now
+
+
+def test_same_seed_gives_the_same_run():
+    first = simulate(seed=42)
+
+    assert first == simulate(seed=42)
+    events, transcript, _ = first
+    assert events > 0
+    # Chaque négociation est allée au bout : conclue, annulée ou à court de messages
+    assert all(messages[-1][1] != "processing" or messages[-1][3] == 0 for messages in transcript)
+
+
+def test_seed_drives_the_order_of_reactions():
+    runs = {seed: simulate(seed) for seed in range(5)}
+
+    assert len({repr(run) for run in runs.values()}) > 1
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from message import Message
+from shared_board import SharedMessageBoard
+from timer_wheel import NegotiationDeadlines, TimerWheel
+
+# Marge pour l'ordonnanceur du système (le thread de la roue peut être réveillé en retard)
+SLACK = 0.05
+
+
+def fire_times(wheel, delays):
+    """Programme une échéance par délai et retourne le retard constaté de chacune."""
+    lateness = {}
+    done = threading.Event()
+
+    def fired(delay, scheduled):
+        lateness[delay] = time.monotonic() - scheduled - delay
+        if len(lateness) == len(delays):
+            done.set()
+
+    for delay in delays:
+        wheel.schedule(delay, fired, delay, time.monotonic())
+    assert done.wait(max(delays) + 2)
+    return lateness
+
+
+@pytest.fixture
+def wheel():
+    wheel = TimerWheel(tick=0.005)
+    yield wheel
+    wheel.stop()
+
+
+def test_timers_never_fire_early_and_at_most_one_tick_late(wheel):
+    lateness = fire_times(wheel, [0.0, 0.01, 0.02, 0.05])
+
+    for late in lateness.values():
+        assert 0 <= late <= wheel.tick + SLACK
+
+
+def test_timers_cascade_across_levels():
+    # 4 alvéoles par niveau : 0.3 s = 60 tics passe par le niveau 2
+    wheel = TimerWheel(tick=0.005, wheel_size=4, levels=3)
+    try:
+        lateness = fire_times(wheel, [0.01, 0.03, 0.1, 0.3])
+    finally:
+        wheel.stop()
+
+    for late in lateness.values():
+        assert 0 <= late <= wheel.tick + SLACK
+
+
+def test_cancelled_timer_does_not_fire(wheel):
+    fired = []
+    timer = wheel.schedule(0.02, fired.append, "cancelled")
+    wheel.schedule(0.04, fired.append, "kept")
+    timer.cancel()
+
+    time.sleep(0.04 + wheel.tick + SLACK)
+
+    assert fired == ["kept"]
+
+
+def opening(id_negotiation):
+    return Message("supplier", "S_1", id_negotiation, 500.0, "processing", 0, 10, "A")
+
+
+def test_abort_if_open_closes_the_negotiation():
+    board = SharedMessageBoard()
+    board.add_message(opening(1))
+
+    abort = board.abort_if_open(1)
+
+    assert abort.state == "aborted" and abort.message_number == 1
+    assert board.abort_if_open(1) is None
+    # La réponse de l'agent arrive trop tard : refusée
+    assert not board.add_message(Message("buyer", "B_1", 1, 300.0, "processing", 1, 9, "A"))
+    assert board.get_all_messages(1)[-1] is abort
+
+
+def test_deadline_aborts_open_negotiations_only():
+    board = SharedMessageBoard()
+    deadlines = NegotiationDeadlines(board, 0.02, wheel=TimerWheel(tick=0.005))
+    try:
+        for id_negotiation in (1, 2):
+            board.add_message(opening(id_negotiation))
+            deadlines.watch(id_negotiation)
+        board.add_message(Message("buyer", "B_1", 2, 500.0, "accepted", 1, 9, "A"))
+
+        time.sleep(0.02 + 0.005 + SLACK)
+
+        assert board.get_last_message(1).state == "aborted"
+        assert board.get_last_message(2).state == "accepted"
+        assert deadlines.expired == 1
+    finally:
+        deadlines.close()
+        deadlines.wheel.stop()
@@ -0,0 +1,65 @@
+import random
+
+import numpy as np
+import pytest
+
+import strategies
+from message import STATES
+from vectorized_strategies import simulate_lockstep
+
+
+def scalar_negotiation(case, message_remaining):
+    """Même protocole que simulate_lockstep, une négociation à la fois avec les stratégies scalaires."""
+    company = "A"
+    favourites = [company] if case["favourite"] else []
+    worst = [company] if case["worst"] else []
+    blocked = [company] if case["blocked"] else []
+    buyer_price, supplier_price = case["buyer_first"], case["supplier_first"]
+    price, state, remaining, count = supplier_price, "processing", message_remaining, 1
+    buyer_turn = True
+    while state == "processing" and remaining > 0:
+        if buyer_turn:
+            strategy = strategies.buyer_aggressive_strategy if case["aggressive"] else strategies.buyer_default_strategy
+            price, state = strategy(buyer_price, case["max_price"], price, favourites, worst, blocked, company)
+            if state == "processing":
+                buyer_price = price
+        else:
+            strategy = (strategies.supplier_conciliatory_strategy if case["conciliatory"]
+                        else strategies.supplier_default_strategy)
+            price, state = strategy(supplier_price, case["min_price"], price)
+            if state == "processing":
+                supplier_price = price
+        remaining -= 1
+        count += 1
+        buyer_turn = not buyer_turn
+    return price, state, remaining, count
+
+
+@pytest.mark.parametrize("message_remaining", [1, 9])
+def test_lockstep_matches_the_scalar_strategies(message_remaining):
+    rng = random.Random(message_remaining)
+    cases = []
+    for _ in range(500):
+        favourite = rng.random() < 0.3
+        cases.append({
+            "buyer_first": rng.uniform(100, 300), "max_price": rng.uniform(200, 600),
+            "supplier_first": rng.uniform(300, 700), "min_price": rng.uniform(150, 500),
+            "favourite": favourite, "worst": not favourite and rng.random() < 0.3,
+            "blocked": rng.random() < 0.1,
+            "aggressive": rng.random() < 0.5, "conciliatory": rng.random() < 0.5,
+        })
+
+    def column(key):
+        return np.array([case[key] for case in cases])
+
+    result = simulate_lockstep(column("buyer_first"), column("max_price"), column("supplier_first"),
+                               column("min_price"), column("favourite"), column("worst"), column("blocked"),
+                               buyer_aggressive=column("aggressive"), supplier_conciliatory=column("conciliatory"),
+                               message_remaining=message_remaining)
+
+    for i, case in enumerate(cases):
+        price, state, remaining, count = scalar_negotiation(case, message_remaining)
+        assert result["price"][i] == pytest.approx(price)
+        assert STATES[result["state"][i]] == state
+        assert result["message_remaining"][i] == remaining
+        assert result["message_count"][i] == count
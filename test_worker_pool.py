@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+
+from agent import Agent
+from shared_board import SharedMessageBoard
+from worker_pool import WorkerPool
+
+
+class Recorder:
+    """Faux agent : enregistre ses passages dans le pool, le premier peut être bloqué."""
+
+    def __init__(self, agent_id, drained, gate=None):
+        self.id = agent_id
+        self.drained = drained
+        self.gate = gate
+
+    def drain(self):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.drained.append(self.id)
+
+
+class CountingAgent(Agent):
+    def __init__(self, agent_id, message_board):
+        super().__init__(agent_id, "supplier", message_board)
+        self.handled = []
+        self.active = 0
+        self.overlaps = 0
+
+    def handle_negotiation(self, id_negotiation):
+        self.active += 1
+        if self.active > 1:
+            self.overlaps += 1
+        time.sleep(0.0005)
+        self.handled.append(id_negotiation)
+        self.active -= 1
+
+
+def test_shutdown_drains_queued_agents_and_refuses_new_ones():
+    drained = []
+    gate = threading.Event()
+    pool = WorkerPool(1)
+    assert pool.submit(Recorder("busy", drained, gate))
+    for i in range(3):
+        assert pool.submit(Recorder(f"queued_{i}", drained))
+
+    closer = threading.Thread(target=pool.shutdown)
+    closer.start()
+    while pool.running:
+        time.sleep(0.001)
+    assert not pool.submit(Recorder("late", drained))
+    gate.set()
+    closer.join(5)
+
+    assert not closer.is_alive()
+    assert drained == ["busy", "queued_0", "queued_1", "queued_2"]
+    assert not any(thread.is_alive() for thread in pool.threads)
+
+
+def test_failing_agent_does_not_stop_its_worker(caplog):
+    class Failing:
+        id = "broken"
+
+        def drain(self):
+            raise RuntimeError("boom")
+
+    drained = []
+    with caplog.at_level(logging.ERROR, logger="negotiation.pool"):
+        with WorkerPool(1) as pool:
+            pool.submit(Failing())
+            pool.submit(Recorder("after", drained))
+
+    assert drained == ["after"]
+    assert "Agent broken failed" in caplog.text
+
+
+def test_agent_is_never_handled_by_two_workers_at_once():
+    board = SharedMessageBoard()
+    agent = CountingAgent("S_1", board)
+    pool = WorkerPool(4)
+    agent.start(pool)
+
+    def notify(start):
+        for id_negotiation in range(start, start + 200):
+            agent.notify(id_negotiation)
+
+    notifiers = [threading.Thread(target=notify, args=(start,)) for start in (0, 200, 400, 600)]
+    for thread in notifiers:
+        thread.start()
+    for thread in notifiers:
+        thread.join()
+    deadline = time.monotonic() + 5
+    while len(set(agent.handled)) < 800 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    agent.stop()
+    pool.shutdown()
+
+    assert set(agent.handled) == set(range(800))
+    assert agent.overlaps == 0
+    assert not agent.queued
+
+
+def test_stopping_an_agent_after_its_pool_does_not_hang():
+    board = SharedMessageBoard()
+    agent = CountingAgent("S_1", board)
+    pool = WorkerPool(1)
+    agent.start(pool)
+    pool.shutdown()
+
+    # Le pool refuse l'agent : il ne reste pas marqué comme placé dans la file
+    agent.notify(1)
+    stopper = threading.Thread(target=agent.stop)
+    stopper.start()
+    stopper.join(5)
+
+    assert not stopper.is_alive()
+    assert agent.handled == []
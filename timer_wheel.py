@@ -0,0 +1,261 @@
+import math
+import threading
+import time
+
+
+# Durée d'un tic de la roue, en secondes
+TICK = 0.01
+
+# Nombre d'alvéoles par niveau et nombre de niveaux : 256 ** 4 tics (~1,4 an à 10 ms)
+WHEEL_SIZE = 256
+WHEEL_LEVELS = 4
+
+
+class Timer:
+    __slots__ = ("expiry", "callback", "args", "cancelled")
+
+    def __init__(self, expiry, callback, args):
+        """
+        Échéance enregistrée dans une TimerWheel.
+
+        Args:
+            expiry (int): Tic d'expiration
+            callback (callable): Fonction appelée à l'expiration
+            args (tuple): Arguments de la fonction
+        """
+        self.expiry = expiry
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Annule l'échéance (elle reste dans son alvéole et sera ignorée)."""
+        self.cancelled = True
+
+
+class TimerWheel:
+    def __init__(self, tick=TICK, wheel_size=WHEEL_SIZE, levels=WHEEL_LEVELS):
+        """
+        Roue temporelle hiérarchique : ajouter ou annuler une échéance coûte O(1),
+        quel que soit le nombre d'échéances en cours.
+
+        Le niveau 0 compte wheel_size tics ; chaque niveau suivant couvre wheel_size
+        alvéoles du niveau précédent. Quand le niveau 0 fait un tour, l'alvéole
+        courante du niveau supérieur est redistribuée vers les niveaux inférieurs.
+        Un thread démon avance la roue à chaque tic et appelle les fonctions des
+        échéances atteintes ; il dort tant qu'aucune échéance n'est en cours.
+
+        Args:
+            tick (float): Durée d'un tic en secondes (résolution des échéances)
+            wheel_size (int): Nombre d'alvéoles par niveau
+            levels (int): Nombre de niveaux
+        """
+        self.tick = tick
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self.wheels = [[[] for _ in range(wheel_size)] for _ in range(levels)]
+        self.current_tick = 0
+        self.started = time.monotonic()
+        self.pending = 0  # Échéances enregistrées non encore expirées (annulées comprises)
+        self.lock = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="timer-wheel", daemon=True)
+        self.thread.start()
+
+    def schedule(self, delay, callback, *args):
+        """
+        Programme l'appel de callback(*args) dans delay secondes : jamais avant, au plus
+        un tic après.
+
+        La fonction est appelée depuis le thread de la roue : elle doit être courte.
+
+        Args:
+            delay (float): Délai en secondes
+            callback (callable): Fonction à appeler
+            *args: Arguments de la fonction
+
+        Returns:
+            Timer: L'échéance (timer.cancel() pour l'annuler)
+        """
+        return self.schedule_many(delay, callback, [args])[0]
+
+    def schedule_many(self, delay, callback, args_list):
+        """
+        Programme plusieurs appels de callback avec le même délai, sous une seule prise
+        du verrou de la roue.
+
+        Args:
+            delay (float): Délai en secondes
+            callback (callable): Fonction à appeler
+            args_list (list): Les arguments (tuple) de chaque appel
+
+        Returns:
+            list: Les échéances, dans l'ordre de args_list
+        """
+        with self.lock:
+            if not self.pending:
+                # Roue au repos : on la recale sur l'horloge sans parcourir les tics écoulés
+                self.current_tick = max(self.current_tick, self._due_tick())
+            # Le tic courant est déjà entamé : on compte un tic de plus
+            now = max(self.current_tick, self._due_tick())
+            expiry = now + math.ceil(max(0.0, delay) / self.tick) + 1
+            timers = [Timer(expiry, callback, args) for args in args_list]
+            for timer in timers:
+                self._insert(timer)
+            self.pending += len(timers)
+            self.lock.notify()
+        return timers
+
+    def _due_tick(self):
+        """Tic correspondant à l'heure courante."""
+        return int((time.monotonic() - self.started) / self.tick)
+
+    def _insert(self, timer):
+        """Range une échéance dans le niveau qui couvre son délai (verrou tenu)."""
+        remaining = max(0, timer.expiry - self.current_tick)
+        level = 0
+        span = self.wheel_size
+        while remaining >= span and level < self.levels - 1:
+            level += 1
+            span *= self.wheel_size
+        expiry = min(timer.expiry, self.current_tick + span - 1)
+        slot = (expiry // self.wheel_size ** level) % self.wheel_size
+        self.wheels[level][slot].append(timer)
+
+    def _advance(self):
+        """
+        Avance la roue d'un tic (verrou tenu).
+
+        Returns:
+            list: Les échéances atteintes, non annulées
+        """
+        self.current_tick += 1
+        tick = self.current_tick
+        # Redistribuer les niveaux supérieurs dont l'alvéole commence à ce tic
+        for level in range(self.levels - 1, 0, -1):
+            span = self.wheel_size ** level
+            if tick % span == 0:
+                slot = self.wheels[level][(tick // span) % self.wheel_size]
+                timers = slot[:]
+                slot.clear()
+                for timer in timers:
+                    self._insert(timer)
+        slot = self.wheels[0][tick % self.wheel_size]
+        expired = [timer for timer in slot if timer.expiry <= tick]
+        if len(expired) != len(slot):
+            slot[:] = [timer for timer in slot if timer.expiry > tick]
+        else:
+            slot.clear()
+        self.pending -= len(expired)
+        return [timer for timer in expired if not timer.cancelled]
+
+    def _run(self):
+        """Boucle du thread de la roue."""
+        while True:
+            with self.lock:
+                while self.running and not self.pending:
+                    self.lock.wait()
+                if not self.running:
+                    return
+                due = self._due_tick()
+                if due <= self.current_tick:
+                    wait = self.started + (self.current_tick + 1) * self.tick - time.monotonic()
+                    self.lock.wait(max(0.0, wait))
+                    continue
+                expired = []
+                while self.current_tick < due and self.pending:
+                    expired.extend(self._advance())
+                if not self.pending:
+                    self.current_tick = max(self.current_tick, due)
+            for timer in expired:
+                timer.callback(*timer.args)
+
+    def stop(self):
+        """Arrête le thread de la roue ; les échéances en cours ne seront pas appelées."""
+        with self.lock:
+            self.running = False
+            self.lock.notify()
+        if threading.current_thread() is not self.thread:
+            self.thread.join()
+
+
+class NegotiationDeadlines:
+    def __init__(self, message_board, deadline, wheel=None):
+        """
+        Abandon automatique des négociations qui dépassent leur délai.
+
+        Chaque négociation ouverte (SharedMessageBoard.open_negotiations) reçoit une
+        échéance dans une TimerWheel ; si elle n'est pas terminée à l'échéance, un
+        message "aborted" de type "system" est rangé sur le tableau (abort_if_open), ce qui la termine
+        pour les agents, les écouteurs d'issue et les futures. L'échéance est annulée
+        dès que la négociation se termine.
+
+        Le message d'abandon est posté depuis le thread de la roue : à réserver aux
+        moteurs à threads ("pool", "threaded").
+
+        Args:
+            message_board (SharedMessageBoard): Le tableau de messages partagé
+            deadline (float): Délai maximal d'une négociation, en secondes
+            wheel (TimerWheel): Roue à utiliser (une roue dédiée est créée si None)
+        """
+        self.message_board = message_board
+        self.deadline = deadline
+        self.own_wheel = wheel is None
+        self.wheel = wheel or TimerWheel()
+        self.lock = threading.Lock()
+        self.timers = {}  # id_negotiation -> Timer
+        self.expired = 0  # Nombre de négociations abandonnées à l'échéance
+        message_board.deadlines = self
+        message_board.register_outcome_listener(self)
+
+    def watch(self, id_negotiation, deadline=None):
+        """
+        Programme l'échéance d'une négociation.
+
+        Args:
+            id_negotiation (int): L'identifiant de la négociation
+            deadline (float): Délai en secondes (self.deadline par défaut)
+        """
+        timer = self.wheel.schedule(self.deadline if deadline is None else deadline, self._expire, id_negotiation)
+        with self.lock:
+            self.timers[id_negotiation] = timer
+
+    def watch_many(self, negotiations, deadline=None):
+        """
+        Programme l'échéance de plusieurs négociations ouvertes ensemble.
+
+        Args:
+            negotiations (list): Les identifiants des négociations
+            deadline (float): Délai en secondes (self.deadline par défaut)
+        """
+        timers = self.wheel.schedule_many(self.deadline if deadline is None else deadline, self._expire,
+                                          [(id_negotiation,) for id_negotiation in negotiations])
+        with self.lock:
+            self.timers.update(zip(negotiations, timers))
+
+    def on_outcome(self, message, participants):
+        """Annule l'échéance d'une négociation terminée (appelé par le tableau)."""
+        with self.lock:
+            timer = self.timers.pop(message.id_negotiation, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _expire(self, id_negotiation):
+        """Abandonne une négociation arrivée à échéance sans être terminée."""
+        with self.lock:
+            if self.timers.pop(id_negotiation, None) is None:
+                return
+        # Vérification et abandon sous le verrou de bande : pas de réponse intercalée
+        if self.message_board.abort_if_open(id_negotiation) is not None:
+            self.expired += 1
+
+    def close(self):
+        """Annule les échéances en cours et arrête la roue si elle a été créée ici."""
+        with self.lock:
+            timers, self.timers = self.timers, {}
+        for timer in timers.values():
+            timer.cancel()
+        if self.own_wheel:
+            self.wheel.stop()
+        if self.message_board.deadlines is self:
+            self.message_board.deadlines = None
@@ -0,0 +1,186 @@
+import numpy as np
+
+from message import STATES
+
+# Codes d'état renvoyés par les stratégies vectorisées (indices de message.STATES)
+PROCESSING = STATES.index("processing")
+ACCEPTED = STATES.index("accepted")
+ABORTED = STATES.index("aborted")
+
+
+def _adjust_supplier_price(supplier_price, favourite, worst):
+    """Applique la remise / majoration liée aux préférences de compagnie de l'acheteur."""
+    return np.where(favourite, supplier_price * 0.95, np.where(worst, supplier_price * 1.05, supplier_price))
+
+
+def buyer_default_strategy_batch(current_price, max_price, supplier_price, favourite, worst, blocked):
+    """
+    Version vectorisée de strategies.buyer_default_strategy.
+
+    Args:
+        current_price (array): Prix courants des acheteurs
+        max_price (array): Prix maximums des acheteurs
+        supplier_price (array): Prix proposés par les fournisseurs
+        favourite (array): Masque booléen, compagnie préférée de l'acheteur
+        worst (array): Masque booléen, compagnie la moins préférée de l'acheteur
+        blocked (array): Masque booléen, compagnie bloquée par l'acheteur
+
+    Returns:
+        tuple: (prix de réponse, codes d'état)
+    """
+    current_price = np.asarray(current_price, dtype=float)
+    max_price = np.asarray(max_price, dtype=float)
+    adjusted = _adjust_supplier_price(np.asarray(supplier_price, dtype=float), favourite, worst)
+
+    counter = (adjusted > current_price) & (adjusted > max_price)
+    new_price = (adjusted + current_price) * 0.5  # essayer de se rapprocher
+    new_price = np.where(new_price > max_price, max_price, new_price)
+
+    price = np.where(counter, new_price, adjusted)
+    state = np.where(counter, PROCESSING, ACCEPTED)
+    return np.where(blocked, 0.0, price), np.where(blocked, ABORTED, state)
+
+
+def buyer_aggressive_strategy_batch(current_price, max_price, supplier_price, favourite, worst, blocked):
+    """
+    Version vectorisée de strategies.buyer_aggressive_strategy.
+
+    Args:
+        current_price (array): Prix courants des acheteurs
+        max_price (array): Prix maximums des acheteurs
+        supplier_price (array): Prix proposés par les fournisseurs
+        favourite (array): Masque booléen, compagnie préférée de l'acheteur
+        worst (array): Masque booléen, compagnie la moins préférée de l'acheteur
+        blocked (array): Masque booléen, compagnie bloquée par l'acheteur
+
+    Returns:
+        tuple: (prix de réponse, codes d'état)
+    """
+    current_price = np.asarray(current_price, dtype=float)
+    max_price = np.asarray(max_price, dtype=float)
+    adjusted = _adjust_supplier_price(np.asarray(supplier_price, dtype=float), favourite, worst)
+
+    counter = adjusted > current_price
+    new_price = current_price + (adjusted - current_price) * 0.5  # augmenter plus vite
+    new_price = np.where(new_price > max_price, max_price, new_price)
+
+    price = np.where(counter, new_price, adjusted)
+    state = np.where(counter, PROCESSING, ACCEPTED)
+    return np.where(blocked, 0.0, price), np.where(blocked, ABORTED, state)
+
+
+def supplier_default_strategy_batch(current_price, min_price, buyer_price):
+    """
+    Version vectorisée de strategies.supplier_default_strategy.
+
+    Args:
+        current_price (array): Prix courants des fournisseurs
+        min_price (array): Prix minimums des fournisseurs
+        buyer_price (array): Prix proposés par les acheteurs
+
+    Returns:
+        tuple: (prix de réponse, codes d'état)
+    """
+    current_price = np.asarray(current_price, dtype=float)
+    min_price = np.asarray(min_price, dtype=float)
+    buyer_price = np.asarray(buyer_price, dtype=float)
+
+    counter = buyer_price < current_price
+    new_price = buyer_price + (current_price - buyer_price) * 0.5  # céder à mi-chemin
+    new_price = np.where(buyer_price < min_price, min_price, np.maximum(new_price, min_price))
+
+    price = np.where(counter, new_price, buyer_price)
+    state = np.where(counter, PROCESSING, ACCEPTED)
+    return price, state
+
+
+def supplier_conciliatory_strategy_batch(current_price, min_price, buyer_price):
+    """
+    Version vectorisée de strategies.supplier_conciliatory_strategy.
+
+    Args:
+        current_price (array): Prix courants des fournisseurs (inutilisés, comme en scalaire)
+        min_price (array): Prix minimums des fournisseurs
+        buyer_price (array): Prix proposés par les acheteurs
+
+    Returns:
+        tuple: (prix de réponse, codes d'état)
+    """
+    min_price = np.asarray(min_price, dtype=float)
+    buyer_price = np.asarray(buyer_price, dtype=float)
+
+    adjusted_min = min_price * 0.95
+    counter = (buyer_price < min_price) & (buyer_price < adjusted_min)
+    new_price = buyer_price + (adjusted_min - buyer_price) * 0.5  # céder progressivement
+    new_price = np.maximum(new_price, min_price)
+
+    price = np.where(counter, new_price, buyer_price)
+    state = np.where(counter, PROCESSING, ACCEPTED)
+    return price, state
+
+
+def simulate_lockstep(buyer_first_price, buyer_max_price, supplier_first_price, supplier_min_price,
+                      favourite, worst, blocked, buyer_aggressive=None, supplier_conciliatory=None,
+                      message_remaining=9):
+    """
+    Fait avancer un lot de négociations 1-à-1 tour par tour, un appel vectorisé par tour.
+
+    Reproduit le protocole des agents : le fournisseur ouvre avec son prix de départ,
+    puis chaque camp répond tant que le dernier message n'est ni accepté, ni annulé,
+    et qu'il reste des messages.
+
+    Args:
+        buyer_first_price (array): Prix de départ des acheteurs
+        buyer_max_price (array): Prix maximums des acheteurs
+        supplier_first_price (array): Prix de départ des fournisseurs
+        supplier_min_price (array): Prix minimums des fournisseurs
+        favourite (array): Masque booléen, compagnie du fournisseur préférée par l'acheteur
+        worst (array): Masque booléen, compagnie du fournisseur la moins préférée
+        blocked (array): Masque booléen, compagnie du fournisseur bloquée
+        buyer_aggressive (array): Masque booléen, acheteurs à stratégie agressive
+        supplier_conciliatory (array): Masque booléen, fournisseurs à stratégie conciliante
+        message_remaining (int): Messages restants après l'offre d'ouverture
+
+    Returns:
+        dict: Tableaux "price", "state", "message_remaining" et "message_count" du dernier message
+    """
+    buyer_price = np.array(buyer_first_price, dtype=float)
+    supplier_price = np.array(supplier_first_price, dtype=float)
+    count = len(buyer_price)
+    buyer_aggressive = np.zeros(count, dtype=bool) if buyer_aggressive is None else np.asarray(buyer_aggressive)
+    supplier_conciliatory = np.zeros(count, dtype=bool) if supplier_conciliatory is None else np.asarray(supplier_conciliatory)
+
+    # Dernier message de chaque négociation : l'offre d'ouverture du fournisseur
+    price = supplier_price.copy()
+    state = np.full(count, PROCESSING)
+    remaining = np.full(count, message_remaining)
+    message_count = np.ones(count, dtype=int)
+
+    buyer_turn = True
+    active = remaining > 0
+    while active.any():
+        if buyer_turn:
+            default_price, default_state = buyer_default_strategy_batch(
+                buyer_price, buyer_max_price, price, favourite, worst, blocked)
+            aggressive_price, aggressive_state = buyer_aggressive_strategy_batch(
+                buyer_price, buyer_max_price, price, favourite, worst, blocked)
+            new_price = np.where(buyer_aggressive, aggressive_price, default_price)
+            new_state = np.where(buyer_aggressive, aggressive_state, default_state)
+            buyer_price = np.where(active & (new_state == PROCESSING), new_price, buyer_price)
+        else:
+            default_price, default_state = supplier_default_strategy_batch(
+                supplier_price, supplier_min_price, price)
+            conciliatory_price, conciliatory_state = supplier_conciliatory_strategy_batch(
+                supplier_price, supplier_min_price, price)
+            new_price = np.where(supplier_conciliatory, conciliatory_price, default_price)
+            new_state = np.where(supplier_conciliatory, conciliatory_state, default_state)
+            supplier_price = np.where(active & (new_state == PROCESSING), new_price, supplier_price)
+
+        price = np.where(active, new_price, price)
+        state = np.where(active, new_state, state)
+        remaining = np.where(active, remaining - 1, remaining)
+        message_count += active
+        active = active & (state == PROCESSING) & (remaining > 0)
+        buyer_turn = not buyer_turn
+
+    return {"price": price, "state": state, "message_remaining": remaining, "message_count": message_count}
@@ -0,0 +1,85 @@
+import os
+import queue
+import threading
+
+from logs import get_logger
+
+logger = get_logger("pool")
+
+
+class WorkerPool:
+    def __init__(self, max_workers=None, name="agents"):
+        """
+        Pool borné de threads qui exécute le travail de tous les agents (modèle M:N).
+
+        Un agent démarré avec start(pool=...) n'a pas de thread : quand une négociation
+        lui est notifiée, il se place une seule fois dans la file du pool et un thread
+        libre traite tout son lot en attente (Agent.drain). Un agent n'est jamais traité
+        par deux threads à la fois, ses négociations gardent donc l'ordre séquentiel
+        d'un thread dédié. Le nombre de threads ne dépend pas du nombre d'agents.
+
+        Args:
+            max_workers (int): Nombre de threads (min(32, nombre de cœurs + 4) par défaut)
+            name (str): Préfixe du nom des threads
+        """
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.ready = queue.SimpleQueue()  # Agents ayant des négociations à traiter (None = arrêt)
+        self.lock = threading.Lock()
+        self.running = True
+        self.threads = [threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True)
+                        for i in range(self.max_workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, agent):
+        """
+        Place un agent dans la file des agents à traiter.
+
+        Args:
+            agent (Agent): L'agent dont le lot de négociations doit être traité
+
+        Returns:
+            bool: False si le pool est arrêté (l'agent n'est pas placé dans la file)
+        """
+        with self.lock:
+            if not self.running:
+                return False
+            self.ready.put(agent)
+        return True
+
+    def _worker(self):
+        """Boucle d'un thread du pool."""
+        while True:
+            agent = self.ready.get()
+            if agent is None:
+                return
+            try:
+                agent.drain()
+            except Exception:
+                logger.exception("Agent %s failed while handling its negotiations", agent.id, extra={"agent": agent.id})
+
+    def shutdown(self, wait=True):
+        """
+        Arrête le pool : les agents déjà dans la file sont traités, les suivants refusés.
+
+        Args:
+            wait (bool): Attend la fin des threads du pool
+        """
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+            for _ in self.threads:
+                self.ready.put(None)
+        if wait:
+            current = threading.current_thread()
+            for thread in self.threads:
+                if thread is not current:
+                    thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False